@@ -0,0 +1,119 @@
+"""
+Cookie Purge Benchmark
+======================
+
+Compares ways of deleting the Antigravity cookies from a large Chromium
+`Cookies` database (built by fixtures.write_chromium_cookies):
+
+- per-keyword: one DELETE per keyword, as clean_antigravity_cookies used to
+- predicate: one DELETE with the combined LIKE predicate (what BrowserHelper
+  uses); keywords sharing a substring sit behind one "gate" LIKE
+- python-udf: one DELETE calling a Python regex matcher registered with SQLite
+
+Every strategy runs on a fresh copy of the same database and must delete the
+same, distinct number of rows.
+
+Usage:
+    python benchmarks/cookie_purge.py [--rows 1000000] [--match-ratio 0.01]
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import re
+import sys
+import time
+import shutil
+import sqlite3
+import logging
+import argparse
+import tempfile
+from typing import Callable, Dict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+
+import fixtures
+from browser_helper import BrowserHelper
+
+
+def per_keyword(conn: sqlite3.Connection) -> int:
+    deleted = 0
+    for keyword in BrowserHelper.ANTIGRAVITY_KEYWORDS:
+        cursor = conn.execute("DELETE FROM cookies WHERE host_key LIKE ? OR name LIKE ?",
+                              (f'%{keyword}%', f'%{keyword}%'))
+        deleted += cursor.rowcount
+    conn.commit()
+    return deleted
+
+
+def predicate(conn: sqlite3.Connection) -> int:
+    where, params = BrowserHelper._keyword_predicate(('host_key', 'name'))
+    deleted = conn.execute(f"DELETE FROM cookies WHERE {where}", params).rowcount
+    conn.commit()
+    return deleted
+
+
+def python_udf(conn: sqlite3.Connection) -> int:
+    pattern = re.compile('|'.join(map(re.escape, BrowserHelper.ANTIGRAVITY_KEYWORDS)), re.IGNORECASE)
+
+    def matches(host, name):
+        return pattern.search(host) is not None or pattern.search(name) is not None
+
+    conn.create_function('ag_match', 2, matches, deterministic=True)
+    deleted = conn.execute("DELETE FROM cookies WHERE ag_match(host_key, name)").rowcount
+    conn.commit()
+    return deleted
+
+
+STRATEGIES: Dict[str, Callable[[sqlite3.Connection], int]] = {
+    'per-keyword': per_keyword,
+    'predicate': predicate,
+    'python-udf': python_udf,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=1000000, help='Cookie rows (default: %(default)s)')
+    parser.add_argument('--match-ratio', type=float, default=0.01, help='Share of Antigravity cookies')
+    parser.add_argument('--runs', type=int, default=3, help='Repetitions per strategy')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='antigravity-cookies-')
+    try:
+        source = os.path.join(workdir, 'Cookies')
+        start = time.perf_counter()
+        expected = fixtures.write_chromium_cookies(source, args.rows, args.match_ratio)
+        print(f"Built {args.rows} rows ({expected} Antigravity) in {time.perf_counter() - start:.1f}s\n")
+
+        copy = os.path.join(workdir, 'Cookies.run')
+        print(f"{'strategy':<24} {'best':>9} {'deleted':>9}")
+        for name, strategy in STRATEGIES.items():
+            best = None
+            for _ in range(args.runs):
+                shutil.copyfile(source, copy)
+                conn = sqlite3.connect(copy)
+                start = time.perf_counter()
+                deleted = strategy(conn)
+                seconds = time.perf_counter() - start
+                conn.close()
+                best = seconds if best is None else min(best, seconds)
+            print(f"{name:<24} {best:>8.3f}s {deleted:>9}")
+
+        # End to end, including the backup copy and the transaction setup
+        logger = logging.getLogger('bench')
+        profile = os.path.join(workdir, 'Default')
+        os.makedirs(os.path.join(profile, 'Network'), exist_ok=True)
+        shutil.copyfile(source, os.path.join(profile, 'Network', 'Cookies'))
+        start = time.perf_counter()
+        deleted = BrowserHelper(logger).clean_antigravity_cookies('chrome', profile)
+        print(f"{'clean_antigravity_cookies':<24} {time.perf_counter() - start:>8.3f}s {deleted:>9}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,678 @@
+"""
+Synthetic Home Fixtures
+=======================
+
+Builds a realistic fake home directory for benchmarks: Chrome, Edge and Brave
+profiles (Local State, Network/Cookies, Simple Cache or blockfile cache
+entries, Local Storage LevelDB), a Firefox profile (profiles.ini, cookies.sqlite, webappsstore.sqlite,
+cache2 entries) and Antigravity leftovers. Files use the on-disk formats the
+browsers write, so the cleaner's parsers see the same bytes as in the field.
+A fraction of cookies, cache entries and storage keys belongs to Antigravity.
+
+Usage:
+    python benchmarks/fixtures.py /tmp/fake-home [--profiles 2] [--cookies 5000] [--cache-files 20000]
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import sys
+import json
+import struct
+import random
+import sqlite3
+import hashlib
+import argparse
+import platform
+from typing import Dict, Iterable, List, Optional, Tuple
+
+OS_KEY = platform.system().lower()
+
+# Browser user-data directories relative to the home directory (same as BrowserHelper)
+CHROMIUM_DATA_DIRS = {
+    'chrome': {
+        'linux': ('.config', 'google-chrome'),
+        'darwin': ('Library', 'Application Support', 'Google', 'Chrome'),
+        'windows': ('AppData', 'Local', 'Google', 'Chrome', 'User Data'),
+    },
+    'edge': {
+        'linux': ('.config', 'microsoft-edge'),
+        'darwin': ('Library', 'Application Support', 'Microsoft Edge'),
+        'windows': ('AppData', 'Local', 'Microsoft', 'Edge', 'User Data'),
+    },
+    'brave': {
+        'linux': ('.config', 'BraveSoftware', 'Brave-Browser'),
+        'darwin': ('Library', 'Application Support', 'BraveSoftware', 'Brave-Browser'),
+        'windows': ('AppData', 'Local', 'BraveSoftware', 'Brave-Browser', 'User Data'),
+    },
+}
+
+# Firefox root (profiles.ini) and the directory holding the profile folders
+FIREFOX_DIRS = {
+    'linux': (('.mozilla', 'firefox'), ''),
+    'darwin': (('Library', 'Application Support', 'Firefox'), 'Profiles'),
+    'windows': (('AppData', 'Roaming', 'Mozilla', 'Firefox'), 'Profiles'),
+}
+
+# Antigravity leftovers the Cleaner looks for (standard paths)
+LEFTOVER_DIRS = {
+    'linux': [('.config', 'Antigravity'), ('.local', 'share', 'Antigravity'), ('.cache', 'Antigravity')],
+    'darwin': [('Library', 'Application Support', 'Antigravity'), ('Library', 'Caches', 'Antigravity')],
+    'windows': [('AppData', 'Local', 'Programs', 'Antigravity'), ('AppData', 'Roaming', 'Antigravity')],
+}
+
+ANTIGRAVITY_HOSTS = ['.antigravity.google', 'antigravity.google', 'accounts.google.com']
+OTHER_HOSTS = [
+    '.example.com', 'www.wikipedia.org', '.github.com', 'news.ycombinator.com', '.youtube.com',
+    'mail.google.com', '.stackoverflow.com', 'docs.python.org', '.reddit.com', 'www.bbc.co.uk',
+]
+
+# Microseconds between 1601-01-01 (Chromium epoch) and 1970-01-01
+CHROMIUM_EPOCH_DELTA_US = 11644473600 * 1000000
+NOW_S = 1760000000
+
+
+# ==================== Random Data ====================
+
+def _origin(rng: random.Random, antigravity: bool) -> str:
+    host = rng.choice(ANTIGRAVITY_HOSTS if antigravity else OTHER_HOSTS).lstrip('.')
+    return f'https://{host}'
+
+
+def _is_match(rng: random.Random, ratio: float) -> bool:
+    return rng.random() < ratio
+
+
+# ==================== Cookies ====================
+
+CHROMIUM_COOKIES_SCHEMA = """
+CREATE TABLE meta(key LONGVARCHAR NOT NULL UNIQUE PRIMARY KEY, value LONGVARCHAR);
+CREATE TABLE cookies(
+    creation_utc INTEGER NOT NULL DEFAULT 0,
+    host_key TEXT NOT NULL,
+    top_frame_site_key TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    encrypted_value BLOB NOT NULL DEFAULT x'',
+    path TEXT NOT NULL,
+    expires_utc INTEGER NOT NULL,
+    is_secure INTEGER NOT NULL,
+    is_httponly INTEGER NOT NULL,
+    last_access_utc INTEGER NOT NULL DEFAULT 0,
+    has_expires INTEGER NOT NULL DEFAULT 1,
+    is_persistent INTEGER NOT NULL DEFAULT 1,
+    priority INTEGER NOT NULL DEFAULT 1,
+    samesite INTEGER NOT NULL DEFAULT -1,
+    source_scheme INTEGER NOT NULL DEFAULT 0,
+    source_port INTEGER NOT NULL DEFAULT -1,
+    last_update_utc INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (host_key, top_frame_site_key, name, path, source_scheme, source_port)
+);
+"""
+
+FIREFOX_COOKIES_SCHEMA = """
+CREATE TABLE moz_cookies(
+    id INTEGER PRIMARY KEY,
+    originAttributes TEXT NOT NULL DEFAULT '',
+    name TEXT, value TEXT, host TEXT, path TEXT,
+    expiry INTEGER, lastAccessed INTEGER, creationTime INTEGER,
+    isSecure INTEGER, isHttpOnly INTEGER,
+    inBrowserElement INTEGER DEFAULT 0, sameSite INTEGER DEFAULT 0,
+    rawSameSite INTEGER DEFAULT 0, schemeMap INTEGER DEFAULT 0,
+    CONSTRAINT moz_uniqueid UNIQUE (name, host, path, originAttributes)
+);
+"""
+
+
+def _cookie_rows(rows: int, match_ratio: float, rng: random.Random) -> Iterable[Tuple[str, str, str, str, int, int]]:
+    """Yield (host, name, value, path, created_s, expires_s); names are unique per host."""
+    for i in range(rows):
+        antigravity = _is_match(rng, match_ratio)
+        host = rng.choice(ANTIGRAVITY_HOSTS if antigravity else OTHER_HOSTS)
+        name = f'antigravity_session_{i}' if antigravity and rng.random() < 0.5 else f'c{i}'
+        value = '%032x' % rng.getrandbits(128)
+        created = NOW_S - rng.randrange(90 * 86400)
+        yield host, name, value, '/', created, created + 365 * 86400
+
+
+def write_chromium_cookies(path: str, rows: int, match_ratio: float = 0.01, seed: int = 1) -> int:
+    """
+    Create a Chromium `Cookies` database.
+
+    Returns:
+        Number of Antigravity cookies (matching BrowserHelper.ANTIGRAVITY_KEYWORDS by host or name)
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript(CHROMIUM_COOKIES_SCHEMA)
+    conn.execute("INSERT INTO meta VALUES ('version', '21'), ('last_compatible_version', '21')")
+    matches = 0
+    batch = []
+    for host, name, value, cpath, created, expires in _cookie_rows(rows, match_ratio, rng):
+        if 'antigravity' in host or 'antigravity' in name:
+            matches += 1
+        created_us = created * 1000000 + CHROMIUM_EPOCH_DELTA_US
+        batch.append((created_us, host, name, value, cpath, expires * 1000000 + CHROMIUM_EPOCH_DELTA_US,
+                      1, 1, created_us))
+    conn.executemany(
+        "INSERT INTO cookies (creation_utc, host_key, name, value, path, expires_utc, is_secure, is_httponly, "
+        "last_access_utc) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+    return matches
+
+
+def write_firefox_cookies(path: str, rows: int, match_ratio: float = 0.01, seed: int = 1) -> int:
+    """Create a Firefox `cookies.sqlite` database; returns the number of Antigravity cookies."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript(FIREFOX_COOKIES_SCHEMA)
+    matches = 0
+    batch = []
+    for host, name, value, cpath, created, expires in _cookie_rows(rows, match_ratio, rng):
+        if 'antigravity' in host or 'antigravity' in name:
+            matches += 1
+        batch.append((name, value, host, cpath, expires, created * 1000000, created * 1000000, 1, 1))
+    conn.executemany(
+        "INSERT INTO moz_cookies (name, value, host, path, expiry, lastAccessed, creationTime, isSecure, isHttpOnly) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+    return matches
+
+
+# ==================== LevelDB (Local Storage) ====================
+
+def _crc32c_table() -> List[int]:
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x82F63B78 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC32C = _crc32c_table()
+
+
+def crc32c(data: bytes) -> int:
+    crc = 0xFFFFFFFF
+    for byte in data:
+        crc = _CRC32C[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+def _masked_crc(data: bytes) -> int:
+    crc = crc32c(data)
+    return (((crc >> 15) | (crc << 17)) + 0xA282EAD8) & 0xFFFFFFFF
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _log_records(payloads: Iterable[bytes]) -> bytes:
+    """Frame payloads as a LevelDB log file (32KB blocks, FULL/FIRST/MIDDLE/LAST records)."""
+    block = 32768
+    out = bytearray()
+    for payload in payloads:
+        first = True
+        while True:
+            left = block - len(out) % block
+            if left < 7:
+                out += b'\0' * left
+                left = block
+            fragment = payload[:left - 7]
+            payload = payload[len(fragment):]
+            last = not payload
+            kind = 1 if first and last else 2 if first else 4 if last else 3
+            out += struct.pack('<IHB', _masked_crc(bytes([kind]) + fragment), len(fragment), kind) + fragment
+            first = False
+            if last:
+                break
+    return bytes(out)
+
+
+def _storage_entries(count: int, match_ratio: float, rng: random.Random) -> List[Tuple[bytes, bytes]]:
+    """Chromium localStorage rows: META:<origin> per origin plus _<origin>\\0<key> -> \\x01<value>."""
+    entries = [(b'VERSION', b'1')]
+    origins = set()
+    for i in range(count):
+        origin = _origin(rng, _is_match(rng, match_ratio))
+        if origin not in origins:
+            origins.add(origin)
+            # META value: protobuf {1: last_modified, 2: size}
+            entries.append((b'META:' + origin.encode(), b'\x08' + _varint(NOW_S * 1000000) + b'\x10\x40'))
+        entries.append((b'_' + origin.encode() + b'\x00\x01key' + str(i).encode(),
+                        b'\x01' + ('%024x' % rng.getrandbits(96)).encode()))
+    return entries
+
+
+def _write_batch(sequence: int, entries: List[Tuple[bytes, bytes]]) -> bytes:
+    body = bytearray(struct.pack('<QI', sequence, len(entries)))
+    for key, value in entries:
+        body += b'\x01' + _varint(len(key)) + key + _varint(len(value)) + value
+    return bytes(body)
+
+
+def _snappy_literal(data: bytes) -> bytes:
+    """Snappy-compress using literal elements only (valid Snappy, no actual compression)."""
+    out = bytearray(_varint(len(data)))
+    for start in range(0, len(data), 65536):
+        chunk = data[start:start + 65536]
+        n = len(chunk) - 1
+        if n < 60:
+            out.append(n << 2)
+        elif n < 256:
+            out += bytes([60 << 2, n])
+        else:
+            out += bytes([61 << 2]) + struct.pack('<H', n)
+        out += chunk
+    return bytes(out)
+
+
+def _table_block(entries: List[Tuple[bytes, bytes]], restart_interval: int = 16) -> bytes:
+    """Build one SSTable block with shared-prefix key compression and a restart array."""
+    out = bytearray()
+    restarts = []
+    last_key = b''
+    for i, (key, value) in enumerate(entries):
+        shared = 0
+        if i % restart_interval == 0:
+            restarts.append(len(out))
+        else:
+            while shared < min(len(key), len(last_key)) and key[shared] == last_key[shared]:
+                shared += 1
+        out += _varint(shared) + _varint(len(key) - shared) + _varint(len(value)) + key[shared:] + value
+        last_key = key
+    for offset in restarts or [0]:
+        out += struct.pack('<I', offset)
+    out += struct.pack('<I', len(restarts or [0]))
+    return bytes(out)
+
+
+def _write_table(path: str, entries: List[Tuple[bytes, bytes]], first_sequence: int,
+                 block_size: int = 4096) -> Tuple[int, bytes, bytes]:
+    """
+    Write a LevelDB .ldb table; data blocks are Snappy-compressed.
+
+    Returns:
+        Tuple of (file size, smallest internal key, largest internal key) for the MANIFEST
+    """
+    internal = sorted(
+        (key + struct.pack('<Q', ((first_sequence + i) << 8) | 1), value)
+        for i, (key, value) in enumerate(entries)
+    )
+    out = bytearray()
+    index = []
+
+    def emit(block: bytes, compress: bool) -> bytes:
+        payload = _snappy_literal(block) if compress else block
+        kind = b'\x01' if compress else b'\x00'
+        handle = _varint(len(out)) + _varint(len(payload))
+        out.extend(payload + kind + struct.pack('<I', _masked_crc(payload + kind)))
+        return handle
+
+    chunk = []
+    size = 0
+    for key, value in internal:
+        chunk.append((key, value))
+        size += len(key) + len(value)
+        if size >= block_size:
+            index.append((chunk[-1][0], emit(_table_block(chunk), True)))
+            chunk, size = [], 0
+    if chunk:
+        index.append((chunk[-1][0], emit(_table_block(chunk), True)))
+
+    metaindex = emit(_table_block([]), False)
+    index_handle = emit(_table_block(index, restart_interval=1), False)
+    footer = metaindex + index_handle
+    footer += b'\0' * (40 - len(footer)) + struct.pack('<Q', 0xDB4775248B80FB57)
+    with open(path, 'wb') as f:
+        f.write(out + footer)
+    return len(out) + len(footer), internal[0][0], internal[-1][0]
+
+
+def write_local_storage(leveldb_dir: str, entries: int, match_ratio: float = 0.01, seed: int = 1) -> int:
+    """
+    Create a Chromium `Local Storage/leveldb` directory.
+
+    Older entries go into a compacted .ldb table, recent ones into the .log file.
+
+    Returns:
+        Number of Antigravity storage items
+    """
+    os.makedirs(leveldb_dir, exist_ok=True)
+    rng = random.Random(seed)
+    rows = _storage_entries(entries, match_ratio, rng)
+    split = len(rows) // 2
+    table_size, smallest, largest = _write_table(os.path.join(leveldb_dir, '000005.ldb'), rows[:split],
+                                                 first_sequence=1)
+
+    sequence = split + 1
+    batches = []
+    for start in range(split, len(rows), 100):
+        batch = rows[start:start + 100]
+        batches.append(_write_batch(sequence, batch))
+        sequence += len(batch)
+    with open(os.path.join(leveldb_dir, '000006.log'), 'wb') as f:
+        f.write(_log_records(batches))
+
+    # MANIFEST: one VersionEdit (comparator, log number, next file, last sequence, new file 5 at level 0)
+    edit = (b'\x01' + _varint(26) + b'leveldb.BytewiseComparator' + b'\x02' + _varint(6)
+            + b'\x03' + _varint(7) + b'\x04' + _varint(split)
+            + b'\x07' + _varint(0) + _varint(5) + _varint(table_size)
+            + _varint(len(smallest)) + smallest + _varint(len(largest)) + largest)
+    with open(os.path.join(leveldb_dir, 'MANIFEST-000004'), 'wb') as f:
+        f.write(_log_records([edit]))
+    with open(os.path.join(leveldb_dir, 'CURRENT'), 'w') as f:
+        f.write('MANIFEST-000004\n')
+    open(os.path.join(leveldb_dir, 'LOCK'), 'w').close()
+    return sum(1 for key, _ in rows if b'antigravity' in key and key.startswith(b'_'))
+
+
+# ==================== HTTP Caches ====================
+
+SIMPLE_INITIAL_MAGIC = 0xFCFB6D1BA7725C30
+SIMPLE_FINAL_MAGIC = 0xF4FA6F45970D41D8
+SIMPLE_VERSION = 5
+
+
+def _cache_url(rng: random.Random, antigravity: bool, i: int) -> str:
+    origin = _origin(rng, antigravity)
+    return f'{origin}/static/{i:06d}/{rng.getrandbits(32):08x}.js'
+
+
+def write_simple_cache(cache_dir: str, count: int, match_ratio: float = 0.01, seed: int = 1) -> int:
+    """
+    Create a Chromium Simple Cache directory (`Cache/Cache_Data`) with `count` entry files.
+
+    Each `<hash>_0` file holds the SimpleFileHeader, the key, the body (stream 1),
+    an EOF record, the response headers (stream 0) and a final EOF record.
+
+    Returns:
+        Number of entries whose key contains "antigravity"
+    """
+    os.makedirs(os.path.join(cache_dir, 'index-dir'), exist_ok=True)
+    rng = random.Random(seed)
+    matches = 0
+    for i in range(count):
+        url = _cache_url(rng, _is_match(rng, match_ratio), i)
+        site = url.split('/static/')[0]
+        key = f'1/0/_dk_{site} {site} {url}'.encode()
+        matches += b'antigravity' in key
+        body = b'x' * rng.randrange(64, 2048)
+        headers = b'HTTP/1.1 200 OK\0content-type: application/javascript\0\0'
+        data = bytearray(struct.pack('<QIII4x', SIMPLE_INITIAL_MAGIC, SIMPLE_VERSION, len(key), 0))
+        data += key + body
+        data += struct.pack('<QIIi4x', SIMPLE_FINAL_MAGIC, 0, 0, len(body))
+        data += headers
+        data += struct.pack('<QIIi4x', SIMPLE_FINAL_MAGIC, 0, 0, len(headers))
+        name = '%016x_0' % int.from_bytes(hashlib.sha1(key).digest()[:8], 'little')
+        with open(os.path.join(cache_dir, name), 'wb') as f:
+            f.write(data)
+    with open(os.path.join(cache_dir, 'index'), 'wb') as f:
+        f.write(struct.pack('<QI', 0x656E74657220796F, 9))
+    with open(os.path.join(cache_dir, 'index-dir', 'the-real-index'), 'wb') as f:
+        f.write(b'\0' * 64)
+    return matches
+
+
+def _super_fast_hash(data: bytes) -> int:
+    """SuperFastHash (blockfile entry and key hashes)."""
+    mask = 0xFFFFFFFF
+    h = len(data)
+    end = len(data) & ~3
+    for i in range(0, end, 4):
+        h = (h + (data[i] | data[i + 1] << 8)) & mask
+        h = ((h << 16) & mask) ^ ((((data[i + 2] | data[i + 3] << 8) << 11) ^ h) & mask)
+        h = (h + (h >> 11)) & mask
+    rem = len(data) & 3
+    signed = lambda b: b - 256 if b > 127 else b
+    if rem == 3:
+        h = (h + (data[end] | data[end + 1] << 8)) & mask
+        h ^= (h << 16) & mask
+        h ^= (signed(data[end + 2]) << 18) & mask
+        h = (h + (h >> 11)) & mask
+    elif rem == 2:
+        h = (h + (data[end] | data[end + 1] << 8)) & mask
+        h ^= (h << 11) & mask
+        h = (h + (h >> 17)) & mask
+    elif rem == 1:
+        h = (h + signed(data[end])) & mask
+        h ^= (h << 10) & mask
+        h = (h + (h >> 1)) & mask
+    h ^= (h << 3) & mask
+    h = (h + (h >> 5)) & mask
+    h ^= (h << 4) & mask
+    h = (h + (h >> 17)) & mask
+    h ^= (h << 25) & mask
+    h = (h + (h >> 6)) & mask
+    return h
+
+
+def _block_file_header(this_file: int, entry_size: int, num_entries: int) -> bytes:
+    header = struct.pack('<IIhhiii', 0xC104CAC3, 0x30000, this_file, 0, entry_size, num_entries,
+                         (BLOCK_FILE_SIZE - 8192) // entry_size)
+    return header.ljust(8192, b'\0')
+
+
+BLOCK_FILE_SIZE = 8192 + 256 * 4096
+
+
+def write_blockfile_cache(cache_dir: str, count: int, match_ratio: float = 0.01, seed: int = 1) -> int:
+    """
+    Create a Chromium blockfile cache (`index`, `data_0`..`data_3`).
+
+    Every entry is an EntryStore in `data_1` (with a valid self_hash), followed
+    by a block of response headers, as small stream data shares that file.
+
+    Returns:
+        Number of entries whose key contains "antigravity"
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    rng = random.Random(seed)
+    matches = 0
+    blocks = bytearray()
+    entries = 0
+    for i in range(count):
+        key = _cache_url(rng, _is_match(rng, match_ratio), i).encode()
+        matches += b'antigravity' in key
+        used = (96 + len(key) + 256) // 256
+        start = len(blocks) // 256
+        rankings = 0x80000000 | (1 << 28) | (i & 0xFFFF)
+        data_addr = 0x80000000 | (2 << 28) | (1 << 16) | (start + used)
+        store = struct.pack('<IIIiiiQiI', _super_fast_hash(key), 0, rankings, 0, 0, 0,
+                            CHROMIUM_EPOCH_DELTA_US + NOW_S * 1000000, len(key), 0)
+        store += struct.pack('<4i4II4i', 60, 0, 0, 0, data_addr, 0, 0, 0, 0, 0, 0, 0, 0)
+        store += struct.pack('<I', _super_fast_hash(store))
+        blocks += (store + key + b'\0').ljust(used * 256, b'\0')
+        blocks += b'HTTP/1.1 200 OK\0content-type: application/javascript\0\0'.ljust(256, b'\0')
+        entries += 1
+    with open(os.path.join(cache_dir, 'index'), 'wb') as f:
+        f.write(struct.pack('<IIii', 0xC103CAC3, 0x30000, entries, 0).ljust(368, b'\0') + b'\0' * 4 * 0x10000)
+    for n, entry_size in enumerate((36, 256, 1024, 4096)):
+        with open(os.path.join(cache_dir, f'data_{n}'), 'wb') as f:
+            f.write(_block_file_header(n, entry_size, entries * 2 if n == 1 else 0))
+            if n == 1:
+                f.write(blocks)
+    return matches
+
+
+def write_firefox_cache2(entries_dir: str, count: int, match_ratio: float = 0.01, seed: int = 1) -> int:
+    """
+    Create Firefox `cache2/entries` files: data, then metadata (hash, chunk hashes,
+    header, key, elements), then the metadata offset in the last 4 bytes.
+
+    Returns:
+        Number of entries whose key contains "antigravity"
+    """
+    os.makedirs(entries_dir, exist_ok=True)
+    rng = random.Random(seed)
+    matches = 0
+    for i in range(count):
+        key = b'a,:' + _cache_url(rng, _is_match(rng, match_ratio), i).encode()
+        matches += b'antigravity' in key
+        body = b'x' * rng.randrange(64, 2048)
+        chunks = (len(body) + 262143) // 262144
+        meta = struct.pack('>I', 0) + b'\0\0' * chunks
+        # version, fetchCount, lastFetched, lastModified, frecency, expirationTime, keySize, flags
+        meta += struct.pack('>8I', 3, 1, NOW_S, NOW_S, 0, NOW_S + 86400, len(key), 0)
+        meta += key + b'\0'
+        meta += b'request-method\0GET\0response-head\0HTTP/1.1 200 OK\r\n\0'
+        name = hashlib.sha1(key).hexdigest().upper()
+        with open(os.path.join(entries_dir, name), 'wb') as f:
+            f.write(body + meta + struct.pack('>I', len(body)))
+    return matches
+
+
+def write_webappsstore(path: str, entries: int, match_ratio: float = 0.01, seed: int = 1) -> int:
+    """Create Firefox `webappsstore.sqlite`; returns the number of Antigravity rows."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE webappsstore2 (originAttributes TEXT, originKey TEXT, scope TEXT, key TEXT, value TEXT)")
+    conn.execute("CREATE UNIQUE INDEX origin_key_index ON webappsstore2(originAttributes, originKey, key)")
+    matches = 0
+    rows = []
+    for i in range(entries):
+        host = _origin(rng, _is_match(rng, match_ratio))[len('https://'):]
+        matches += 'antigravity' in host
+        origin_key = host[::-1] + '.:https:443'
+        rows.append(('', origin_key, '', f'key{i}', '%024x' % rng.getrandbits(96)))
+    conn.executemany("INSERT INTO webappsstore2 VALUES (?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return matches
+
+
+# ==================== Homes ====================
+
+def _write_files(directory: str, count: int, size: int = 512, fanout: int = 200):
+    """Spread `count` small files over subdirectories of at most `fanout` files."""
+    payload = b'\0' * size
+    for i in range(count):
+        sub = os.path.join(directory, f'd{i // fanout:04d}')
+        if i % fanout == 0:
+            os.makedirs(sub, exist_ok=True)
+        with open(os.path.join(sub, f'f{i:06d}.bin'), 'wb') as f:
+            f.write(payload)
+
+
+def build_home(home: str, browsers: Tuple[str, ...] = ('chrome', 'edge', 'brave'), profiles: int = 2,
+               cookies: int = 5000, cache_files: int = 20000, storage_entries: int = 2000,
+               leftover_files: int = 2000, firefox: bool = True, match_ratio: float = 0.01,
+               seed: int = 1, os_key: Optional[str] = None,
+               blockfile_browsers: Tuple[str, ...] = ('edge',)) -> Dict[str, int]:
+    """
+    Build a fake home directory.
+
+    Args:
+        home: Directory to create (existing content is kept)
+        browsers: Chromium browsers to create
+        profiles: Profiles per Chromium browser ("Default", "Profile 1", ...)
+        cookies: Cookie rows per profile
+        cache_files: Simple Cache entries per profile (Firefox gets the same number)
+        storage_entries: Local Storage items per profile
+        leftover_files: Files in each Antigravity leftover directory
+        firefox: Also create a Firefox profile
+        match_ratio: Fraction of cookies/cache/storage rows that belong to Antigravity
+        seed: Random seed (the same arguments always produce the same bytes)
+        os_key: Layout to use ('linux', 'darwin', 'windows'; default: this OS)
+        blockfile_browsers: Browsers whose HTTP cache uses the blockfile format
+
+    Returns:
+        Dictionary of counts (files, cookies, antigravity_cookies, ...)
+    """
+    os_key = os_key or OS_KEY
+    counts = {'profiles': 0, 'cookies': 0, 'antigravity_cookies': 0, 'cache_entries': 0,
+              'antigravity_cache_entries': 0, 'storage_items': 0, 'antigravity_storage_items': 0,
+              'leftover_files': 0}
+    os.makedirs(os.path.join(home, 'Desktop'), exist_ok=True)
+
+    for b, browser in enumerate(browsers):
+        data_dir = os.path.join(home, *CHROMIUM_DATA_DIRS[browser][os_key])
+        names = ['Default'] + [f'Profile {i}' for i in range(1, profiles)]
+        info_cache = {}
+        for p, name in enumerate(names):
+            profile = os.path.join(data_dir, name)
+            profile_seed = seed * 1000 + b * 100 + p
+            counts['antigravity_cookies'] += write_chromium_cookies(
+                os.path.join(profile, 'Network', 'Cookies'), cookies, match_ratio, profile_seed)
+            # Edge profiles get the blockfile format of older (Windows) builds
+            write_cache = write_blockfile_cache if browser in blockfile_browsers else write_simple_cache
+            counts['antigravity_cache_entries'] += write_cache(
+                os.path.join(profile, 'Cache', 'Cache_Data'), cache_files, match_ratio, profile_seed)
+            counts['antigravity_storage_items'] += write_local_storage(
+                os.path.join(profile, 'Local Storage', 'leveldb'), storage_entries, match_ratio, profile_seed)
+            os.makedirs(os.path.join(profile, 'Code Cache', 'js'), exist_ok=True)
+            os.makedirs(os.path.join(profile, 'GPUCache'), exist_ok=True)
+            with open(os.path.join(profile, 'Preferences'), 'w', encoding='utf-8') as f:
+                json.dump({'profile': {'name': f'Person {p + 1}'}}, f)
+            info_cache[name] = {'name': f'Person {p + 1}', 'user_name': f'user{p + 1}@example.com'}
+            counts['profiles'] += 1
+            counts['cookies'] += cookies
+            counts['cache_entries'] += cache_files
+            counts['storage_items'] += storage_entries
+        with open(os.path.join(data_dir, 'Local State'), 'w', encoding='utf-8') as f:
+            json.dump({'profile': {'info_cache': info_cache, 'last_used': names[0]}}, f)
+
+    if firefox:
+        root_parts, profiles_sub = FIREFOX_DIRS[os_key]
+        root = os.path.join(home, *root_parts)
+        relative = os.path.join(profiles_sub, 'x7k2m9qa.default-release') if profiles_sub else 'x7k2m9qa.default-release'
+        profile = os.path.join(root, relative)
+        os.makedirs(profile, exist_ok=True)
+        with open(os.path.join(root, 'profiles.ini'), 'w', encoding='utf-8') as f:
+            f.write('[Profile0]\nName=default-release\nIsRelative=1\n'
+                    f'Path={relative.replace(os.sep, "/")}\nDefault=1\n\n'
+                    '[General]\nStartWithLastProfile=1\nVersion=2\n')
+        counts['antigravity_cookies'] += write_firefox_cookies(
+            os.path.join(profile, 'cookies.sqlite'), cookies, match_ratio, seed)
+        counts['antigravity_storage_items'] += write_webappsstore(
+            os.path.join(profile, 'webappsstore.sqlite'), storage_entries, match_ratio, seed)
+        counts['antigravity_cache_entries'] += write_firefox_cache2(
+            os.path.join(profile, 'cache2', 'entries'), cache_files, match_ratio, seed)
+        counts['profiles'] += 1
+        counts['cookies'] += cookies
+        counts['cache_entries'] += cache_files
+        counts['storage_items'] += storage_entries
+
+    for parts in LEFTOVER_DIRS[os_key]:
+        _write_files(os.path.join(home, *parts), leftover_files)
+        counts['leftover_files'] += leftover_files
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('home', help='Directory to create the fake home in')
+    parser.add_argument('--browsers', default='chrome,edge,brave', help='Chromium browsers (default: %(default)s)')
+    parser.add_argument('--profiles', type=int, default=2, help='Profiles per Chromium browser')
+    parser.add_argument('--cookies', type=int, default=5000, help='Cookie rows per profile')
+    parser.add_argument('--cache-files', type=int, default=20000, help='Cache entries per profile')
+    parser.add_argument('--storage-entries', type=int, default=2000, help='Local Storage items per profile')
+    parser.add_argument('--leftover-files', type=int, default=2000, help='Files per Antigravity leftover directory')
+    parser.add_argument('--no-firefox', action='store_true', help='Skip the Firefox profile')
+    parser.add_argument('--match-ratio', type=float, default=0.01, help='Fraction of Antigravity rows')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    counts = build_home(
+        args.home, tuple(args.browsers.split(',')), args.profiles, args.cookies, args.cache_files,
+        args.storage_entries, args.leftover_files, not args.no_firefox, args.match_ratio, args.seed,
+    )
+    json.dump(counts, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
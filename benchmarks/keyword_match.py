@@ -0,0 +1,117 @@
+"""
+Keyword Match Benchmark
+=======================
+
+Compares ways of testing names against the Antigravity keywords, on millions
+of synthetic file names, URLs and cache keys:
+
+- any-loop: `any(keyword in name.lower() for keyword in KEYWORDS)`, as the
+  LocalStorage and cache cleaning used to
+- regex-alternation: one IGNORECASE alternation of the escaped keywords (the
+  old cache_entries.keyword_matcher)
+- automaton-walk: the Aho-Corasick automaton stepped in Python (find_all)
+- KeywordMatcher: the shared matcher (keywords.py), the automaton's trie
+  compiled to one regex and run over the lowercased name
+
+Every strategy must select the same names. str names and bytes keys are timed
+separately.
+
+Usage:
+    python benchmarks/keyword_match.py [--names 2000000] [--match-ratio 0.01]
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+from typing import Callable, Dict, List, Union
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+
+from keywords import DEFAULT_KEYWORDS, KeywordMatcher
+
+WORDS = ['cache', 'data', 'index', 'profile', 'google', 'chrome', 'Default', 'extensions', 'static',
+         'anti', 'deep', 'mind', 'gemini', 'code', 'gravity', 'assets', 'v2', 'Local', 'Storage']
+HOSTS = ['www.example.com', 'github.com', 'mail.google.com', 'docs.python.org', 'news.ycombinator.com']
+MATCHES = ['AntiGravity', 'anti_gravity', 'antigravity.google', 'DeepMind', 'gemini-code']
+
+
+def make_names(count: int, match_ratio: float, seed: int = 1) -> List[str]:
+    """File names and URLs, about match_ratio of them containing a keyword."""
+    rng = random.Random(seed)
+    names = []
+    for i in range(count):
+        parts = [rng.choice(WORDS) for _ in range(rng.randint(1, 4))]
+        if rng.random() < match_ratio:
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(MATCHES))
+        if i % 2:
+            names.append(f"https://{rng.choice(HOSTS)}/{'/'.join(parts)}?v={rng.getrandbits(24):06x}")
+        else:
+            names.append('_'.join(parts) + f'.{rng.getrandbits(24):06x}')
+    return names
+
+
+def strategies(matcher: KeywordMatcher) -> Dict[str, Callable[[Union[str, bytes]], bool]]:
+    str_keywords = [k.lower() for k in DEFAULT_KEYWORDS]
+    bytes_keywords = [k.encode() for k in str_keywords]
+    str_pattern = re.compile('|'.join(map(re.escape, str_keywords)), re.IGNORECASE)
+    bytes_pattern = re.compile(b'|'.join(map(re.escape, bytes_keywords)), re.IGNORECASE)
+
+    def any_loop(name):
+        lowered = name.lower()
+        return any(k in lowered for k in (bytes_keywords if isinstance(name, bytes) else str_keywords))
+
+    def alternation(name):
+        return (bytes_pattern if isinstance(name, bytes) else str_pattern).search(name) is not None
+
+    return {
+        'any-loop': any_loop,
+        'regex-alternation': alternation,
+        'automaton-walk': lambda name: bool(matcher.find_all(name)),
+        'KeywordMatcher': matcher.search,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--names', type=int, default=2000000, help='Names to test (default: %(default)s)')
+    parser.add_argument('--match-ratio', type=float, default=0.01, help='Share of names containing a keyword')
+    parser.add_argument('--runs', type=int, default=3, help='Repetitions per strategy')
+    parser.add_argument('--skip-walk', action='store_true', help='Skip the (slow) pure-Python automaton walk')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher(DEFAULT_KEYWORDS)
+    build = time.perf_counter() - start
+    print(f"Built automaton for {len(matcher.keywords)} keywords ({len(matcher.effective)} effective) "
+          f"in {build * 1000:.2f}ms")
+
+    names = make_names(args.names, args.match_ratio)
+    keys = [name.encode() for name in names]
+    print(f"Generated {len(names)} names\n")
+
+    print(f"{'strategy':<20} {'input':<6} {'best':>9} {'ns/name':>9} {'matched':>9}")
+    expected = {}
+    for name, test in strategies(matcher).items():
+        if args.skip_walk and name == 'automaton-walk':
+            continue
+        for label, data in (('str', names), ('bytes', keys)):
+            best = None
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                matched = sum(1 for item in data if test(item))
+                seconds = time.perf_counter() - start
+                best = seconds if best is None else min(best, seconds)
+            if expected.setdefault(label, matched) != matched:
+                raise SystemExit(f"{name} matched {matched} {label} names, expected {expected[label]}")
+            print(f"{name:<20} {label:<6} {best:>8.3f}s {best / len(data) * 1e9:>9.0f} {matched:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Benchmark Suite
+===============
+
+Times the cleaner's main operations against a synthetic home directory (see
+fixtures.py) and writes the results as JSON, so regressions show up between
+commits:
+
+- Cleaner.run_clean (deep, non-interactive)
+- BrowserHelper.clean_browsers, all browsers and profiles at once
+- SessionManager.backup_session / list_saved_sessions / restore_session
+- NetworkOptimizer.generate_diagnostic_report against a local HTTP stub
+
+HOME (and the Windows profile variables) point at the fixture before the
+cleaner is imported, so logs, backups and sessions stay inside it. Processes are
+never touched: the process table is replaced by an empty one.
+
+Usage:
+    python benchmarks/run_suite.py [--runs 3] [--cache-files 20000] [--json benchmark-results.json]
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, '..', 'src')
+sys.path.insert(0, BENCH_DIR)
+
+import fixtures
+
+
+def point_home_at(home: str):
+    """Make every path the cleaner derives from the environment resolve inside `home`."""
+    os.environ['HOME'] = home
+    os.environ['USERPROFILE'] = home
+    os.environ['LOCALAPPDATA'] = os.path.join(home, 'AppData', 'Local')
+    os.environ['APPDATA'] = os.path.join(home, 'AppData', 'Roaming')
+    os.environ['TEMP'] = os.path.join(home, 'AppData', 'Local', 'Temp')
+    # The network stub is local; a proxy from the environment must not intercept it
+    os.environ['NO_PROXY'] = os.environ['no_proxy'] = '127.0.0.1,localhost'
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def timed(fn: Callable, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def run_once(home: str, fixture_args: Dict, quiet: bool) -> Dict[str, Dict]:
+    """Build a fresh fixture, then time every operation once."""
+    import main
+    from process_table import ProcessTable
+    from browser_helper import BrowserHelper
+    from session_manager import SessionManager
+    from network_optimizer import NetworkOptimizer
+
+    class NoProcesses(ProcessTable):
+        def snapshot(self):
+            return []
+
+    shutil.rmtree(home, ignore_errors=True)
+    build_seconds, counts = timed(fixtures.build_home, home, **fixture_args)
+
+    main.console.quiet = quiet
+    logger = main.setup_agent_logging()
+    results = {'fixture_build': {'seconds': build_seconds, 'result': counts}}
+
+    # Sessions first: they read the cookie databases before anything is cleaned
+    helper = BrowserHelper(logger, process_table=NoProcesses())
+    sessions = SessionManager(main.SESSION_DIR, logger)
+    profile = helper.get_browser_profiles('chrome')[0][1]
+    seconds, ok = timed(sessions.backup_session, 'chrome', profile, 'bench')
+    results['session_backup'] = {'seconds': seconds, 'result': ok}
+    seconds, listed = timed(sessions.list_saved_sessions)
+    results['session_list'] = {'seconds': seconds, 'result': len(listed)}
+    seconds, ok = timed(sessions.restore_session, 'bench', 'chrome', profile)
+    results['session_restore'] = {'seconds': seconds, 'result': ok}
+
+    seconds, stats = timed(helper.clean_browsers, helper.detect_installed_browsers())
+    results['browser_clean'] = {'seconds': seconds, 'result': stats}
+
+    cleaner = main.Cleaner()
+    cleaner.scan_processes = lambda: []
+    seconds, _ = timed(cleaner.run_clean, deep=True, interactive=False)
+    results['run_clean_deep'] = {'seconds': seconds, 'result': None}
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        optimizer = NetworkOptimizer(logger)
+        base = f'http://127.0.0.1:{server.server_address[1]}'
+        optimizer.GOOGLE_ENDPOINTS = [f'{base}/accounts', f'{base}/oauth2', f'{base}/www', f'{base}/apis']
+        optimizer.DNS_TEST_DOMAINS = ['localhost']
+        seconds, report = timed(optimizer.generate_diagnostic_report)
+        results['network_diagnostic_report'] = {'seconds': seconds, 'result': len(report)}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    main.flush_logging()
+    return results
+
+
+def summarize(runs: List[Dict[str, Dict]]) -> Dict[str, Dict]:
+    summary = {}
+    for name in runs[0]:
+        seconds = [run[name]['seconds'] for run in runs]
+        summary[name] = {
+            'median_s': statistics.median(seconds),
+            'min_s': min(seconds),
+            'max_s': max(seconds),
+            'runs_s': seconds,
+            'result': runs[-1][name]['result'],
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=3, help='Repetitions, each on a freshly built fixture')
+    parser.add_argument('--home', help='Fixture directory (default: a temporary directory, removed afterwards)')
+    parser.add_argument('--profiles', type=int, default=2, help='Profiles per Chromium browser')
+    parser.add_argument('--cookies', type=int, default=5000, help='Cookie rows per profile')
+    parser.add_argument('--cache-files', type=int, default=20000, help='Cache entries per profile')
+    parser.add_argument('--storage-entries', type=int, default=2000, help='Local Storage items per profile')
+    parser.add_argument('--leftover-files', type=int, default=2000, help='Files per Antigravity leftover directory')
+    parser.add_argument('--json', default='benchmark-results.json', metavar='FILE', help='Output file (default: %(default)s)')
+    parser.add_argument('--verbose', action='store_true', help='Show the cleaner console output')
+    args = parser.parse_args()
+
+    workdir = args.home or tempfile.mkdtemp(prefix='antigravity-bench-')
+    home = os.path.join(workdir, 'home')
+    point_home_at(home)
+    sys.path.insert(0, SRC_DIR)
+
+    fixture_args = {
+        'profiles': args.profiles, 'cookies': args.cookies, 'cache_files': args.cache_files,
+        'storage_entries': args.storage_entries, 'leftover_files': args.leftover_files,
+    }
+    try:
+        runs = [run_once(home, fixture_args, quiet=not args.verbose) for _ in range(args.runs)]
+    finally:
+        if not args.home:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results = summarize(runs)
+    print(f"{'benchmark':<32} {'median':>10} {'min':>10} {'max':>10}")
+    for name, r in results.items():
+        print(f"{name:<32} {r['median_s']:>9.3f}s {r['min_s']:>9.3f}s {r['max_s']:>9.3f}s")
+
+    with open(args.json, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created': datetime.now().isoformat(),
+            'python': sys.version,
+            'platform': platform.platform(),
+            'runs': args.runs,
+            'fixture': fixture_args,
+            'results': results,
+        }, f, indent=2, default=str)
+    print(f"\nResults written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Startup Time Benchmark
+======================
+
+Measures what each CLI command pays for imports, by running the real entry
+point (`python -X importtime src/main.py <command>`) in a fresh interpreter per
+run, against an empty temporary home and in dry-run mode. Whatever the command
+imports on its way, lazily or not, is counted.
+
+The "baseline" row runs main.py of an earlier revision (default: the commit
+before the subcommand CLI), which loaded every subsystem and showed the menu
+for every invocation; each command is compared with it.
+
+`net-diag` is not measured: it contacts the network.
+
+Usage:
+    python benchmarks/startup_time.py [--runs 7] [--baseline REV] [--json startup.json]
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Command line and stdin of each measured command; "0" leaves the interactive menu
+COMMANDS: Dict[str, Tuple[List[str], str]] = {
+    'clean': (['--dry-run', 'clean', '--yes'], ''),
+    'deep-clean': (['--dry-run', 'deep-clean', '--yes'], ''),
+    'net-reset': (['--dry-run', 'net-reset'], ''),
+    'session list': (['session', 'list'], ''),
+    'quarantine list': (['quarantine', 'list'], ''),
+    'interactive menu': (['--dry-run'], '0\n'),
+}
+
+BASELINE_REV = '135e832'
+
+
+def export_revision(rev: str, dest: str) -> Optional[str]:
+    """Check out src/ of a git revision into dest; returns its main.py, or None without git."""
+    try:
+        archive = subprocess.run(['git', 'archive', rev, 'src'], cwd=REPO_DIR, capture_output=True, check=True)
+        subprocess.run(['tar', '-x', '-C', dest], input=archive.stdout, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return os.path.join(dest, 'src', 'main.py')
+
+
+def measure(main_py: str, argv: List[str], stdin: str, home: str) -> Dict[str, float]:
+    """
+    Run main.py once in a fresh interpreter.
+
+    Returns:
+        Dictionary with import time (sum of top-level cumulative importtime) and
+        process wall time, both in milliseconds
+    """
+    env = dict(os.environ, HOME=home, USERPROFILE=home)
+    env.pop('ANTIGRAVITY_CLEANER_METRICS', None)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', main_py] + argv,
+        cwd=os.path.dirname(main_py), input=stdin, env=env, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    import_us = 0
+    for line in result.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        # Nested imports are indented; top-level cumulative times already include them
+        if parts[2].startswith('  '):
+            continue
+        import_us += int(parts[1])
+
+    return {'import_ms': import_us / 1000, 'wall_ms': wall_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=7, help='Runs per command (median is reported)')
+    parser.add_argument('--baseline', default=BASELINE_REV, help='Revision to compare with (default: %(default)s)')
+    parser.add_argument('--json', metavar='FILE', help='Also write results as JSON')
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix='startup-time-')
+    try:
+        home = os.path.join(work, 'home')
+        # The log file lives on the Desktop
+        os.makedirs(os.path.join(home, 'Desktop'))
+
+        runs_for = {}
+        baseline_main = export_revision(args.baseline, work)
+        if baseline_main:
+            runs_for[f'baseline ({args.baseline})'] = (baseline_main, ['--dry-run'], '0\n')
+        else:
+            print(f"Cannot export {args.baseline} (no git?), measuring HEAD only")
+        head_main = os.path.join(REPO_DIR, 'src', 'main.py')
+        for command, (argv, stdin) in COMMANDS.items():
+            runs_for[command] = (head_main, argv, stdin)
+
+        results = {}
+        for command, (main_py, argv, stdin) in runs_for.items():
+            runs = [measure(main_py, argv, stdin, home) for _ in range(args.runs)]
+            results[command] = {
+                'argv': argv,
+                'import_ms': statistics.median(r['import_ms'] for r in runs),
+                'wall_ms': statistics.median(r['wall_ms'] for r in runs),
+            }
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    # Compared with the baseline, or with the first command if it could not be exported
+    reference_name = next(iter(results))
+    reference = results[reference_name]['import_ms']
+    versus = 'vs ' + reference_name.split()[0]
+    print(f"{'command':<28} {'imports (ms)':>12} {'process (ms)':>13} {versus:>12}")
+    for command, r in results.items():
+        print(f"{command:<28} {r['import_ms']:>12.1f} {r['wall_ms']:>13.1f} {r['import_ms'] / reference:>11.0%}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version, 'runs': args.runs, 'baseline': args.baseline, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
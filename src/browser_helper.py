@@ -15,7 +15,13 @@ import platform
 import shutil
 import sqlite3
 import json
+import configparser
 import glob
+import time
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import namedtuple
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 import logging
@@ -26,6 +32,19 @@ except ImportError:
     print("Missing psutil. Install: pip install psutil")
     sys.exit(1)
 
+from process_table import PROCESS_TABLE, ProcessTable
+from stat_cache import STAT_CACHE, StatCache
+import sqlite_backup
+from cache_entries import CacheScanner, CacheEntry, SIMPLE_INDEX, CACHE2_INDEX
+from keywords import configured_keywords, get_matcher, KeywordMatcher
+from leveldb_reader import LevelDB, TYPE_VALUE
+from spans import traced, bind_span
+from metrics import COOKIES_DELETED
+
+
+# One browser profile. name: directory name; display_name: name shown by the browser
+BrowserProfile = namedtuple('BrowserProfile', ['name', 'path', 'display_name', 'default'])
+
 
 class BrowserHelper:
     """
@@ -73,41 +92,168 @@ class BrowserHelper:
                 'windows': os.path.join(os.environ.get('APPDATA', ''), 'Mozilla', 'Firefox', 'Profiles'),
                 'darwin': os.path.join(os.path.expanduser('~'), 'Library', 'Application Support', 'Firefox', 'Profiles'),
                 'linux': os.path.join(os.path.expanduser('~'), '.mozilla', 'firefox')
+            },
+            # Profiles keep their HTTP cache here, under the same relative path
+            'cache_paths': {
+                'windows': os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Mozilla', 'Firefox', 'Profiles'),
+                'darwin': os.path.join(os.path.expanduser('~'), 'Library', 'Caches', 'Firefox', 'Profiles'),
+                'linux': os.path.join(os.path.expanduser('~'), '.cache', 'mozilla', 'firefox')
             }
         }
     }
     
-    # Keywords to identify Antigravity-related data
-    ANTIGRAVITY_KEYWORDS = [
-        'antigravity',
-        'anti-gravity',
-        'anti_gravity',
-        'deepmind',
-        'gemini-code',
-        'google.com/antigravity',
-        'accounts.google.com/antigravity'
+    # Lowercased process name -> browser key, so one table walk serves every browser
+    PROCESS_INDEX = {
+        name.lower(): key
+        for key, info in SUPPORTED_BROWSERS.items()
+        for name in info['process_names']
+    }
+    
+    # Keywords to identify Antigravity-related data (keywords.DEFAULT_KEYWORDS + $ANTIGRAVITY_CLEANER_KEYWORDS)
+    ANTIGRAVITY_KEYWORDS = configured_keywords()
+    
+    # Chromium cache directories relative to the profile
+    CHROMIUM_CACHE_DIRS = [
+        ('Cache', 'Cache_Data'),
+        ('Cache',),  # before Chromium 93 the entries sat directly in Cache
+        ('Code Cache', 'js'),
+        ('Code Cache', 'wasm'),
+        ('GPUCache',),
     ]
     
-    def __init__(self, logger: logging.Logger, dry_run: bool = False):
+    # Storage types cleaned per profile: stats key -> cleaning method
+    CLEAN_STEPS = {
+        'cookies': 'clean_antigravity_cookies',
+        'localstorage': 'clean_antigravity_localstorage',
+        'cache': 'clean_antigravity_cache_entries',
+    }
+    
+    # Cookie table and host column per browser family
+    COOKIE_TABLES = {
+        'firefox': ('moz_cookies', 'host'),
+        'chromium': ('cookies', 'host_key'),
+    }
+    
+    @staticmethod
+    def _keyword_groups(keywords: List[str]) -> List[Tuple[Optional[str], List[str]]]:
+        """
+        Group keywords behind a shared substring ("gate").
+        
+        Keywords containing another keyword are dropped by the shared matcher
+        (every row they match is already matched). Keywords sharing a substring of
+        4+ characters are grouped, so a row that does not contain the gate is
+        rejected with one LIKE instead of one per keyword.
+        
+        Returns:
+            List of (gate or None, keywords), keywords lowercased
+        """
+        remaining = sorted(get_matcher(keywords).effective, key=len)
+        groups = []
+        while remaining:
+            best = None
+            for keyword in remaining:
+                for i in range(len(keyword)):
+                    for j in range(i + 4, len(keyword) + 1):
+                        cover = [k for k in remaining if keyword[i:j] in k]
+                        if best is None or (len(cover), j - i) > (len(best[1]), len(best[0])):
+                            best = (keyword[i:j], cover)
+            if best is None or len(best[1]) < 2:
+                groups.extend((None, [k]) for k in remaining)
+                break
+            groups.append(best)
+            remaining = [k for k in remaining if k not in best[1]]
+        return groups
+    
+    @classmethod
+    def _keyword_predicate(cls, columns: Tuple[str, ...]) -> Tuple[str, List[str]]:
+        """
+        Build one WHERE clause matching any keyword in any of the columns.
+        
+        LIKE is case-insensitive for ASCII, like the matching it replaces; '%' and
+        '_' in keywords are escaped so 'anti_gravity' is matched literally.
+        
+        Returns:
+            Tuple of (SQL predicate, parameters)
+        """
+        def like(column, text):
+            params.append('%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+            return f"{column} LIKE ? ESCAPE '\\'"
+        
+        terms = []
+        params = []
+        for column in columns:
+            for gate, group in cls._keyword_groups(cls.ANTIGRAVITY_KEYWORDS):
+                if gate is None or gate in group:
+                    terms.extend(like(column, k) for k in group)
+                else:
+                    gate_term = like(column, gate)
+                    terms.append(f"({gate_term} AND ({' OR '.join(like(column, k) for k in group)}))")
+        return '(' + ' OR '.join(terms) + ')', params
+    
+    def __init__(self, logger: logging.Logger, dry_run: bool = False,
+                 process_table: Optional[ProcessTable] = None, home: Optional[str] = None,
+                 stat_cache: Optional[StatCache] = None, backup_dir: Optional[str] = None):
         """
         Initialize BrowserHelper.
         
         Args:
             logger: Logger instance for detailed logging
             dry_run: If True, only simulate operations without actual changes
+            process_table: Process snapshot to query (defaults to the shared one)
+            home: Home directory whose browsers to handle (defaults to the current user)
+            stat_cache: Filesystem metadata cache to query (defaults to the shared one)
+            backup_dir: Where to keep database backups (defaults to ~/.antigravity-cleaner/backups)
         """
         self.logger = logger
         self.dry_run = dry_run
+        self.process_table = process_table or PROCESS_TABLE
+        self.stat_cache = stat_cache or STAT_CACHE
         self.current_os = platform.system().lower()
-        self.backup_dir = os.path.join(os.path.expanduser('~'), '.antigravity-cleaner', 'backups')
+        self.home = home or os.path.expanduser('~')
+        self.backup_dir = backup_dir or os.path.join(os.path.expanduser('~'), '.antigravity-cleaner', 'backups')
+        if not backup_dir and self.home != os.path.expanduser('~'):
+            # Backups of other users' profiles stay with the invoking user, one folder per home
+            self.backup_dir = os.path.join(self.backup_dir, os.path.basename(self.home))
         
         # Create backup directory
         os.makedirs(self.backup_dir, exist_ok=True)
         
+        # Concurrent cleaning: one lock per profile storage, backup names being claimed
+        self._lock = threading.Lock()
+        self._storage_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._claimed_backups = set()
+        
+        # (browser, data path) -> ((registry file, mtime_ns), profiles)
+        self._profile_cache: Dict[Tuple[str, str], Tuple[Tuple[str, int], List[BrowserProfile]]] = {}
+        
         self.logger.info(f"BrowserHelper initialized (OS: {self.current_os}, Dry-run: {dry_run})")
     
+    @property
+    def matcher(self) -> KeywordMatcher:
+        """Compiled matcher for ANTIGRAVITY_KEYWORDS (built once per keyword set)."""
+        return get_matcher(self.ANTIGRAVITY_KEYWORDS)
+    
     # ==================== Browser Detection ====================
     
+    def get_data_path(self, browser: str) -> Optional[str]:
+        """
+        Get the browser's user data directory for this helper's home.
+        
+        Args:
+            browser: Browser key
+        
+        Returns:
+            Data directory path, or None if the browser is not supported on this OS
+        """
+        return self._in_home(self.SUPPORTED_BROWSERS[browser]['data_paths'].get(self.current_os))
+    
+    def _in_home(self, path: Optional[str]) -> Optional[str]:
+        """Move a path under the current user's home to this helper's home."""
+        default_home = os.path.expanduser('~')
+        if path and self.home != default_home and path.startswith(default_home + os.sep):
+            path = self.home + path[len(default_home):]
+        return path
+    
     def detect_installed_browsers(self) -> List[str]:
         """
         Detect which supported browsers are installed.
@@ -119,9 +265,9 @@ class BrowserHelper:
         installed = []
         
         for browser_key, browser_info in self.SUPPORTED_BROWSERS.items():
-            data_path = browser_info['data_paths'].get(self.current_os)
+            data_path = self.get_data_path(browser_key)
             
-            if data_path and os.path.exists(data_path):
+            if data_path and self.stat_cache.exists(data_path):
                 installed.append(browser_key)
                 self.logger.debug(f"Found {browser_info['name']} at {data_path}")
             else:
@@ -140,41 +286,141 @@ class BrowserHelper:
         Returns:
             List of tuples: (profile_name, profile_path)
         """
+        return [(profile.name, profile.path) for profile in self.get_profile_info(browser)]
+    
+    @traced("profiles")
+    def get_profile_info(self, browser: str) -> List[BrowserProfile]:
+        """
+        Get all profiles for a specific browser, with their display names.
+        
+        Profiles are read from the browser's own registry: `Local State`
+        (profile.info_cache) for Chromium browsers, `profiles.ini` for Firefox.
+        The result is cached until that file's mtime changes, so a repeated
+        lookup costs one (cached) stat.
+        
+        Args:
+            browser: Browser key (e.g., 'chrome')
+        
+        Returns:
+            List of BrowserProfile (directory name, path, display name, default flag)
+        """
         if browser not in self.SUPPORTED_BROWSERS:
             self.logger.warning(f"Unsupported browser: {browser}")
             return []
         
-        data_path = self.SUPPORTED_BROWSERS[browser]['data_paths'].get(self.current_os)
-        if not data_path or not os.path.exists(data_path):
+        data_path = self.get_data_path(browser)
+        if not data_path:
             self.logger.warning(f"Browser data path not found: {data_path}")
             return []
         
-        profiles = []
-        
-        # Firefox uses different structure
         if browser == 'firefox':
-            # Firefox profiles are in format: xxxxxxxx.profile_name
-            for item in os.listdir(data_path):
-                profile_path = os.path.join(data_path, item)
-                if os.path.isdir(profile_path) and '.' in item:
-                    profiles.append((item, profile_path))
+            ini = os.path.join(data_path, 'profiles.ini')
+            # Windows and macOS: data_path is the Profiles folder, profiles.ini sits next to it
+            registry = ini if self.stat_cache.exists(ini) else os.path.join(os.path.dirname(data_path), 'profiles.ini')
         else:
-            # Chromium-based browsers
-            # Check for Default profile
-            default_path = os.path.join(data_path, 'Default')
-            if os.path.exists(default_path):
-                profiles.append(('Default', default_path))
-            
-            # Check for Profile 1, Profile 2, etc.
-            for i in range(1, 20):  # Check up to Profile 19
-                profile_name = f'Profile {i}'
-                profile_path = os.path.join(data_path, profile_name)
-                if os.path.exists(profile_path):
-                    profiles.append((profile_name, profile_path))
-        
-        self.logger.debug(f"Found {len(profiles)} profiles for {browser}: {[p[0] for p in profiles]}")
+            registry = os.path.join(data_path, 'Local State')
+        
+        # Without a registry file the folder listing is the source; its mtime changes with new profiles
+        source = registry
+        try:
+            mtime = self.stat_cache.stat(registry).st_mtime_ns
+        except OSError:
+            source = data_path
+            try:
+                mtime = self.stat_cache.stat(data_path).st_mtime_ns
+            except OSError:
+                self.logger.warning(f"Browser data path not found: {data_path}")
+                return []
+        
+        cache_key = (browser, data_path)
+        cached = self._profile_cache.get(cache_key)
+        if cached and cached[0] == (source, mtime):
+            return list(cached[1])
+        
+        profiles = None
+        if source == registry:
+            try:
+                if browser == 'firefox':
+                    profiles = self._read_profiles_ini(registry)
+                else:
+                    profiles = self._read_local_state(registry, data_path)
+            except (OSError, ValueError, KeyError, TypeError, configparser.Error) as e:
+                self.logger.warning(f"Could not read {registry}: {e}")
+        if profiles is None:
+            profiles = self._scan_profile_dirs(browser, data_path)
+        
+        self._profile_cache[cache_key] = ((source, mtime), profiles)
+        self.logger.debug(f"Found {len(profiles)} profiles for {browser}: {[p.name for p in profiles]}")
+        return list(profiles)
+    
+    @staticmethod
+    def _read_local_state(local_state: str, data_path: str) -> List[BrowserProfile]:
+        """Profiles listed in a Chromium `Local State` file (profile.info_cache)."""
+        with open(local_state, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        profile_state = state.get('profile', {})
+        last_used = profile_state.get('last_used', 'Default')
+        profiles = []
+        for name, info in profile_state.get('info_cache', {}).items():
+            path = os.path.join(data_path, name)
+            if os.path.isdir(path):
+                profiles.append(BrowserProfile(name, path, info.get('name') or name, name == last_used))
+        return sorted(profiles, key=BrowserHelper._profile_order)
+    
+    @staticmethod
+    def _profile_order(profile: BrowserProfile) -> Tuple[int, int, str]:
+        """Default first, then Profile 1, 2, ..., 10 in numeric order, then custom names."""
+        number = profile.name[len('Profile '):]
+        if profile.name == 'Default':
+            return (0, 0, '')
+        return (1, int(number), '') if profile.name.startswith('Profile ') and number.isdigit() else (2, 0, profile.name)
+    
+    @staticmethod
+    def _read_profiles_ini(ini_path: str) -> List[BrowserProfile]:
+        """Profiles listed in a Firefox `profiles.ini`."""
+        parser = configparser.RawConfigParser()
+        parser.optionxform = str
+        with open(ini_path, 'r', encoding='utf-8') as f:
+            parser.read_file(f)
+        root = os.path.dirname(ini_path)
+        # Firefox 67+ keeps the profile actually used by each installation in [Install*]
+        install_defaults = {parser.get(section, 'Default', fallback=None)
+                            for section in parser.sections() if section.startswith('Install')}
+        profiles = []
+        for section in parser.sections():
+            if not section.startswith('Profile') or not parser.has_option(section, 'Path'):
+                continue
+            relative_path = parser.get(section, 'Path')
+            if parser.get(section, 'IsRelative', fallback='1') == '1':
+                path = os.path.normpath(os.path.join(root, *relative_path.split('/')))
+            else:
+                path = relative_path
+            if not os.path.isdir(path):
+                continue
+            default = relative_path in install_defaults or parser.get(section, 'Default', fallback='0') == '1'
+            name = os.path.basename(path)
+            profiles.append(BrowserProfile(name, path, parser.get(section, 'Name', fallback=name), default))
         return profiles
     
+    @staticmethod
+    def _scan_profile_dirs(browser: str, data_path: str) -> List[BrowserProfile]:
+        """Fallback without a registry file: profile folders by their naming pattern."""
+        profiles = []
+        try:
+            with os.scandir(data_path) as it:
+                entries = sorted((e for e in it if e.is_dir()), key=lambda e: e.name)
+        except OSError:
+            return []
+        for entry in entries:
+            if browser == 'firefox':
+                # Firefox profiles are in format: xxxxxxxx.profile_name
+                match = '.' in entry.name
+            else:
+                match = entry.name == 'Default' or entry.name.startswith('Profile ')
+            if match:
+                profiles.append(BrowserProfile(entry.name, entry.path, entry.name, entry.name == 'Default'))
+        return profiles if browser == 'firefox' else sorted(profiles, key=BrowserHelper._profile_order)
+    
     # ==================== Process Management ====================
     
     def is_browser_running(self, browser: str) -> bool:
@@ -190,16 +436,7 @@ class BrowserHelper:
         if browser not in self.SUPPORTED_BROWSERS:
             return False
         
-        process_names = self.SUPPORTED_BROWSERS[browser]['process_names']
-        
-        for proc in psutil.process_iter(['name']):
-            try:
-                if proc.info['name'].lower() in [p.lower() for p in process_names]:
-                    return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-        
-        return False
+        return bool(self.process_table.match(self.PROCESS_INDEX).get(browser))
     
     def get_browser_processes(self, browser: str) -> List[psutil.Process]:
         """
@@ -214,21 +451,12 @@ class BrowserHelper:
         if browser not in self.SUPPORTED_BROWSERS:
             return []
         
-        process_names = self.SUPPORTED_BROWSERS[browser]['process_names']
-        processes = []
-        
-        for proc in psutil.process_iter(['pid', 'name']):
-            try:
-                if proc.info['name'].lower() in [p.lower() for p in process_names]:
-                    processes.append(proc)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-        
-        return processes
+        entries = self.process_table.match(self.PROCESS_INDEX).get(browser, [])
+        return self.process_table.to_processes(entries)
     
     def close_browser_gracefully(self, browser: str) -> bool:
         """
-        Attempt to close browser gracefully.
+        Attempt to close browser gracefully (SIGTERM to the whole process tree).
         
         Args:
             browser: Browser key
@@ -247,16 +475,8 @@ class BrowserHelper:
             self.logger.info(f"{browser} is not running")
             return True
         
-        # Try terminate first (graceful)
-        for proc in processes:
-            try:
-                proc.terminate()
-                self.logger.debug(f"Sent terminate signal to PID {proc.pid}")
-            except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
-                self.logger.warning(f"Could not terminate PID {proc.pid}: {e}")
-        
-        # Wait for processes to exit
-        gone, alive = psutil.wait_procs(processes, timeout=5)
+        gone, alive = self.process_table.terminate(processes, escalate=False)
+        self.logger.debug(f"Terminated {len(gone)} {browser} processes (including children)")
         
         if alive:
             self.logger.warning(f"{len(alive)} processes still alive after graceful close")
@@ -267,7 +487,7 @@ class BrowserHelper:
     
     def kill_browser_processes(self, browser: str) -> bool:
         """
-        Force kill browser processes.
+        Force kill browser processes (SIGKILL to the whole process tree).
         
         Args:
             browser: Browser key
@@ -286,15 +506,8 @@ class BrowserHelper:
             self.logger.info(f"No {browser} processes to kill")
             return True
         
-        for proc in processes:
-            try:
-                proc.kill()
-                self.logger.debug(f"Killed PID {proc.pid}")
-            except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
-                self.logger.error(f"Could not kill PID {proc.pid}: {e}")
-        
-        # Verify all killed
-        gone, alive = psutil.wait_procs(processes, timeout=3)
+        gone, alive = self.process_table.terminate(processes, force=True)
+        self.logger.debug(f"Killed {len(gone)} {browser} processes (including children)")
         
         if alive:
             self.logger.error(f"Failed to kill {len(alive)} processes")
@@ -303,37 +516,107 @@ class BrowserHelper:
         self.logger.info(f"Successfully killed all {browser} processes")
         return True
     
+    @traced("stop_browser")
+    def stop_browser(self, browser: str, timeout: float = ProcessTable.TERM_TIMEOUT) -> bool:
+        """
+        Close browser with escalation: SIGTERM to every process in the tree,
+        one shared wait, then SIGKILL only for the processes still alive.
+        
+        Args:
+            browser: Browser key
+            timeout: Seconds to wait for a graceful exit before escalating
+        
+        Returns:
+            True if no browser process is left running
+        """
+        self.logger.info(f"Stopping {browser}...")
+        
+        if self.dry_run:
+            self.logger.info(f"[DRY RUN] Would close {browser}")
+            return True
+        
+        processes = self.get_browser_processes(browser)
+        if not processes:
+            self.logger.info(f"{browser} is not running")
+            return True
+        
+        start = time.monotonic()
+        gone, alive = self.process_table.terminate(processes, timeout=timeout)
+        elapsed = time.monotonic() - start
+        
+        if alive:
+            self.logger.error(f"Failed to stop {len(alive)} {browser} processes")
+            return False
+        
+        self.logger.info(f"Stopped {len(gone)} {browser} processes in {elapsed:.2f}s")
+        return True
+    
     # ==================== Backup Operations ====================
     
-    def create_backup(self, file_path: str) -> Optional[str]:
+    def create_backup(self, file_path: str, compact: bool = False) -> Optional[str]:
         """
         Create backup of a file before modification.
         
+        SQLite databases are copied consistently (pending -wal/-journal changes
+        included) by sqlite_backup: a reflink clone where the filesystem supports
+        it, otherwise the online backup API. Other files are copied as they are.
+        
         Args:
             file_path: Path to file to backup
+            compact: Write a VACUUMed copy of a database (no free pages)
         
         Returns:
             Path to backup file, or None if failed
         """
-        if not os.path.exists(file_path):
+        if not self.stat_cache.exists(file_path):
             self.logger.warning(f"Cannot backup non-existent file: {file_path}")
             return None
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = os.path.basename(file_path)
         backup_path = os.path.join(self.backup_dir, f"{filename}.backup_{timestamp}")
+        # Profiles share file names (Cookies); several backups can land in the same second,
+        # from concurrent profile jobs too
+        with self._lock:
+            suffix = 1
+            while self.stat_cache.exists(backup_path) or backup_path in self._claimed_backups:
+                backup_path = os.path.join(self.backup_dir, f"{filename}.backup_{timestamp}_{suffix}")
+                suffix += 1
+            self._claimed_backups.add(backup_path)
         
         if self.dry_run:
             self.logger.info(f"[DRY RUN] Would backup {file_path} to {backup_path}")
             return backup_path
         
         try:
-            shutil.copy2(file_path, backup_path)
-            self.logger.info(f"Created backup: {backup_path}")
+            if sqlite_backup.is_database(file_path):
+                start = time.monotonic()
+                method = sqlite_backup.backup_database(file_path, backup_path, compact=compact,
+                                                       progress=self._backup_progress(file_path))
+                self.logger.info(f"Created backup: {backup_path} ({method}, {time.monotonic() - start:.2f}s)")
+            else:
+                shutil.copy2(file_path, backup_path)
+                self.logger.info(f"Created backup: {backup_path}")
             return backup_path
         except Exception as e:
             self.logger.error(f"Backup failed: {e}")
+            try:
+                os.unlink(backup_path)
+            except OSError:
+                pass
             return None
+        finally:
+            self.stat_cache.invalidate(backup_path)
+    
+    def _backup_progress(self, file_path: str):
+        """Progress callback for sqlite_backup: log every 25% of a large copy."""
+        reported = [0]
+        
+        def progress(copied: int, total: int):
+            if total >= 4 * sqlite_backup.BACKUP_STEP_PAGES and copied * 4 >= (reported[0] + 1) * total:
+                reported[0] = copied * 4 // total
+                self.logger.debug(f"Backing up {os.path.basename(file_path)}: {copied}/{total} pages")
+        return progress
     
     def restore_backup(self, backup_path: str, original_path: str) -> bool:
         """
@@ -346,7 +629,7 @@ class BrowserHelper:
         Returns:
             True if restored successfully
         """
-        if not os.path.exists(backup_path):
+        if not self.stat_cache.exists(backup_path):
             self.logger.error(f"Backup file not found: {backup_path}")
             return False
         
@@ -355,15 +638,22 @@ class BrowserHelper:
             return True
         
         try:
-            shutil.copy2(backup_path, original_path)
+            if sqlite_backup.is_database(backup_path) and self.stat_cache.exists(original_path):
+                # Written through SQLite, so the live database's -wal/-journal stay consistent
+                sqlite_backup.restore_database(backup_path, original_path)
+            else:
+                shutil.copy2(backup_path, original_path)
             self.logger.info(f"Restored from backup: {original_path}")
             return True
         except Exception as e:
             self.logger.error(f"Restore failed: {e}")
             return False
+        finally:
+            self.stat_cache.invalidate(original_path)
     
     # ==================== Selective Cleaning ====================
     
+    @traced("cookies")
     def clean_antigravity_cookies(self, browser: str, profile_path: str) -> int:
         """
         Remove only Antigravity-related cookies from browser.
@@ -382,10 +672,10 @@ class BrowserHelper:
         else:
             # Chromium-based
             cookie_db = os.path.join(profile_path, 'Network', 'Cookies')
-            if not os.path.exists(cookie_db):
+            if not self.stat_cache.exists(cookie_db):
                 cookie_db = os.path.join(profile_path, 'Cookies')  # Older Chrome versions
         
-        if not os.path.exists(cookie_db):
+        if not self.stat_cache.exists(cookie_db):
             self.logger.warning(f"Cookie database not found: {cookie_db}")
             return 0
         
@@ -395,33 +685,35 @@ class BrowserHelper:
             self.logger.error("Backup failed, aborting cookie cleaning")
             return 0
         
-        deleted_count = 0
+        table, host_column = self.COOKIE_TABLES.get(browser, self.COOKIE_TABLES['chromium'])
+        predicate, params = self._keyword_predicate((host_column, 'name'))
         
         try:
-            # Connect to SQLite database
-            conn = sqlite3.connect(cookie_db)
-            cursor = conn.cursor()
-            
-            # Find Antigravity-related cookies
-            for keyword in self.ANTIGRAVITY_KEYWORDS:
+            # Autocommit mode: the transaction below is managed explicitly
+            conn = sqlite3.connect(cookie_db, isolation_level=None)
+            try:
+                conn.execute("PRAGMA temp_store = MEMORY")
+                conn.execute("PRAGMA cache_size = -65536")
+                # The backup above covers a crash, so the commit needs no full fsync barrier
+                conn.execute("PRAGMA synchronous = NORMAL")
+                
+                # One scan for all keywords; a row matching several keywords counts once
                 if self.dry_run:
-                    cursor.execute("SELECT COUNT(*) FROM cookies WHERE host_key LIKE ? OR name LIKE ?", 
-                                   (f'%{keyword}%', f'%{keyword}%'))
-                    count = cursor.fetchone()[0]
-                    self.logger.info(f"[DRY RUN] Would delete {count} cookies matching '{keyword}'")
-                    deleted_count += count
+                    deleted_count = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {predicate}", params).fetchone()[0]
+                    self.logger.info(f"[DRY RUN] Would delete {deleted_count} Antigravity cookies")
                 else:
-                    cursor.execute("DELETE FROM cookies WHERE host_key LIKE ? OR name LIKE ?", 
-                                   (f'%{keyword}%', f'%{keyword}%'))
-                    deleted = cursor.rowcount
-                    if deleted > 0:
-                        self.logger.debug(f"Deleted {deleted} cookies matching '{keyword}'")
-                        deleted_count += deleted
-            
-            if not self.dry_run:
-                conn.commit()
-            
-            conn.close()
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        deleted_count = conn.execute(f"DELETE FROM {table} WHERE {predicate}", params).rowcount
+                        conn.execute("COMMIT")
+                    except sqlite3.Error:
+                        conn.execute("ROLLBACK")
+                        raise
+                    COOKIES_DELETED.inc(deleted_count, browser=browser)
+            finally:
+                conn.close()
+                if not self.dry_run:
+                    self.stat_cache.invalidate(cookie_db)
             
             self.logger.info(f"Cleaned {deleted_count} Antigravity cookies")
             return deleted_count
@@ -433,6 +725,7 @@ class BrowserHelper:
                 self.restore_backup(backup, cookie_db)
             return 0
     
+    @traced("localstorage")
     def clean_antigravity_localstorage(self, browser: str, profile_path: str) -> int:
         """
         Remove Antigravity-related LocalStorage data.
@@ -451,32 +744,123 @@ class BrowserHelper:
         else:
             ls_path = os.path.join(profile_path, 'Local Storage', 'leveldb')
         
-        if not os.path.exists(ls_path):
+        if not self.stat_cache.exists(ls_path):
             self.logger.warning(f"LocalStorage not found: {ls_path}")
             return 0
         
         deleted_count = 0
         
-        # For Chromium browsers, LocalStorage is in LevelDB format (complex)
-        # For safety, we'll only delete specific files matching keywords
-        if browser != 'firefox' and os.path.isdir(ls_path):
-            for file in os.listdir(ls_path):
-                file_path = os.path.join(ls_path, file)
-                if any(keyword in file.lower() for keyword in self.ANTIGRAVITY_KEYWORDS):
-                    if self.dry_run:
-                        self.logger.info(f"[DRY RUN] Would delete: {file_path}")
-                        deleted_count += 1
-                    else:
-                        try:
-                            os.remove(file_path)
-                            self.logger.debug(f"Deleted: {file_path}")
-                            deleted_count += 1
-                        except Exception as e:
-                            self.logger.error(f"Failed to delete {file_path}: {e}")
+        if browser == 'firefox':
+            deleted_count = self._clean_webappsstore(ls_path)
+        elif self.stat_cache.isdir(ls_path):
+            deleted_count = self._clean_chromium_localstorage(ls_path)
         
         self.logger.info(f"Cleaned {deleted_count} LocalStorage items")
         return deleted_count
     
+    def _clean_webappsstore(self, db_path: str) -> int:
+        """
+        Delete the LocalStorage rows of Antigravity origins from Firefox's webappsstore.sqlite.
+        
+        originKey holds the reversed host, then scheme and port
+        (`elgoog.ytivargitna.:https:443`). The distinct origins are read from the
+        (originAttributes, originKey, key) index, matched here, and their rows are
+        deleted with one statement that looks them up in that index.
+        
+        Returns:
+            Number of rows deleted
+        """
+        matcher = self.matcher
+        
+        def is_antigravity(origin_key: str) -> bool:
+            reversed_host, _, rest = (origin_key or '').partition(':')
+            scheme = rest.partition(':')[0]
+            return matcher(f"{scheme}://{reversed_host[::-1].lstrip('.')}")
+        
+        try:
+            conn = sqlite3.connect(db_path, isolation_level=None)
+            try:
+                conn.execute("PRAGMA busy_timeout = 5000")
+                # Covering scan of the index, far smaller than the table with its values
+                origins = [row for row in conn.execute(
+                    "SELECT DISTINCT originAttributes, originKey FROM webappsstore2") if is_antigravity(row[1])]
+                if not origins:
+                    return 0
+                # A row-value IN over a subquery is looked up in the index; IN (VALUES ...) would scan the table
+                values = ', '.join(['(?, ?)'] * len(origins))
+                where = f"(originAttributes, originKey) IN (SELECT column1, column2 FROM (VALUES {values}))"
+                params = [value for origin in origins for value in origin]
+                if self.dry_run:
+                    count = conn.execute(f"SELECT COUNT(*) FROM webappsstore2 WHERE {where}", params).fetchone()[0]
+                    self.logger.info(f"[DRY RUN] Would delete {count} LocalStorage items from {len(origins)} origins")
+                    return count
+                
+                backup = self.create_backup(db_path)
+                if not backup:
+                    self.logger.error("Backup failed, aborting LocalStorage cleaning")
+                    return 0
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    count = conn.execute(f"DELETE FROM webappsstore2 WHERE {where}", params).rowcount
+                    conn.execute("COMMIT")
+                except sqlite3.Error:
+                    conn.execute("ROLLBACK")
+                    raise
+                finally:
+                    self.stat_cache.invalidate(db_path)
+                return count
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.logger.error(f"SQLite error in {db_path}: {e}")
+            return 0
+    
+    def _clean_chromium_localstorage(self, ls_path: str) -> int:
+        """
+        Delete the LocalStorage items of Antigravity origins from a LevelDB directory.
+        
+        Keys are `_<origin>\\x00<item>` plus `META:<origin>` / `METAACCESS:<origin>`;
+        they are deleted with tombstones in a new log file, which the browser
+        applies (and compacts away) the next time it opens the database.
+        
+        Returns:
+            Number of LocalStorage items deleted
+        """
+        matcher = self.matcher
+        
+        def is_antigravity(key: bytes) -> bool:
+            if key.startswith(b'_'):
+                origin = key[1:].partition(b'\x00')[0]
+            else:
+                prefix, sep, origin = key.partition(b':')
+                if not sep or prefix not in (b'META', b'METAACCESS'):
+                    return False
+            return matcher(origin)
+        
+        db = LevelDB(ls_path)
+        try:
+            with db.lock():
+                start = time.monotonic()
+                states, last_sequence = db.scan(is_antigravity)
+                keys = [key for key, state in states.items() if state.type == TYPE_VALUE]
+                items = sum(1 for key in keys if key.startswith(b'_'))
+                self.logger.debug(f"Scanned {ls_path} in {time.monotonic() - start:.2f}s: {items} Antigravity items")
+                if not keys:
+                    return 0
+                if self.dry_run:
+                    self.logger.info(f"[DRY RUN] Would delete {items} LocalStorage items from {ls_path}")
+                    return items
+                log_path = db.delete(keys, last_sequence)
+                self.stat_cache.invalidate(ls_path)
+                self.logger.debug(f"Wrote {len(keys)} deletions to {log_path}")
+                return items
+        except BlockingIOError:
+            self.logger.warning(f"LocalStorage is in use (close the browser first): {ls_path}")
+        except (OSError, ValueError, IndexError, struct.error) as e:
+            self.logger.error(f"Failed to read LocalStorage {ls_path}: {e}")
+        return 0
+    
+    @traced("cache")
     def clean_antigravity_cache_entries(self, browser: str, profile_path: str) -> int:
         """
         Remove Antigravity-related cache entries.
@@ -490,42 +874,133 @@ class BrowserHelper:
         """
         self.logger.info(f"Cleaning Antigravity cache from {browser} profile...")
         
-        cache_paths = []
-        
         if browser == 'firefox':
-            cache_paths.append(os.path.join(profile_path, 'cache2', 'entries'))
-        else:
-            # Chromium-based
-            cache_paths.append(os.path.join(profile_path, 'Cache', 'Cache_Data'))
-            cache_paths.append(os.path.join(profile_path, 'Code Cache'))
-            cache_paths.append(os.path.join(profile_path, 'GPUCache'))
+            return self._clean_firefox_cache(profile_path)
+        return self._clean_chromium_cache(profile_path)
+    
+    def _chromium_cache_dirs(self, profile_path: str) -> List[str]:
+        """Cache directories of a Chromium profile (HTTP, code, GPU and Cache Storage caches)."""
+        dirs = [os.path.join(profile_path, *parts) for parts in self.CHROMIUM_CACHE_DIRS]
+        # Cache Storage (service workers): one Simple Cache per origin and cache name
+        dirs += sorted(glob.glob(os.path.join(glob.escape(profile_path), 'Service Worker', 'CacheStorage', '*', '*')))
+        return [d for d in dirs if self.stat_cache.isdir(d)]
+    
+    def _clean_chromium_cache(self, profile_path: str) -> int:
+        """
+        Delete the Chromium cache entries whose URL key matches a keyword.
+        
+        Simple Cache entries are deleted one by one (the index is rebuilt by the
+        browser); a blockfile cache holding a match is reset as a whole.
+        
+        Returns:
+            Number of matching cache entries
+        """
+        scanner = CacheScanner(self.matcher)
+        deleted_count = 0
         
+        for cache_dir in self._chromium_cache_dirs(profile_path):
+            start = time.monotonic()
+            fmt, read, matches = scanner.scan(cache_dir)
+            self.logger.debug(f"Read {read} {fmt} cache keys in {cache_dir} ({time.monotonic() - start:.2f}s)")
+            if not matches:
+                continue
+            
+            if self.dry_run:
+                for entry in matches:
+                    self.logger.debug(f"[DRY RUN] Would delete cache entry: {entry.key.decode('utf-8', 'replace')}")
+                deleted_count += len(matches)
+                continue
+            
+            if fmt == 'blockfile':
+                self.logger.info(f"Resetting blockfile cache {cache_dir} ({len(matches)} of {read} entries match)")
+            deleted = self._delete_cache_entries(matches)
+            deleted_count += len(deleted)
+            self.stat_cache.invalidate(cache_dir)
+            
+            if fmt == 'simple' and deleted:
+                # A stale index would still count the deleted entries; Chromium rebuilds a missing one
+                try:
+                    os.remove(os.path.join(cache_dir, SIMPLE_INDEX))
+                except OSError:
+                    pass
+        
+        self.logger.info(f"Cleaned {deleted_count} cache entries")
+        return deleted_count
+    
+    def _firefox_cache_dirs(self, profile_path: str) -> List[str]:
+        """cache2 entry directories of a Firefox profile (in the profile and in the local cache root)."""
+        dirs = [os.path.join(profile_path, 'cache2', 'entries')]
+        data_path = self.get_data_path('firefox')
+        cache_root = self._in_home(self.SUPPORTED_BROWSERS['firefox']['cache_paths'].get(self.current_os))
+        if data_path and cache_root:
+            relative = os.path.relpath(profile_path, data_path)
+            if not relative.startswith(os.pardir):
+                dirs.append(os.path.join(cache_root, relative, 'cache2', 'entries'))
+        return [d for d in dirs if self.stat_cache.isdir(d)]
+    
+    def _clean_firefox_cache(self, profile_path: str) -> int:
+        """
+        Delete the Firefox cache2 entries whose URL key matches a keyword.
+        
+        The cache index is dropped afterwards; Firefox rebuilds it from the entries.
+        
+        Returns:
+            Number of matching cache entries
+        """
+        scanner = CacheScanner(self.matcher)
         deleted_count = 0
         
-        for cache_path in cache_paths:
-            if not os.path.exists(cache_path):
+        for entries_dir in self._firefox_cache_dirs(profile_path):
+            start = time.monotonic()
+            read, matches = scanner.scan_cache2(entries_dir)
+            self.logger.debug(f"Read {read} cache2 keys in {entries_dir} ({time.monotonic() - start:.2f}s)")
+            if not matches:
+                continue
+            
+            if self.dry_run:
+                for entry in matches:
+                    self.logger.debug(f"[DRY RUN] Would delete cache entry: {entry.key.decode('utf-8', 'replace')}")
+                deleted_count += len(matches)
                 continue
             
-            if os.path.isdir(cache_path):
-                for root, dirs, files in os.walk(cache_path):
-                    for file in files:
-                        # Only delete files with Antigravity keywords in name
-                        if any(keyword in file.lower() for keyword in self.ANTIGRAVITY_KEYWORDS):
-                            file_path = os.path.join(root, file)
-                            if self.dry_run:
-                                self.logger.debug(f"[DRY RUN] Would delete cache: {file_path}")
-                                deleted_count += 1
-                            else:
-                                try:
-                                    os.remove(file_path)
-                                    self.logger.debug(f"Deleted cache: {file_path}")
-                                    deleted_count += 1
-                                except Exception as e:
-                                    self.logger.error(f"Failed to delete {file_path}: {e}")
+            deleted = self._delete_cache_entries(matches)
+            deleted_count += len(deleted)
+            self.stat_cache.invalidate(os.path.dirname(entries_dir))
+            if deleted:
+                try:
+                    os.remove(os.path.join(os.path.dirname(entries_dir), CACHE2_INDEX))
+                except OSError:
+                    pass
         
         self.logger.info(f"Cleaned {deleted_count} cache entries")
         return deleted_count
     
+    def _delete_cache_entries(self, matches: List[CacheEntry]) -> List[CacheEntry]:
+        """
+        Delete the files of matching cache entries on a thread pool.
+        
+        Returns:
+            Entries whose files are all gone
+        """
+        files = {path for entry in matches for path in entry.files}
+        
+        def remove(path: str) -> Optional[str]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.error(f"Failed to delete {path}: {e}")
+                return path
+            return None
+        
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4)) as pool:
+            failed = {path for path in pool.map(remove, files) if path}
+        deleted = [entry for entry in matches if not failed.intersection(entry.files)]
+        for entry in deleted:
+            self.logger.debug(f"Deleted cache entry: {entry.key.decode('utf-8', 'replace')}")
+        return deleted
+    
     def clean_browser_completely(self, browser: str) -> Dict[str, int]:
         """
         Clean all Antigravity traces from a browser (all profiles).
@@ -536,43 +1011,84 @@ class BrowserHelper:
         Returns:
             Dictionary with cleaning statistics
         """
-        self.logger.info(f"Starting complete cleaning for {browser}...")
+        return self.clean_browsers([browser])[browser]
+    
+    def _storage_lock(self, profile_path: str, step: str) -> threading.Lock:
+        """Lock of one profile storage (cookie database, LocalStorage, cache)."""
+        key = (os.path.realpath(profile_path), step)
+        with self._lock:
+            lock = self._storage_locks.get(key)
+            if lock is None:
+                lock = self._storage_locks[key] = threading.Lock()
+            return lock
+    
+    def _clean_step(self, browser: str, profile_name: str, profile_path: str, step: str) -> int:
+        # Symlinked or repeated profiles map to the same lock, so a database is never cleaned twice at once
+        with self._storage_lock(profile_path, step):
+            self.logger.debug(f"Cleaning {step} of {browser} profile {profile_name}")
+            return getattr(self, self.CLEAN_STEPS[step])(browser, profile_path)
+    
+    @traced("clean_browser")
+    def clean_browsers(self, browsers: List[str], max_workers: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Clean all Antigravity traces from several browsers, concurrently.
         
-        stats = {
-            'cookies': 0,
-            'localstorage': 0,
-            'cache': 0,
-            'profiles_cleaned': 0
-        }
+        Every browser x profile x storage type (cookies, LocalStorage, cache) is
+        one job on a bounded thread pool. Jobs touch separate files, so the wall
+        time approaches that of the slowest profile instead of the sum of all.
         
-        # Check if browser is running
-        if self.is_browser_running(browser):
-            self.logger.warning(f"{browser} is currently running")
-            if not self.close_browser_gracefully(browser):
-                self.logger.warning("Graceful close failed, attempting force kill...")
-                if not self.kill_browser_processes(browser):
-                    self.logger.error(f"Could not close {browser}. Aborting cleaning.")
-                    return stats
-        
-        # Get all profiles
-        profiles = self.get_browser_profiles(browser)
-        
-        if not profiles:
-            self.logger.warning(f"No profiles found for {browser}")
-            return stats
-        
-        # Clean each profile
-        for profile_name, profile_path in profiles:
-            self.logger.info(f"Cleaning profile: {profile_name}")
-            
-            stats['cookies'] += self.clean_antigravity_cookies(browser, profile_path)
-            stats['localstorage'] += self.clean_antigravity_localstorage(browser, profile_path)
-            stats['cache'] += self.clean_antigravity_cache_entries(browser, profile_path)
-            stats['profiles_cleaned'] += 1
+        Args:
+            browsers: Browser keys
+            max_workers: Concurrent jobs (default: CPUs, between 2 and 8)
         
-        self.logger.info(f"Cleaning complete for {browser}: {stats}")
-        return stats
-
+        Returns:
+            Dictionary of cleaning statistics per browser
+        """
+        results = {}
+        jobs = []
+        
+        # One process-table snapshot, and one stat per data path and registry, for every browser
+        with self.process_table.hold(), self.stat_cache.hold():
+            for browser in browsers:
+                self.logger.info(f"Starting complete cleaning for {browser}...")
+                stats = results[browser] = {step: 0 for step in self.CLEAN_STEPS}
+                stats['profiles_cleaned'] = 0
+                
+                # Check if browser is running
+                if self.is_browser_running(browser):
+                    self.logger.warning(f"{browser} is currently running")
+                    if not self.stop_browser(browser):
+                        self.logger.error(f"Could not close {browser}. Aborting cleaning.")
+                        continue
+                
+                # Get all profiles
+                profiles = self.get_browser_profiles(browser)
+                if not profiles:
+                    self.logger.warning(f"No profiles found for {browser}")
+                    continue
+                
+                for profile_name, profile_path in profiles:
+                    self.logger.info(f"Cleaning profile: {profile_name}")
+                    stats['profiles_cleaned'] += 1
+                    jobs += [(browser, profile_name, profile_path, step) for step in self.CLEAN_STEPS]
+        
+        if jobs:
+            # Cache walks take longest: start them first, so none is left running alone at the end
+            slowest_first = ('cache', 'localstorage', 'cookies')
+            jobs.sort(key=lambda job: slowest_first.index(job[3]))
+            workers = max_workers or min(8, max(2, os.cpu_count() or 1))
+            with ThreadPoolExecutor(max_workers=min(workers, len(jobs)), thread_name_prefix='browser-clean') as pool:
+                futures = {pool.submit(bind_span(self._clean_step), *job): job for job in jobs}
+                for future in as_completed(futures):
+                    browser, profile_name, _, step = futures[future]
+                    try:
+                        results[browser][step] += future.result()
+                    except Exception as e:
+                        self.logger.error(f"Failed to clean {step} of {browser} profile {profile_name}: {e}")
+        
+        for browser, stats in results.items():
+            self.logger.info(f"Cleaning complete for {browser}: {stats}")
+        return results
 
 if __name__ == "__main__":
     # Test code
@@ -587,7 +1103,7 @@ if __name__ == "__main__":
     browsers = helper.detect_installed_browsers()
     
     for browser in browsers:
-        profiles = helper.get_browser_profiles(browser)
+        profiles = helper.get_profile_info(browser)
         print(f"\n{browser}: {len(profiles)} profiles")
-        for name, path in profiles:
-            print(f"  - {name}: {path}")
+        for profile in profiles:
+            print(f"  - {profile.name} ({profile.display_name}): {profile.path}")
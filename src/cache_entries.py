@@ -0,0 +1,374 @@
+"""
+Cache Entries Module
+====================
+
+Reads the URL keys of browser HTTP cache entries, so cache cleaning can match
+what an entry caches instead of its (hashed) file name.
+
+- Simple Cache (Chromium `Cache/Cache_Data`, `Code Cache/js|wasm`, most
+  `GPUCache` dirs): one `<hash>_0` file per entry, starting with a 24-byte
+  SimpleFileHeader followed by the key. Only that header page is read.
+- Blockfile cache (older Chromium and Edge caches): EntryStore records in the
+  256-byte-block `data_N` files, read through one mmap per file. Entries are
+  validated with their self_hash before their key is trusted.
+- Firefox cache2 (`cache2/entries`): one file per entry, data first and the
+  metadata (hashes, header, key) after it. The metadata offset is stored in the
+  last 4 bytes, so only the tail of each file is read.
+
+Directories are listed with os.scandir and the entry files are read on a
+thread pool in chunks, so memory stays bounded by the number of matches.
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import re
+import mmap
+import struct
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# Matching entry. files: every file holding the entry's data (to delete together)
+CacheEntry = namedtuple('CacheEntry', ['key', 'files'])
+
+# ==================== Simple Cache ====================
+
+SIMPLE_INITIAL_MAGIC = 0xFCFB6D1BA7725C30
+SIMPLE_HEADER = struct.Struct('<QIII4x')  # magic, version, key_length, key_hash
+SIMPLE_MAX_KEY = 64 * 1024
+# Sibling files of <hash>_0: stream 2 and sparse data
+SIMPLE_SIBLINGS = ('_1', '_s')
+# Rebuilt from the entry files by Chromium when missing
+SIMPLE_INDEX = os.path.join('index-dir', 'the-real-index')
+
+# ==================== Blockfile Cache ====================
+
+INDEX_MAGIC = 0xC103CAC3
+BLOCK_MAGIC = 0xC104CAC3
+BLOCK_HEADER_SIZE = 8192
+BLOCK_HEADER = struct.Struct('<IIhhiii')  # magic, version, this_file, next_file, entry_size, num_entries, max_entries
+ENTRY_BLOCK_SIZE = 256
+# hash, next, rankings_node, reuse_count, refetch_count, state, creation_time, key_len, long_key
+ENTRY_STORE = struct.Struct('<IIIiiiQiI')
+ENTRY_SELF_HASH_OFFSET = 92
+ENTRY_KEY_OFFSET = 96
+ENTRY_STATES = (0, 1, 2)  # ENTRY_NORMAL, ENTRY_EVICTED, ENTRY_DOOMED
+BLOCK_SIZES = {1: 36, 2: 256, 3: 1024, 4: 4096, 6: 104, 7: 48}
+
+# ==================== Firefox cache2 ====================
+
+CACHE2_CHUNK_SIZE = 256 * 1024
+# version, fetchCount, lastFetched, lastModified, frecency, expirationTime, keySize[, flags]
+CACHE2_HEADER_V1 = struct.Struct('>7I')
+CACHE2_HEADER = struct.Struct('>8I')
+CACHE2_VERSIONS = (1, 2, 3)
+CACHE2_TAIL_READ = 4096
+# Rebuilt from the entry files by Firefox when missing
+CACHE2_INDEX = 'index'
+
+
+def super_fast_hash(data: bytes) -> int:
+    """Paul Hsieh's SuperFastHash, as used by Chromium for blockfile hashes."""
+    length = len(data)
+    if not length:
+        return 0
+    mask = 0xFFFFFFFF
+    h = length
+    end = length & ~3
+    for i in range(0, end, 4):
+        h = (h + (data[i] | data[i + 1] << 8)) & mask
+        tmp = (((data[i + 2] | data[i + 3] << 8) << 11) ^ h) & mask
+        h = ((h << 16) & mask) ^ tmp
+        h = (h + (h >> 11)) & mask
+    rem = length & 3
+    if rem == 3:
+        h = (h + (data[end] | data[end + 1] << 8)) & mask
+        h ^= (h << 16) & mask
+        # (signed char) << 18
+        h ^= ((data[end + 2] - 256 if data[end + 2] > 127 else data[end + 2]) << 18) & mask
+        h = (h + (h >> 11)) & mask
+    elif rem == 2:
+        h = (h + (data[end] | data[end + 1] << 8)) & mask
+        h ^= (h << 11) & mask
+        h = (h + (h >> 17)) & mask
+    elif rem == 1:
+        h = (h + (data[end] - 256 if data[end] > 127 else data[end])) & mask
+        h ^= (h << 10) & mask
+        h = (h + (h >> 1)) & mask
+    h ^= (h << 3) & mask
+    h = (h + (h >> 5)) & mask
+    h ^= (h << 4) & mask
+    h = (h + (h >> 17)) & mask
+    h ^= (h << 25) & mask
+    h = (h + (h >> 6)) & mask
+    return h
+
+
+def detect_format(directory: str) -> Optional[str]:
+    """'blockfile', 'simple' or None (no cache in this directory)."""
+    try:
+        with open(os.path.join(directory, 'index'), 'rb') as f:
+            magic = f.read(4)
+    except OSError:
+        return None
+    if len(magic) == 4 and struct.unpack('<I', magic)[0] == INDEX_MAGIC:
+        return 'blockfile'
+    return 'simple'
+
+
+def read_simple_key(path: str) -> Optional[bytes]:
+    """Key of a Simple Cache entry file, or None if it is not one."""
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    except OSError:
+        return None
+    try:
+        # Entry files are small: one read() beats mmap + page fault + munmap here
+        head = os.read(fd, 4096)
+        if len(head) < SIMPLE_HEADER.size:
+            return None
+        magic, _version, key_length, _key_hash = SIMPLE_HEADER.unpack_from(head)
+        if magic != SIMPLE_INITIAL_MAGIC or key_length > SIMPLE_MAX_KEY:
+            return None
+        end = SIMPLE_HEADER.size + key_length
+        if end > len(head):
+            head += os.read(fd, end - len(head))
+        return head[SIMPLE_HEADER.size:end]
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def read_cache2_key(path: str) -> Optional[bytes]:
+    """Key of a Firefox cache2 entry file (e.g. `a,:https://...`), or None if it is not one."""
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    except OSError:
+        return None
+    try:
+        size = os.fstat(fd).st_size
+        if size < 4 + CACHE2_HEADER_V1.size:
+            return None
+        # The metadata usually fits in the last page: one read for offset and key
+        tail_start = max(0, size - CACHE2_TAIL_READ)
+        os.lseek(fd, tail_start, os.SEEK_SET)
+        tail = os.read(fd, size - tail_start)
+        offset = struct.unpack_from('>I', tail, len(tail) - 4)[0]
+        if offset > size - 4 - CACHE2_HEADER_V1.size:
+            return None
+        if offset < tail_start:
+            os.lseek(fd, offset, os.SEEK_SET)
+            tail = os.read(fd, size - offset)
+            tail_start = offset
+        # Metadata: hash, one 16-bit hash per data chunk, header, key
+        pos = offset - tail_start + 4 + 2 * ((offset + CACHE2_CHUNK_SIZE - 1) // CACHE2_CHUNK_SIZE)
+        if pos + CACHE2_HEADER_V1.size > len(tail) - 4:
+            return None
+        version = struct.unpack_from('>I', tail, pos)[0]
+        if version not in CACHE2_VERSIONS:
+            return None
+        header = CACHE2_HEADER_V1 if version == 1 else CACHE2_HEADER
+        if pos + header.size > len(tail) - 4:
+            return None
+        key_size = header.unpack_from(tail, pos)[6]
+        start = pos + header.size
+        if start + key_size > len(tail) - 4:
+            return None
+        return tail[start:start + key_size]
+    except (OSError, struct.error):
+        return None
+    finally:
+        os.close(fd)
+
+
+class CacheScanner:
+    """
+    Finds cache entries whose key matches.
+
+    Features:
+    - Simple Cache and blockfile formats, detected per directory; Firefox cache2
+    - Only entry headers are read (blockfile data files through mmap)
+    - Entry files are read on a thread pool in streaming chunks
+    """
+
+    CHUNK_SIZE = 256
+
+    def __init__(self, matcher: Callable[[bytes], bool], max_workers: Optional[int] = None):
+        """
+        Initialize CacheScanner.
+
+        Args:
+            matcher: Called with each entry key (bytes); True selects the entry
+                (e.g. a keywords.KeywordMatcher)
+            max_workers: Reader threads (default: CPUs + 4, at most 32)
+        """
+        self.matcher = matcher
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+
+    def scan(self, directory: str) -> Tuple[Optional[str], int, List[CacheEntry]]:
+        """
+        Scan one cache directory.
+
+        Returns:
+            Tuple of (format, entries read, matching entries)
+        """
+        fmt = detect_format(directory)
+        if fmt == 'blockfile':
+            return (fmt,) + self.scan_blockfile(directory)
+        if fmt is None and not os.path.isdir(directory):
+            return None, 0, []
+        return ('simple',) + self.scan_simple(directory)
+
+    # ==================== Simple Cache ====================
+
+    def _simple_chunk(self, directory: str, names: List[str]) -> Tuple[int, List[CacheEntry]]:
+        read = 0
+        matches = []
+        for name in names:
+            path = os.path.join(directory, name)
+            key = read_simple_key(path)
+            if key is None:
+                continue
+            read += 1
+            if self.matcher(key):
+                stem = path[:-2]
+                matches.append(CacheEntry(key, [path] + [stem + s for s in SIMPLE_SIBLINGS if os.path.exists(stem + s)]))
+        return read, matches
+
+    def _chunks(self, directory: str, accept: Callable[[str], bool]) -> Iterator[List[str]]:
+        chunk = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if accept(entry.name):
+                    chunk.append(entry.name)
+                    if len(chunk) >= self.CHUNK_SIZE:
+                        yield chunk
+                        chunk = []
+        if chunk:
+            yield chunk
+
+    def _scan_chunks(self, directory: str, accept: Callable[[str], bool],
+                     read_chunk: Callable[[str, List[str]], Tuple[int, List[CacheEntry]]]) -> Tuple[int, List[CacheEntry]]:
+        read = 0
+        matches = []
+        try:
+            chunks = self._chunks(directory, accept)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                # At most 2 chunks per worker in flight: the listing streams instead of piling up
+                pending = []
+                for chunk in chunks:
+                    pending.append(pool.submit(read_chunk, directory, chunk))
+                    if len(pending) >= 2 * self.max_workers:
+                        n, found = pending.pop(0).result()
+                        read += n
+                        matches.extend(found)
+                for future in pending:
+                    n, found = future.result()
+                    read += n
+                    matches.extend(found)
+        except OSError:
+            pass
+        return read, matches
+
+    def scan_simple(self, directory: str) -> Tuple[int, List[CacheEntry]]:
+        """Read the key of every `<hash>_0` file in a Simple Cache directory."""
+        return self._scan_chunks(directory, lambda name: name.endswith('_0'), self._simple_chunk)
+
+    # ==================== Firefox cache2 ====================
+
+    def _cache2_chunk(self, directory: str, names: List[str]) -> Tuple[int, List[CacheEntry]]:
+        read = 0
+        matches = []
+        for name in names:
+            path = os.path.join(directory, name)
+            key = read_cache2_key(path)
+            if key is None:
+                continue
+            read += 1
+            if self.matcher(key):
+                matches.append(CacheEntry(key, [path]))
+        return read, matches
+
+    def scan_cache2(self, directory: str) -> Tuple[int, List[CacheEntry]]:
+        """Read the key of every entry file in a Firefox `cache2/entries` directory."""
+        return self._scan_chunks(directory, lambda name: len(name) == 40, self._cache2_chunk)
+
+    # ==================== Blockfile Cache ====================
+
+    @staticmethod
+    def _read_addr(directory: str, addr: int, length: int) -> Optional[bytes]:
+        """Read `length` bytes at a CacheAddr (long keys)."""
+        if not addr & 0x80000000:
+            return None
+        file_type = (addr >> 28) & 7
+        try:
+            if file_type == 0:
+                with open(os.path.join(directory, 'f_%06x' % (addr & 0x0FFFFFFF)), 'rb') as f:
+                    return f.read(length)
+            block_size = BLOCK_SIZES.get(file_type)
+            if block_size is None:
+                return None
+            with open(os.path.join(directory, 'data_%d' % ((addr >> 16) & 0xFF)), 'rb') as f:
+                f.seek(BLOCK_HEADER_SIZE + (addr & 0xFFFF) * block_size)
+                return f.read(length)
+        except OSError:
+            return None
+
+    def _scan_block_file(self, directory: str, path: str) -> Tuple[int, List[bytes]]:
+        read = 0
+        keys = []
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= BLOCK_HEADER_SIZE:
+                return 0, []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                magic, version, _this, _next, entry_size, _num, _max = BLOCK_HEADER.unpack_from(mm)
+                if magic != BLOCK_MAGIC or entry_size != ENTRY_BLOCK_SIZE:
+                    return 0, []
+                offset = BLOCK_HEADER_SIZE
+                while offset + ENTRY_BLOCK_SIZE <= size:
+                    blocks = 1
+                    (_hash, _next_addr, rankings, _reuse, _refetch, state, _created,
+                     key_len, long_key) = ENTRY_STORE.unpack_from(mm, offset)
+                    # Stream data shares these files: only trust blocks that look like entries
+                    if state in ENTRY_STATES and 0 < key_len <= SIMPLE_MAX_KEY and rankings & 0x80000000:
+                        self_hash = struct.unpack_from('<I', mm, offset + ENTRY_SELF_HASH_OFFSET)[0]
+                        if not self_hash or self_hash == super_fast_hash(mm[offset:offset + ENTRY_SELF_HASH_OFFSET]):
+                            if long_key:
+                                key = self._read_addr(directory, long_key, key_len)
+                            else:
+                                key = mm[offset + ENTRY_KEY_OFFSET:offset + ENTRY_KEY_OFFSET + key_len]
+                                blocks = min(4, (ENTRY_KEY_OFFSET + key_len + ENTRY_BLOCK_SIZE) // ENTRY_BLOCK_SIZE)
+                            if key:
+                                read += 1
+                                if self.matcher(key):
+                                    keys.append(key)
+                    offset += blocks * ENTRY_BLOCK_SIZE
+        return read, keys
+
+    def scan_blockfile(self, directory: str) -> Tuple[int, List[CacheEntry]]:
+        """
+        Read the keys of every entry in a blockfile cache.
+
+        Entries cannot be unlinked one by one (the index hash table and the
+        rankings lists would have to be rewritten), so a matching entry lists all
+        cache files: deleting them makes the browser start with an empty cache.
+        """
+        try:
+            with os.scandir(directory) as it:
+                files = [e.path for e in it if e.is_file(follow_symlinks=False)]
+        except OSError:
+            return 0, []
+        data_files = [p for p in files if re.fullmatch(r'data_\d+', os.path.basename(p))]
+        read = 0
+        keys = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(data_files)))) as pool:
+            for n, found in pool.map(lambda p: self._scan_block_file(directory, p), data_files):
+                read += n
+                keys.extend(found)
+        cache_files = [p for p in files if os.path.basename(p) == 'index' or p in data_files
+                       or re.fullmatch(r'f_[0-9a-f]{6}', os.path.basename(p))]
+        return read, [CacheEntry(key, cache_files) for key in keys]
@@ -0,0 +1,148 @@
+"""
+Command Runner Module
+=====================
+
+Runs external commands (DNS flushes, network resets, uninstallers) on an
+asyncio event loop: independent commands run concurrently, every command has
+its own timeout, the whole batch has an overall deadline, and output and
+timing are captured for the log.
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import sys
+import signal
+import asyncio
+import subprocess
+import locale
+import time
+from collections import namedtuple
+from typing import List, Optional, Sequence, Union
+
+Command = Union[str, Sequence[str]]
+
+# Outcome of one command. returncode is None if the command never finished
+# (not found, timed out or not started before the overall deadline).
+CommandResult = namedtuple(
+    'CommandResult',
+    ['command', 'returncode', 'stdout', 'stderr', 'seconds', 'timed_out', 'error'],
+)
+
+
+class CommandRunner:
+    """
+    Concurrent subprocess executor with deadlines.
+
+    Features:
+    - Strings run through the shell, lists are executed directly
+    - Per-command timeout and an overall deadline shared by the batch
+    - Bounded concurrency (1 = strictly one after another)
+    - Timed-out commands are killed with their whole process group
+    - stdout/stderr captured and decoded, wall time recorded per command
+    """
+
+    DEFAULT_TIMEOUT = 30.0
+
+    # Seconds to wait for output after killing a timed-out command
+    KILL_GRACE = 2.0
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, overall_timeout: Optional[float] = None,
+                 max_concurrency: Optional[int] = None):
+        """
+        Initialize CommandRunner.
+
+        Args:
+            timeout: Seconds each command may run
+            overall_timeout: Seconds the whole batch may run (None = no limit)
+            max_concurrency: Commands running at once (None = all of them)
+        """
+        self.timeout = timeout
+        self.overall_timeout = overall_timeout
+        self.max_concurrency = max_concurrency
+        self.encoding = locale.getpreferredencoding(False) or 'utf-8'
+
+    def run(self, commands: List[Command]) -> List[CommandResult]:
+        """
+        Run commands and wait for all of them (or for the deadlines).
+
+        Args:
+            commands: Shell strings or argv lists
+
+        Returns:
+            One CommandResult per command, in the order given
+        """
+        if not commands:
+            return []
+        return asyncio.run(self._run_all(list(commands)))
+
+    async def _run_all(self, commands: List[Command]) -> List[CommandResult]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.overall_timeout if self.overall_timeout is not None else None
+        limit = asyncio.Semaphore(self.max_concurrency or len(commands))
+        return await asyncio.gather(*(self._run_one(cmd, limit, deadline) for cmd in commands))
+
+    async def _run_one(self, command: Command, limit: asyncio.Semaphore,
+                       deadline: Optional[float]) -> CommandResult:
+        loop = asyncio.get_running_loop()
+        async with limit:
+            timeout = self.timeout
+            if deadline is not None:
+                timeout = min(timeout, deadline - loop.time())
+                if timeout <= 0:
+                    return CommandResult(command, None, '', '', 0.0, True, 'not started before the overall deadline')
+
+            start = time.perf_counter()
+            # A new session/process group lets a timeout kill the shell and everything it started
+            kwargs = {'stdout': asyncio.subprocess.PIPE, 'stderr': asyncio.subprocess.PIPE,
+                      'stdin': asyncio.subprocess.DEVNULL}
+            if sys.platform != 'win32':
+                kwargs['start_new_session'] = True
+            try:
+                if isinstance(command, str):
+                    proc = await asyncio.create_subprocess_shell(command, **kwargs)
+                else:
+                    proc = await asyncio.create_subprocess_exec(*command, **kwargs)
+            except OSError as e:
+                return CommandResult(command, None, '', '', time.perf_counter() - start, False, str(e))
+
+            # Readers outlive a timeout, so whatever a hung command printed is still reported
+            readers = asyncio.gather(proc.stdout.read(), proc.stderr.read())
+            timed_out = False
+            try:
+                await asyncio.wait_for(proc.wait(), timeout)
+            except asyncio.TimeoutError:
+                timed_out = True
+                self._kill(proc)
+            try:
+                stdout, stderr = await asyncio.wait_for(readers, self.KILL_GRACE)
+            except asyncio.TimeoutError:
+                # Something outside the process group still holds the pipes
+                stdout, stderr = b'', b''
+
+            return CommandResult(
+                command,
+                None if timed_out else proc.returncode,
+                stdout.decode(self.encoding, 'replace'),
+                stderr.decode(self.encoding, 'replace'),
+                time.perf_counter() - start,
+                timed_out,
+                f'timed out after {timeout:.1f}s' if timed_out else None,
+            )
+
+    @staticmethod
+    def _kill(proc: asyncio.subprocess.Process):
+        try:
+            if sys.platform == 'win32':
+                # /T takes the children of cmd.exe along
+                subprocess.run(['taskkill', '/T', '/F', '/PID', str(proc.pid)], capture_output=True)
+            else:
+                os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+def format_command(command: Command) -> str:
+    """Render a command for the log."""
+    return command if isinstance(command, str) else ' '.join(command)
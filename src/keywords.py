@@ -0,0 +1,189 @@
+"""
+Keyword Matching Module
+=======================
+
+One compiled matcher for every place that looks for Antigravity traces: cache
+keys, LocalStorage origins, process and uninstaller names, and the cookie
+LIKE predicate.
+
+The keywords are built into an Aho-Corasick automaton (trie, failure links and
+output sets), once per keyword set. The automaton drops keywords that contain
+another keyword, reports which keywords occur in a text (find_all), and its
+trie is rendered as a single regular expression with shared prefixes factored
+out ("anti(?:-gravity|_gravity|gravity)|..."). Plain matching runs that
+expression over the lowercased text, so the scan itself happens in C. It is
+case-insensitive and works on str and bytes.
+
+Extra keywords can be added with $ANTIGRAVITY_CLEANER_KEYWORDS (comma-separated).
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import re
+import functools
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+KEYWORDS_ENV = 'ANTIGRAVITY_CLEANER_KEYWORDS'
+
+# Keywords that identify Antigravity-related data
+DEFAULT_KEYWORDS = (
+    'antigravity',
+    'anti-gravity',
+    'anti_gravity',
+    'deepmind',
+    'gemini-code',
+    'google.com/antigravity',
+    'accounts.google.com/antigravity',
+)
+
+Text = Union[str, bytes]
+
+
+def configured_keywords(defaults: Iterable[str] = DEFAULT_KEYWORDS) -> List[str]:
+    """defaults plus the keywords listed in $ANTIGRAVITY_CLEANER_KEYWORDS."""
+    keywords = list(defaults)
+    for keyword in os.environ.get(KEYWORDS_ENV, '').split(','):
+        keyword = keyword.strip()
+        if keyword and keyword not in keywords:
+            keywords.append(keyword)
+    return keywords
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive multi-keyword matcher.
+
+    Features:
+    - Aho-Corasick automaton over the lowercased keywords, built once
+    - Redundant keywords (containing another keyword) are dropped
+    - Fast membership test through the trie compiled to one regex (str and bytes)
+    - find_all() reports the keywords found in a text
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Build the automaton.
+
+        Args:
+            keywords: Keywords to match (case-insensitive, at least one)
+        """
+        self.keywords = sorted({k.lower() for k in keywords if k})
+        if not self.keywords:
+            raise ValueError("KeywordMatcher needs at least one keyword")
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[str]] = [set()]
+        for keyword in self.keywords:
+            self._add(keyword)
+        self._link()
+        # A keyword in which the automaton finds another keyword can never decide a match
+        self.effective = [k for k in self.keywords if self.find_all(k) == {k}]
+        pattern = self._render(self._trie(self.effective))
+        self._search_str = re.compile(pattern).search
+        self._search_bytes = re.compile(pattern.encode('utf-8')).search
+
+    # ==================== Automaton ====================
+
+    def _add(self, keyword: str):
+        state = 0
+        for char in keyword:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+                self._goto[state][char] = nxt
+            state = nxt
+        self._output[state].add(keyword)
+
+    def _link(self):
+        """Failure links, breadth first; output sets inherit those of their fallback."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._output[nxt] |= self._output[self._fail[nxt]]
+
+    def _step(self, state: int, char: str) -> int:
+        while state and char not in self._goto[state]:
+            state = self._fail[state]
+        return self._goto[state].get(char, 0)
+
+    def find_all(self, text: Optional[Text]) -> Set[str]:
+        """Keywords occurring in text (one pass of the automaton)."""
+        if not text:
+            return set()
+        if isinstance(text, bytes):
+            text = text.decode('utf-8', 'replace')
+        found = set()
+        state = 0
+        for char in text.lower():
+            state = self._step(state, char)
+            found |= self._output[state]
+        return found
+
+    # ==================== Compiled Search ====================
+
+    @staticmethod
+    def _trie(keywords: List[str]) -> Dict:
+        root: Dict = {}
+        for keyword in keywords:
+            node = root
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        return root
+
+    @classmethod
+    def _render(cls, node: Dict) -> str:
+        branches = []
+        for char in sorted(node):
+            if char == '':
+                branches.append('')
+                continue
+            branches.append(re.escape(char) + cls._render(node[char]))
+        if len(branches) == 1:
+            return branches[0]
+        optional = '' in branches
+        body = '|'.join(b for b in branches if b)
+        return f"(?:{body})?" if optional else f"(?:{body})"
+
+    def search(self, text: Optional[Text]) -> bool:
+        """True if any keyword occurs in text (str or bytes, any case)."""
+        if not text:
+            return False
+        if isinstance(text, bytes):
+            return self._search_bytes(text.lower()) is not None
+        return self._search_str(text.lower()) is not None
+
+    __call__ = search
+
+    def search_lowered(self, text: str) -> bool:
+        """search() for text that is already lowercase (e.g. cached process names)."""
+        return self._search_str(text) is not None
+
+
+@functools.lru_cache(maxsize=16)
+def _cached(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def get_matcher(keywords: Optional[Iterable[str]] = None) -> KeywordMatcher:
+    """
+    Shared matcher for a keyword set, built on first use.
+
+    Args:
+        keywords: Keyword set (default: DEFAULT_KEYWORDS plus $ANTIGRAVITY_CLEANER_KEYWORDS)
+    """
+    if keywords is None:
+        keywords = configured_keywords()
+    return _cached(tuple(sorted({k.lower() for k in keywords})))
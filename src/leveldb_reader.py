@@ -0,0 +1,441 @@
+"""
+LevelDB Reader Module
+=====================
+
+Pure-Python, streaming access to a LevelDB directory (Chromium's Local
+Storage): the MANIFEST, write-ahead .log files and .ldb/.sst tables,
+including Snappy-compressed blocks. Files are mapped with mmap and decoded one
+record or block at a time, so memory use is bounded by the block size, not by
+the size of the database.
+
+Entries are removed the way LevelDB removes them: deletion records with
+higher sequence numbers are written to a new log file, which the browser
+replays (and compacts) the next time it opens the database. Nothing that is
+already on disk is modified.
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import re
+import sys
+import mmap
+import struct
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+LOG_BLOCK_SIZE = 32768
+LOG_HEADER_SIZE = 7
+LOG_FULL, LOG_FIRST, LOG_MIDDLE, LOG_LAST = 1, 2, 3, 4
+
+TABLE_MAGIC = 0xDB4775248B80FB57
+TABLE_FOOTER_SIZE = 48
+BLOCK_TRAILER_SIZE = 5
+BLOCK_UNCOMPRESSED, BLOCK_SNAPPY = 0, 1
+
+TYPE_DELETION, TYPE_VALUE = 0, 1
+
+_FILE_RE = re.compile(r'^(\d+)\.(log|ldb|sst)$')
+
+# State of the database as recorded by its MANIFEST
+Manifest = namedtuple('Manifest', ['log_number', 'prev_log_number', 'next_file', 'last_sequence', 'tables'])
+
+# Newest record of a user key: sequence number and TYPE_VALUE/TYPE_DELETION
+KeyState = namedtuple('KeyState', ['sequence', 'type'])
+
+
+# ==================== Encoding ====================
+
+def _crc32c_table() -> List[int]:
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x82F63B78 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC32C = _crc32c_table()
+
+
+def masked_crc32c(data: bytes) -> int:
+    """CRC32C as stored in LevelDB logs and tables (rotated and offset)."""
+    crc = 0xFFFFFFFF
+    for byte in data:
+        crc = _CRC32C[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    crc ^= 0xFFFFFFFF
+    return (((crc >> 15) | (crc << 17)) + 0xA282EAD8) & 0xFFFFFFFF
+
+
+def read_varint(buf, pos: int) -> Tuple[int, int]:
+    """Decode a varint at pos; returns (value, next position)."""
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _length_prefixed(buf, pos: int) -> Tuple[bytes, int]:
+    length, pos = read_varint(buf, pos)
+    return bytes(buf[pos:pos + length]), pos + length
+
+
+def snappy_decompress(data) -> bytes:
+    """Decode a raw Snappy block (as used by LevelDB tables)."""
+    length, pos = read_varint(data, 0)
+    out = bytearray()
+    end = len(data)
+    while pos < end:
+        tag = data[pos]
+        pos += 1
+        kind = tag & 3
+        if kind == 0:
+            size = tag >> 2
+            if size >= 60:
+                extra = size - 59
+                size = int.from_bytes(data[pos:pos + extra], 'little')
+                pos += extra
+            size += 1
+            out += data[pos:pos + size]
+            pos += size
+            continue
+        if kind == 1:
+            size = ((tag >> 2) & 7) + 4
+            offset = ((tag >> 5) << 8) | data[pos]
+            pos += 1
+        elif kind == 2:
+            size = (tag >> 2) + 1
+            offset = data[pos] | data[pos + 1] << 8
+            pos += 2
+        else:
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos:pos + 4], 'little')
+            pos += 4
+        if not 0 < offset <= len(out):
+            raise ValueError("Corrupt Snappy block: bad copy offset")
+        start = len(out) - offset
+        if offset >= size:
+            out += out[start:start + size]
+        else:
+            # Overlapping copy repeats the last `offset` bytes
+            pattern = out[start:]
+            out += (pattern * (size // offset + 1))[:size]
+    if len(out) != length:
+        raise ValueError("Corrupt Snappy block: length mismatch")
+    return bytes(out)
+
+
+@contextmanager
+def _mapped(path: str):
+    """Read-only mmap of a file (an empty bytes object for empty files)."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+# ==================== Log Files ====================
+
+def iter_log_records(buf) -> Iterator[bytes]:
+    """
+    Reassemble the logical records of a log file (MANIFEST or .log).
+
+    Stops at the first torn or zeroed fragment, as LevelDB does for the tail of
+    a log that was being written when the process died.
+    """
+    size = len(buf)
+    pos = 0
+    pending = None
+    while pos + LOG_HEADER_SIZE <= size:
+        left = LOG_BLOCK_SIZE - pos % LOG_BLOCK_SIZE
+        if left < LOG_HEADER_SIZE:
+            pos += left
+            continue
+        length, kind = struct.unpack_from('<HB', buf, pos + 4)
+        start = pos + LOG_HEADER_SIZE
+        if kind == 0 and length == 0:
+            # Preallocated, zero-filled space: skip to the next block
+            pos += left
+            continue
+        if start + length > size or length > left - LOG_HEADER_SIZE or kind not in (1, 2, 3, 4):
+            return
+        fragment = buf[start:start + length]
+        pos = start + length
+        if kind == LOG_FULL:
+            pending = None
+            yield bytes(fragment)
+        elif kind == LOG_FIRST:
+            pending = bytearray(fragment)
+        elif pending is not None:
+            pending += fragment
+            if kind == LOG_LAST:
+                yield bytes(pending)
+                pending = None
+
+
+def iter_write_batch(record: bytes) -> Iterator[Tuple[int, int, bytes]]:
+    """Decode a WriteBatch: yields (sequence, type, user key) per operation."""
+    sequence, count = struct.unpack_from('<QI', record, 0)
+    pos = 12
+    for i in range(count):
+        kind = record[pos]
+        key, pos = _length_prefixed(record, pos + 1)
+        if kind == TYPE_VALUE:
+            value_len, pos = read_varint(record, pos)
+            pos += value_len
+        elif kind != TYPE_DELETION:
+            raise ValueError(f"Unknown WriteBatch record type {kind}")
+        yield sequence + i, kind, key
+
+
+def encode_log_record(payload: bytes, offset: int = 0) -> bytes:
+    """Frame one payload for a log file whose current size is `offset`."""
+    out = bytearray()
+    first = True
+    while True:
+        left = LOG_BLOCK_SIZE - (offset + len(out)) % LOG_BLOCK_SIZE
+        if left < LOG_HEADER_SIZE:
+            out += b'\0' * left
+            left = LOG_BLOCK_SIZE
+        fragment = payload[:left - LOG_HEADER_SIZE]
+        payload = payload[len(fragment):]
+        last = not payload
+        kind = LOG_FULL if first and last else LOG_FIRST if first else LOG_LAST if last else LOG_MIDDLE
+        out += struct.pack('<IHB', masked_crc32c(bytes([kind]) + fragment), len(fragment), kind) + fragment
+        first = False
+        if last:
+            return bytes(out)
+
+
+# ==================== Tables ====================
+
+def iter_block(block) -> Iterator[Tuple[bytes, memoryview]]:
+    """Entries of a table block (prefix-compressed keys): yields (key, value)."""
+    num_restarts = struct.unpack_from('<I', block, len(block) - 4)[0]
+    end = len(block) - 4 - 4 * num_restarts
+    view = memoryview(block)
+    pos = 0
+    key = b''
+    while pos < end:
+        shared, pos = read_varint(block, pos)
+        non_shared, pos = read_varint(block, pos)
+        value_len, pos = read_varint(block, pos)
+        key = key[:shared] + bytes(block[pos:pos + non_shared])
+        pos += non_shared
+        yield key, view[pos:pos + value_len]
+        pos += value_len
+
+
+def _read_block(buf, handle: Tuple[int, int]) -> bytes:
+    offset, size = handle
+    kind = buf[offset + size]
+    data = buf[offset:offset + size]
+    if kind == BLOCK_SNAPPY:
+        return snappy_decompress(data)
+    if kind != BLOCK_UNCOMPRESSED:
+        raise ValueError(f"Unsupported block compression {kind}")
+    return bytes(data)
+
+
+def _block_handle(buf, pos: int = 0) -> Tuple[Tuple[int, int], int]:
+    offset, pos = read_varint(buf, pos)
+    size, pos = read_varint(buf, pos)
+    return (offset, size), pos
+
+
+def iter_table(buf) -> Iterator[Tuple[bytes, int, int]]:
+    """
+    Walk a table's data blocks one at a time.
+
+    Yields:
+        (user key, sequence, type) per entry
+    """
+    if len(buf) < TABLE_FOOTER_SIZE:
+        raise ValueError("Table too short")
+    footer = buf[len(buf) - TABLE_FOOTER_SIZE:]
+    if struct.unpack_from('<Q', footer, 40)[0] != TABLE_MAGIC:
+        raise ValueError("Bad table magic")
+    _metaindex, pos = _block_handle(footer)
+    index_handle, _ = _block_handle(footer, pos)
+    for _last_key, handle in iter_block(_read_block(buf, index_handle)):
+        for internal_key, _value in iter_block(_read_block(buf, _block_handle(handle)[0])):
+            tag = struct.unpack_from('<Q', internal_key, len(internal_key) - 8)[0]
+            yield internal_key[:-8], tag >> 8, tag & 0xFF
+
+
+# ==================== Database ====================
+
+def read_manifest(path: str) -> Manifest:
+    """Replay the VersionEdits of a MANIFEST file."""
+    log_number = prev_log_number = next_file = last_sequence = 0
+    tables = set()
+    with _mapped(path) as buf:
+        for edit in iter_log_records(buf):
+            pos = 0
+            while pos < len(edit):
+                tag, pos = read_varint(edit, pos)
+                if tag == 1:  # comparator
+                    _, pos = _length_prefixed(edit, pos)
+                elif tag == 2:
+                    log_number, pos = read_varint(edit, pos)
+                elif tag == 3:
+                    next_file, pos = read_varint(edit, pos)
+                elif tag == 4:
+                    last_sequence, pos = read_varint(edit, pos)
+                elif tag == 5:  # compact pointer: level, internal key
+                    _, pos = read_varint(edit, pos)
+                    _, pos = _length_prefixed(edit, pos)
+                elif tag == 6:  # deleted file: level, number
+                    _, pos = read_varint(edit, pos)
+                    number, pos = read_varint(edit, pos)
+                    tables.discard(number)
+                elif tag == 7:  # new file: level, number, size, smallest, largest
+                    _, pos = read_varint(edit, pos)
+                    number, pos = read_varint(edit, pos)
+                    _, pos = read_varint(edit, pos)
+                    _, pos = _length_prefixed(edit, pos)
+                    _, pos = _length_prefixed(edit, pos)
+                    tables.add(number)
+                elif tag == 9:
+                    prev_log_number, pos = read_varint(edit, pos)
+                else:
+                    raise ValueError(f"Unknown VersionEdit tag {tag} in {path}")
+    return Manifest(log_number, prev_log_number, next_file, last_sequence, tables)
+
+
+class LevelDB:
+    """
+    Offline access to a LevelDB directory.
+
+    Features:
+    - Reads the live tables and logs named by the MANIFEST
+    - Streams over mmap, one log record or table block at a time
+    - Resolves the newest state of the keys of interest only
+    - Deletes keys by writing a new log file of deletion records
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _manifest(self) -> Manifest:
+        with open(os.path.join(self.path, 'CURRENT'), 'r', encoding='utf-8') as f:
+            name = f.read().strip()
+        return read_manifest(os.path.join(self.path, name))
+
+    def _files(self) -> Dict[int, str]:
+        files = {}
+        for name in os.listdir(self.path):
+            match = _FILE_RE.match(name)
+            if match:
+                files[int(match.group(1))] = name
+        return files
+
+    @contextmanager
+    def lock(self):
+        """
+        Hold the database LOCK file, as LevelDB does while it is open.
+
+        Raises:
+            BlockingIOError: If another process (the browser) has it open
+        """
+        fd = os.open(os.path.join(self.path, 'LOCK'), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if sys.platform == 'win32':
+                import msvcrt
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            yield
+        finally:
+            os.close(fd)
+
+    def scan(self, predicate: Callable[[bytes], bool]) -> Tuple[Dict[bytes, KeyState], int]:
+        """
+        Find the newest state of every user key accepted by predicate.
+
+        Args:
+            predicate: Called with each user key
+
+        Returns:
+            Tuple of ({key: KeyState}, highest sequence number seen)
+        """
+        manifest = self._manifest()
+        files = self._files()
+        states: Dict[bytes, KeyState] = {}
+        max_sequence = manifest.last_sequence
+
+        def record(key: bytes, sequence: int, kind: int):
+            if predicate(key):
+                state = states.get(key)
+                if state is None or sequence > state.sequence:
+                    states[key] = KeyState(sequence, kind)
+
+        for number in sorted(manifest.tables):
+            name = files.get(number)
+            if name is None or name.endswith('.log'):
+                continue
+            with _mapped(os.path.join(self.path, name)) as buf:
+                for key, sequence, kind in iter_table(buf):
+                    record(key, sequence, kind)
+
+        for number, name in sorted(files.items()):
+            if not name.endswith('.log'):
+                continue
+            if number < manifest.log_number and number != manifest.prev_log_number:
+                continue
+            with _mapped(os.path.join(self.path, name)) as buf:
+                for batch in iter_log_records(buf):
+                    for sequence, kind, key in iter_write_batch(batch):
+                        max_sequence = max(max_sequence, sequence)
+                        record(key, sequence, kind)
+        return states, max_sequence
+
+    def delete(self, keys: Iterable[bytes], last_sequence: int) -> str:
+        """
+        Delete keys with one WriteBatch in a new log file.
+
+        LevelDB replays every log numbered at or above the MANIFEST's log number
+        when it opens the database, and marks those numbers as used.
+
+        Args:
+            keys: User keys to delete
+            last_sequence: Highest sequence number in the database (from scan)
+
+        Returns:
+            Path of the log file written
+        """
+        keys = list(keys)
+        manifest = self._manifest()
+        number = max([manifest.next_file] + [n + 1 for n in self._files()])
+        batch = bytearray(struct.pack('<QI', last_sequence + 1, len(keys)))
+        for key in keys:
+            batch += bytes([TYPE_DELETION]) + encode_varint(len(key)) + key
+        path = os.path.join(self.path, '%06d.log' % number)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(encode_log_record(bytes(batch)))
+            f.flush()
+            os.fsync(f.fileno())
+        # The name must not match a log until the content is complete
+        os.replace(tmp, path)
+        return path
@@ -1,35 +1,33 @@
 import os
 import sys
+import argparse
 import platform
-import shutil
 import subprocess
 import time
-import glob
+import fnmatch
+import re
+import json
+import stat
+import gzip
+import atexit
+import queue
+import threading
 import logging
-from logging.handlers import RotatingFileHandler
+from collections import namedtuple
 from datetime import datetime
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
-# Import new modules
-try:
-    from browser_helper import BrowserHelper
-    from network_optimizer import NetworkOptimizer
-    from session_manager import SessionManager
-except ImportError as e:
-    # Modules not yet available, will be created
-    BrowserHelper = None
-    NetworkOptimizer = None
-    SessionManager = None
-
-# Try imports for runtime (UI and Process handling)
+from spans import TRACER, traced
+from metrics import METRICS, PATHS_REMOVED, BYTES_RECLAIMED
+from stat_cache import STAT_CACHE
+
+# Only the console is needed by every command. psutil, the rich widgets and the
+# helper modules (requests, pycryptodome) are imported by the code paths that use
+# them, so e.g. `main.py clean` never pays for the network or session stack.
 try:
-    import psutil
     from rich.console import Console
-    from rich.progress import Progress, SpinnerColumn, TextColumn
-    from rich.panel import Panel
-    from rich.prompt import Prompt, Confirm
-    from rich.table import Table
-    from rich.style import Style
-    from rich import print as rprint
 except ImportError:
     print("Missing dependencies. Please run: pip install -r requirements.txt")
     sys.exit(1)
@@ -49,42 +47,942 @@ console = Console()
 # --- Configuration & Constants ---
 
 APP_NAME = "Antigravity"
+PLAN_VERSION = 1
+DIAGNOSTIC_REPORT_FILE = os.path.join(os.path.expanduser("~"), "Desktop", "Antigravity-Network-Diagnostic.txt")
+SESSION_DIR = os.path.join(os.path.expanduser("~"), ".antigravity-cleaner", "sessions")
+SCAN_INDEX_FILE = os.path.join(os.path.expanduser("~"), ".antigravity-cleaner", "scan-index.json")
+QUARANTINE_DIR = os.path.join(os.path.expanduser("~"), ".antigravity-cleaner", "quarantine")
 LOG_FILE = os.path.join(os.path.expanduser("~"), "Desktop", "Antigravity-Cleaner.log")
+# Used instead when there is no Desktop (servers, minimal installs)
+FALLBACK_LOG_FILE = os.path.join(os.path.expanduser("~"), ".antigravity-cleaner", "logs", "Antigravity-Cleaner.log")
+PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".antigravity-cleaner", "profile")
+
+# External command deadlines (seconds)
+NETWORK_COMMAND_TIMEOUT = 15
+NETWORK_RESET_DEADLINE = 30
+UNINSTALL_TIMEOUT = 600
+
+# --- Logging Pipeline ---
+
+# All log records (Desktop log, console output, agent log) go through one queue and
+# are written by a single background thread, so callers never block on file I/O.
+LOG_QUEUE = queue.Queue(-1)
+AGENT_LOG_FILE = os.path.join(os.path.dirname(__file__), '..', '.agent', 'logs', 'browser-helper-operations.log')
+_log_listener = None
+
+
+class _BatchedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that writes into the buffered stream and lets the listener flush.
+
+    Records arriving in a burst end up in one write() syscall instead of one per message.
+    """
+
+    _in_emit = False
+
+    def emit(self, record):
+        self._in_emit = True
+        try:
+            super().emit(record)
+        finally:
+            self._in_emit = False
+
+    def flush(self):
+        if not self._in_emit:
+            super().flush()
+
+
+def _gzip_namer(name):
+    return name + ".gz"
+
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        f_out.writelines(f_in)
+    os.remove(source)
+
+
+class _ConsoleHandler(logging.Handler):
+    """Render Cleaner.log messages with rich, using the style passed in the record."""
+
+    def emit(self, record):
+        from rich.markup import escape
+
+        style = getattr(record, "style", "dim")
+        try:
+            # Messages are plain text: paths and "[user]" prefixes must not be read as markup
+            console.print(f"[{style}]{escape(record.getMessage())}[/{style}]")
+        except Exception:
+            self.handleError(record)
+
+
+class _BatchingQueueListener(QueueListener):
+    """QueueListener that flushes its handlers only when the queue runs dry."""
+
+    def dequeue(self, block):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get(block)
+
+
+def start_logging():
+    """Start the background log writer (idempotent) and return the Desktop logger."""
+    global _log_listener, LOG_FILE
+    if _log_listener is None:
+        formatter = logging.Formatter('[%(asctime)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+        handlers = []
+
+        # The file handler opens lazily: its directory must exist, or every record fails
+        if not os.path.isdir(os.path.dirname(LOG_FILE)):
+            LOG_FILE = FALLBACK_LOG_FILE
+        try:
+            os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+        except OSError as e:
+            print(f"Cannot create the log directory ({e}), logging to the console only", file=sys.stderr)
+        else:
+            # Desktop log: rotated at 5MB, older generations gzip-compressed
+            desktop = _BatchedRotatingFileHandler(LOG_FILE, maxBytes=5*1024*1024, backupCount=3, encoding="utf-8", delay=True)
+            desktop.namer = _gzip_namer
+            desktop.rotator = _gzip_rotator
+            desktop.setFormatter(formatter)
+            desktop.addFilter(logging.Filter('antigravity_cleaner'))
+            handlers.append(desktop)
+
+        screen = _ConsoleHandler()
+        screen.addFilter(logging.Filter('antigravity_cleaner'))
+        handlers.append(screen)
+
+        # Agent log: rotating file handler (10MB max, keep 3 backups)
+        os.makedirs(os.path.dirname(AGENT_LOG_FILE), exist_ok=True)
+        agent = _BatchedRotatingFileHandler(AGENT_LOG_FILE, maxBytes=10*1024*1024, backupCount=3, encoding="utf-8", delay=True)
+        agent.setFormatter(logging.Formatter(
+            '[%(asctime)s] [%(levelname)s] %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+        agent.addFilter(logging.Filter('antigravity_agent'))
+        handlers.append(agent)
+
+        _log_listener = _BatchingQueueListener(LOG_QUEUE, *handlers)
+        _log_listener.start()
+        atexit.register(stop_logging)
+
+    return _attach_queue(logging.getLogger('antigravity_cleaner'), logging.INFO)
+
+
+def _attach_queue(logger, level):
+    """Route a logger into LOG_QUEUE exactly once, however often setup runs."""
+    logger.setLevel(level)
+    logger.propagate = False
+    if not any(isinstance(h, QueueHandler) for h in logger.handlers):
+        logger.addHandler(QueueHandler(LOG_QUEUE))
+    return logger
+
+
+def flush_logging():
+    """Block until every queued record has been written (call before prompting the user)."""
+    if _log_listener is not None:
+        LOG_QUEUE.join()
+
+
+def stop_logging():
+    """Drain the queue, flush all handlers and stop the writer thread."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
+
+
+# --- Leftover Scanner ---
+
+# A single scan result: kind is "file" or "dir", size is st_size of the entry itself,
+# inode and mtime (st_mtime_ns) let a saved plan be re-validated without rescanning,
+# usage/files are the bytes on disk and file count of the whole target.
+ScanHit = namedtuple("ScanHit", ["path", "kind", "size", "inode", "mtime", "usage", "files"], defaults=(0, 0))
+
+
+def _disk_usage(st):
+    """Bytes allocated on disk (st_blocks is in 512-byte units; Windows has no st_blocks)."""
+    blocks = getattr(st, "st_blocks", None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+
+def _is_reparse_point(st):
+    """True for NTFS junctions (and other reparse points): removed as links, never entered."""
+    return bool(getattr(st, "st_file_attributes", 0) & getattr(stat, "FILE_ATTRIBUTE_REPARSE_POINT", 0))
+
+
+def _stat_hit(path, st, inode=None):
+    kind = "dir" if stat.S_ISDIR(st.st_mode) else "file"
+    return ScanHit(
+        path, kind, st.st_size, inode or st.st_ino, st.st_mtime_ns,
+        _disk_usage(st), 1 if kind == "file" else 0,
+    )
+
+
+def _has_magic(part):
+    return any(c in part for c in "*?[")
+
+
+def _path_components(pattern):
+    """Split a cleanup pattern into its anchor ("/", "C:\\" or ".") and its components."""
+    parts = []
+    head = os.path.normpath(pattern)
+    while True:
+        head, tail = os.path.split(head)
+        if not tail:
+            break
+        parts.insert(0, tail)
+    return head or os.curdir, parts
+
+
+class _PatternNode:
+    """One path component of the PathMatcher trie."""
+
+    __slots__ = ("name", "terminal", "literals", "globs", "key", "_any", "_matchers")
+
+    def __init__(self, name=""):
+        self.name = name
+        self.terminal = False
+        self.literals = {}  # normcased name -> node
+        self.globs = {}     # wildcard component -> node
+        self.key = ""
+        self._any = None
+        self._matchers = ()
+
+    def compile(self, flags, suffixes):
+        # The key names every pattern below this node; the scan index is keyed on it
+        self.key = "\n".join(sorted(suffixes))
+        if not self.globs:
+            return
+        translated = {part: fnmatch.translate(part) for part in self.globs}
+        # One combined regex rejects the (usual) entry that matches no wildcard at all
+        self._any = re.compile("|".join(f"(?:{rx})" for rx in translated.values()), flags)
+        self._matchers = tuple(
+            (re.compile(translated[part], flags), part.startswith("."), node)
+            for part, node in self.globs.items()
+        )
+
+    def children(self, name):
+        """Child nodes a directory entry called `name` leads to."""
+        found = []
+        node = self.literals.get(os.path.normcase(name))
+        if node is not None:
+            found.append(node)
+        if self._any is not None and self._any.match(name):
+            hidden = name.startswith(".")
+            for regex, dotted, node in self._matchers:
+                # Like glob.glob, hidden entries only match a pattern that starts with a dot
+                if (dotted or not hidden) and regex.match(name):
+                    found.append(node)
+        return found
+
+
+class PathMatcher:
+    """All cleanup patterns compiled into a single prefix trie.
+
+    Patterns sharing a prefix share its nodes. Literal components are dictionary
+    lookups and the wildcard components of a level are folded into one regex, so
+    a single listing of a directory evaluates every pattern passing through it.
+    Subtrees no pattern can reach are never entered, and purely literal parts of a
+    path are followed without listing their parent at all.
+    """
+
+    def __init__(self, patterns):
+        flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+        self.roots = {}
+        suffixes = {}
+        for pattern in patterns:
+            anchor, parts = _path_components(pattern)
+            if not parts:
+                continue
+            node = self.roots.setdefault(anchor, _PatternNode(anchor))
+            for i, part in enumerate(parts):
+                suffixes.setdefault(node, set()).add("/".join(parts[i:]))
+                if _has_magic(part):
+                    node = node.globs.setdefault(part, _PatternNode(part))
+                else:
+                    node = node.literals.setdefault(os.path.normcase(part), _PatternNode(part))
+            node.terminal = True
+        for node, below in suffixes.items():
+            node.compile(flags, below)
+
+
+class ScanIndex:
+    """Persistent record of the directories listed by earlier scans.
+
+    For every directory (and the trie node it was evaluated against) the index
+    keeps the directory's mtime and inode plus the names that matched. Adding,
+    removing or renaming an entry bumps the directory mtime, so an unchanged
+    mtime means the previous listing can be replayed without a scandir.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path):
+        self.path = path
+        self.cold_seconds = None
+        self.reused = 0
+        self.listed = 0
+        self._old = {}
+        self._new = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.VERSION:
+                self._old = data.get("dirs", {})
+                self.cold_seconds = data.get("cold_seconds")
+        except (OSError, ValueError):
+            # No index yet (or unreadable): this run is a cold scan
+            pass
+
+    @property
+    def warm(self):
+        return self.reused > 0
+
+    def lookup(self, directory, key, st):
+        """Return the stored listing if the directory is unchanged, else None."""
+        entry = self._old.get(directory, {}).get(key)
+        if entry is None or entry["mtime"] != st.st_mtime_ns or entry["inode"] != st.st_ino:
+            return None
+        with self._lock:
+            self._new.setdefault(directory, {})[key] = entry
+            self.reused += 1
+        return entry
+
+    def store(self, directory, key, st, hits, children):
+        entry = {"mtime": st.st_mtime_ns, "inode": st.st_ino, "hits": hits, "children": children}
+        with self._lock:
+            self._new.setdefault(directory, {})[key] = entry
+            self.listed += 1
+
+    def save(self, seconds):
+        """Write the directories seen in this run (stale ones drop out) atomically."""
+        if not self.warm:
+            self.cold_seconds = seconds
+        data = {"version": self.VERSION, "cold_seconds": self.cold_seconds, "dirs": self._new}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+class LeftoverScanner:
+    """Resolve cleanup patterns in one parallel, pruned pass over the filesystem.
+
+    The patterns are compiled into a PathMatcher and walked like an NFA: each
+    directory carries the set of trie nodes active in it, is listed only if one of
+    them has a wildcard to evaluate, and that one listing serves all of them. The
+    DirEntry of a match is reused for its type, size and inode so no path is
+    stat'ed twice. With a ScanIndex, directories whose mtime is unchanged since the
+    last run are not listed at all.
+
+    Disk usage of directory hits is measured on the same pool, one task per
+    subdirectory, so reclaimable space is known when the scan finishes.
+
+    With a StatCache, target and directory stats go through it and the stats of
+    listed hits are stored in it, so a repeated scan stats nothing again.
+    """
+
+    def __init__(self, max_workers=None, index=None, stat_cache=None):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.index = index
+        self.stat_cache = stat_cache
+        self._linked = set()
+        self._linked_lock = threading.Lock()
+
+    def _measure_dir(self, directory):
+        """Disk usage of one directory level; subdirectories are measured as separate tasks."""
+        usage = 0
+        files = 0
+        subdirs = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                        if entry.is_dir(follow_symlinks=False) and not _is_reparse_point(st):
+                            subdirs.append(entry.path)
+                        else:
+                            files += 1
+                            # Count hard-linked files once, like du
+                            if st.st_nlink > 1:
+                                with self._linked_lock:
+                                    if (st.st_dev, st.st_ino) in self._linked:
+                                        continue
+                                    self._linked.add((st.st_dev, st.st_ino))
+                        usage += _disk_usage(st)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return usage, files, subdirs
+
+    def _expand(self, directory, nodes, hits, listings):
+        """Follow the literal part of the trie below `directory` without listing it.
+
+        `nodes` are all trie nodes active in the directory. Exact targets cost one
+        lstat each; as soon as a wildcard has to be evaluated the directory becomes
+        a listing task shared by every active node.
+        """
+        if any(node.globs for node in nodes):
+            listings.append((directory, nodes))
+            return
+        below = {}
+        for node in nodes:
+            for name, child in node.literals.items():
+                below.setdefault(name, []).append(child)
+        for children in below.values():
+            path = os.path.join(directory, children[0].name)
+            if not any(child.terminal for child in children):
+                self._expand(path, tuple(children), hits, listings)
+                continue
+            try:
+                hits.append(_stat_hit(path, self._lstat(path)))
+            except OSError:
+                continue
+
+    def _lstat(self, path):
+        return self.stat_cache.lstat(path) if self.stat_cache else os.lstat(path)
+
+    def _enter(self, directory, node):
+        hits = []
+        listings = []
+        self._expand(directory, (node,), hits, listings)
+        return hits, listings
+
+    @staticmethod
+    def _children(nodes, name):
+        if len(nodes) == 1:
+            return nodes[0].children(name)
+        return [child for node in nodes for child in node.children(name)]
+
+    @staticmethod
+    def _key(nodes):
+        return "\n\n".join(sorted(node.key for node in nodes))
+
+    def _replay(self, directory, nodes, entry):
+        """Rebuild hits and follow-up work from an index entry (one lstat per hit)."""
+        hits = []
+        listings = []
+        for name in entry["hits"]:
+            path = os.path.join(directory, name)
+            try:
+                hits.append(_stat_hit(path, self._lstat(path)))
+            except OSError:
+                continue
+        for name in entry["children"]:
+            self._expand(os.path.join(directory, name), tuple(self._children(nodes, name)), hits, listings)
+        return hits, listings
+
+    def _scan_dir(self, directory, nodes):
+        """List one directory and evaluate every pattern passing through it."""
+        hits = []
+        listings = []
+        dir_stat = None
+        if self.index is not None:
+            try:
+                dir_stat = self.stat_cache.stat(directory) if self.stat_cache else os.stat(directory)
+            except OSError:
+                return hits, listings
+            entry = self.index.lookup(directory, self._key(nodes), dir_stat)
+            if entry is not None:
+                return self._replay(directory, nodes, entry)
+        hit_names = []
+        child_names = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    children = self._children(nodes, entry.name)
+                    if not children:
+                        continue
+                    try:
+                        if any(child.terminal for child in children):
+                            # A matched target is removed whole: nothing below it needs a visit
+                            st = entry.stat(follow_symlinks=False)
+                            hits.append(_stat_hit(entry.path, st, entry.inode()))
+                            hit_names.append(entry.name)
+                            if self.stat_cache:
+                                self.stat_cache.remember(entry.path, st, follow_symlinks=False)
+                        elif entry.is_dir(follow_symlinks=False):
+                            child_names.append(entry.name)
+                            self._expand(entry.path, tuple(children), hits, listings)
+                    except OSError:
+                        continue
+        except OSError:
+            # Missing roots and unreadable directories simply yield nothing
+            return hits, listings
+        if dir_stat is not None:
+            self.index.store(directory, self._key(nodes), dir_stat, hit_names, child_names)
+        return hits, listings
+
+    def scan(self, patterns):
+        """Yield a ScanHit for every existing path matching one of the patterns.
+
+        Args:
+            patterns: Iterable of glob patterns, or a compiled PathMatcher
+        """
+        matcher = patterns if isinstance(patterns, PathMatcher) else PathMatcher(patterns)
+
+        start = time.perf_counter()
+        seen = set()
+        # Directory hits wait here until every level below them has been measured:
+        # path -> [hit, usage, files, outstanding measure tasks]
+        measuring = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # future -> None for pattern tasks, or the target path a measure task belongs to
+            pending = {pool.submit(self._enter, anchor, node): None for anchor, node in matcher.roots.items()}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    target = pending.pop(future)
+                    if target is not None:
+                        usage, files, subdirs = future.result()
+                        state = measuring[target]
+                        state[1] += usage
+                        state[2] += files
+                        state[3] += len(subdirs) - 1
+                        for directory in subdirs:
+                            pending[pool.submit(self._measure_dir, directory)] = target
+                        if state[3] == 0:
+                            hit = measuring.pop(target)[0]
+                            yield hit._replace(usage=hit.usage + state[1], files=state[2])
+                        continue
+
+                    hits, listings = future.result()
+                    for directory, nodes in listings:
+                        pending[pool.submit(self._scan_dir, directory, nodes)] = None
+                    for hit in hits:
+                        # Overlapping patterns must not hand the same entry to the cleaner twice
+                        key = os.path.normcase(hit.path)
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        if hit.kind == "dir":
+                            measuring[hit.path] = [hit, 0, 0, 1]
+                            pending[pool.submit(self._measure_dir, hit.path)] = hit.path
+                        else:
+                            yield hit
+
+        if self.index is not None:
+            self.index.save(time.perf_counter() - start)
+
+
+# --- Tree Deleter ---
+
+# fd-relative deletion needs dir_fd support for unlink/rmdir and fd-based scandir (POSIX)
+_FD_DELETE = (
+    os.unlink in os.supports_dir_fd
+    and os.rmdir in os.supports_dir_fd
+    and os.scandir in os.supports_fd
+)
+_DIR_FLAGS = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0) | getattr(os, "O_NOFOLLOW", 0)
+
+
+def format_size(num_bytes):
+    """Human readable byte count (e.g. 12.3 MB)."""
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class DeleteStats:
+    """Per-target deletion report: files and bytes removed, wall time and per-path errors."""
+
+    __slots__ = ("path", "files", "bytes", "seconds", "errors")
+
+    def __init__(self, path):
+        self.path = path
+        self.files = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.errors = []
+
+    def merge(self, other):
+        self.files += other.files
+        self.bytes += other.bytes
+        self.errors.extend(other.errors)
+
+
+class TreeDeleter:
+    """Delete directory trees concurrently.
+
+    Byte counts come from the scan (ScanHit.usage), so deletion never stats a file.
+
+    A tree is split breadth-first until there are enough subtrees to keep the
+    worker pool busy. Each subtree is emptied on a worker with unlink/rmdir calls
+    relative to an open directory fd (no path re-resolution, no symlink following),
+    then the split directories are removed bottom-up. Platforms without dir_fd
+    support fall back to the same walk using full paths; there NTFS junctions,
+    which DirEntry.is_dir() reports as directories, are removed without being
+    entered, as shutil.rmtree does.
+    """
+
+    # Stop splitting after this many levels even if the tree is narrow
+    MAX_SPLIT_DEPTH = 3
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self._pool = None
+
+    def __enter__(self):
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self
+
+    def __exit__(self, *exc):
+        self._pool.shutdown(wait=True)
+        self._pool = None
+
+    @staticmethod
+    def _open_dir(target, dir_fd):
+        if not _FD_DELETE:
+            return None
+        return os.open(target, _DIR_FLAGS, dir_fd=dir_fd)
+
+    @staticmethod
+    def _close_dir(fd):
+        if fd is not None:
+            os.close(fd)
+
+    def _list(self, top, dir_fd, stats):
+        """Unlink the files of one directory and return its subdirectories as (name/path, full path)."""
+        subdirs = []
+        with os.scandir(dir_fd if dir_fd is not None else top) as it:
+            entries = list(it)
+        for entry in entries:
+            target = entry.name if dir_fd is not None else entry.path
+            full = os.path.join(top, entry.name)
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if dir_fd is None and _is_reparse_point(entry.stat(follow_symlinks=False)):
+                        # A junction reports as a directory: remove the link, not its target's contents
+                        os.rmdir(target)
+                        continue
+                    subdirs.append((target, full))
+                    continue
+                os.unlink(target, dir_fd=dir_fd)
+                stats.files += 1
+            except OSError as e:
+                stats.errors.append((full, e))
+        return subdirs
+
+    def _purge(self, top, dir_fd, stats):
+        """Empty one directory recursively (serial, used inside a worker)."""
+        for target, full in self._list(top, dir_fd, stats):
+            try:
+                child_fd = self._open_dir(target, dir_fd)
+                try:
+                    self._purge(full, child_fd, stats)
+                finally:
+                    self._close_dir(child_fd)
+                os.rmdir(target, dir_fd=dir_fd)
+            except OSError as e:
+                stats.errors.append((full, e))
+
+    def _remove_subtree(self, parent_fd, target, full):
+        stats = DeleteStats(full)
+        try:
+            fd = self._open_dir(target, parent_fd)
+            try:
+                self._purge(full, fd, stats)
+            finally:
+                self._close_dir(fd)
+            os.rmdir(target, dir_fd=parent_fd)
+        except OSError as e:
+            stats.errors.append((full, e))
+        return stats
+
+    def _remove_tree(self, path, stats):
+        root_fd = self._open_dir(path, None)
+        # Directories opened while splitting: (parent fd, target, full path, own fd)
+        opened = []
+        try:
+            frontier = [(root_fd, target, full) for target, full in self._list(path, root_fd, stats)]
+            depth = 1
+            while frontier and len(frontier) < self.max_workers * 4 and depth < self.MAX_SPLIT_DEPTH:
+                next_frontier = []
+                for parent_fd, target, full in frontier:
+                    try:
+                        fd = self._open_dir(target, parent_fd)
+                    except OSError as e:
+                        stats.errors.append((full, e))
+                        continue
+                    opened.append((parent_fd, target, full, fd))
+                    try:
+                        next_frontier.extend((fd, t, f) for t, f in self._list(full, fd, stats))
+                    except OSError as e:
+                        stats.errors.append((full, e))
+                frontier = next_frontier
+                depth += 1
+
+            for sub_stats in self._pool.map(lambda job: self._remove_subtree(*job), frontier):
+                stats.merge(sub_stats)
+
+            # Split directories are empty now; remove them deepest first
+            for parent_fd, target, full, fd in reversed(opened):
+                self._close_dir(fd)
+                try:
+                    os.rmdir(target, dir_fd=parent_fd)
+                except OSError as e:
+                    stats.errors.append((full, e))
+            opened = []
+        finally:
+            for _, _, _, fd in opened:
+                self._close_dir(fd)
+            self._close_dir(root_fd)
+        os.rmdir(path)
+
+    def delete(self, hit):
+        """Remove one ScanHit and return its DeleteStats."""
+        stats = DeleteStats(hit.path)
+        start = time.perf_counter()
+        try:
+            if hit.kind == "dir" and not _FD_DELETE and _is_reparse_point(os.lstat(hit.path)):
+                os.rmdir(hit.path)
+            elif hit.kind == "dir":
+                self._remove_tree(hit.path, stats)
+            else:
+                os.remove(hit.path)
+                stats.files = 1
+        except OSError as e:
+            stats.errors.append((hit.path, e))
+        # Sizes were measured during the scan; only a fully removed target counts as reclaimed
+        if not stats.errors:
+            stats.bytes = hit.usage
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+
+# --- Quarantine ---
+
+def _lower_priority():
+    """Run the rest of this process at idle CPU (and, on Linux, idle I/O) priority."""
+    try:
+        import psutil
+        proc = psutil.Process()
+        if IS_WINDOWS:
+            proc.nice(psutil.IDLE_PRIORITY_CLASS)
+        else:
+            proc.nice(19)
+            if IS_LINUX:
+                proc.ionice(psutil.IOPRIO_CLASS_IDLE)
+    except Exception:
+        pass
+
+
+class Quarantine:
+    """Same-filesystem holding area for removed targets.
+
+    Moving a target in is one os.rename, so a clean returns (and Antigravity can
+    be reinstalled) without waiting for large trees to be deleted. Every run gets
+    its own batch directory with a manifest of the original paths. A batch can be
+    restored until it is purged, which happens on a low-priority background
+    process or on the next run.
+
+    Purge and restore first claim a batch by renaming it, so the two never work
+    on the same batch at once.
+    """
+
+    MANIFEST = "manifest.jsonl"
+    PURGING = ".purging"
+    RESTORING = ".restoring"
+
+    def __init__(self, root=QUARANTINE_DIR):
+        self.root = root
+        self.batch = None
+        self._slots = 0
+
+    def batches(self):
+        """Names of the batches that can still be restored, oldest first."""
+        try:
+            with os.scandir(self.root) as it:
+                return sorted(
+                    e.name for e in it
+                    if e.is_dir(follow_symlinks=False) and "." not in e.name
+                )
+        except OSError:
+            return []
+
+    def manifest(self, batch):
+        """Return the manifest entries ({"slot", "hit"}) of a batch."""
+        entries = []
+        try:
+            with open(os.path.join(self.root, batch, self.MANIFEST), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entries.append(json.loads(line))
+        except (OSError, ValueError):
+            pass
+        return entries
+
+    def new_batch(self):
+        """Start a fresh batch on the next move()."""
+        self.batch = None
+        self._slots = 0
+
+    def move(self, hit):
+        """Rename a ScanHit into the current batch.
+
+        Raises OSError when the target cannot be renamed (e.g. it is on another
+        filesystem); the caller deletes it in place instead.
+        """
+        if self.batch is None:
+            batch = datetime.now().strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+            os.makedirs(os.path.join(self.root, batch), mode=0o700)
+            self.batch = batch
+        batch_dir = os.path.join(self.root, self.batch)
+        slot = str(self._slots)
+        os.rename(hit.path, os.path.join(batch_dir, slot))
+        self._slots += 1
+        with open(os.path.join(batch_dir, self.MANIFEST), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"slot": slot, "hit": hit._asdict()}) + "\n")
+
+    def restore(self, batch):
+        """Move the entries of a batch back to their original paths.
+
+        Returns:
+            Tuple of (restored paths, [(path, reason)] for entries left in quarantine)
+        """
+        batch_dir = os.path.join(self.root, batch)
+        claimed = batch_dir + self.RESTORING
+        try:
+            os.rename(batch_dir, claimed)
+        except OSError as e:
+            return [], [(batch, f"cannot claim batch (already purged?): {e}")]
+
+        restored = []
+        skipped = []
+        for entry in self.manifest(os.path.basename(claimed)):
+            original = entry["hit"]["path"]
+            source = os.path.join(claimed, entry["slot"])
+            if not os.path.lexists(source):
+                continue
+            if os.path.lexists(original):
+                skipped.append((original, "path exists again"))
+                continue
+            try:
+                os.makedirs(os.path.dirname(original), exist_ok=True)
+                os.rename(source, original)
+                restored.append(original)
+            except OSError as e:
+                skipped.append((original, str(e)))
+
+        if skipped:
+            # Whatever could not go back stays restorable
+            os.rename(claimed, batch_dir)
+        else:
+            os.remove(os.path.join(claimed, self.MANIFEST))
+            os.rmdir(claimed)
+        return restored, skipped
+
+    def purge(self, batches=None, max_workers=None):
+        """Delete batches for good (default: every batch, plus interrupted purges).
+
+        Returns:
+            List of (batch, DeleteStats)
+        """
+        if batches is None:
+            try:
+                with os.scandir(self.root) as it:
+                    batches = sorted(
+                        e.name for e in it
+                        if e.is_dir(follow_symlinks=False) and not e.name.endswith(self.RESTORING)
+                    )
+            except OSError:
+                batches = []
+
+        results = []
+        with TreeDeleter(max_workers=max_workers) as deleter:
+            for batch in batches:
+                claimed = os.path.join(self.root, batch)
+                if not batch.endswith(self.PURGING):
+                    try:
+                        os.rename(claimed, claimed + self.PURGING)
+                    except OSError:
+                        # Restored, or claimed by another purge
+                        continue
+                    claimed += self.PURGING
+                entries = self.manifest(os.path.basename(claimed))
+                target = ScanHit(
+                    claimed, "dir", 0, 0, 0,
+                    sum(e["hit"]["usage"] for e in entries), sum(e["hit"]["files"] for e in entries),
+                )
+                results.append((batch, deleter.delete(target)))
+        return results
+
+    def purge_in_background(self, batches):
+        """Purge batches from a detached, low-priority process that outlives this one.
+
+        Returns:
+            PID of the purge process
+        """
+        cmd = [sys.executable, os.path.abspath(__file__), "quarantine", "purge", "--low-priority", *batches]
+        kwargs = {}
+        if IS_WINDOWS:
+            kwargs["creationflags"] = (
+                subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.IDLE_PRIORITY_CLASS
+            )
+        else:
+            kwargs["start_new_session"] = True
+        proc = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs
+        )
+        return proc.pid
+
 
 class Cleaner:
-    def __init__(self):
+    def __init__(self, home=None, label=None, stat_cache=None):
+        """home: user home directory to clean (default: current user); label prefixes log lines;
+        stat_cache: filesystem metadata cache (default: the one shared with the browser and session helpers)."""
         self.dry_run = False
+        self.stat_cache = stat_cache or STAT_CACHE
         self.found_items = []
+        self.home = home or os.path.expanduser("~")
+        self.label = label
+        self.logger = start_logging()
+        # Quarantine mode: rename targets aside and delete them later in the background
+        self.use_quarantine = False
+        self.keep_quarantine = False
+        self.quarantine = Quarantine(os.path.join(self.home, ".antigravity-cleaner", "quarantine"))
+
+    @property
+    def is_current_user(self):
+        return os.path.normcase(self.home) == os.path.normcase(os.path.expanduser("~"))
 
     def log(self, message, style="dim"):
-        """Log to file and console."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] {message}"
-        
-        # Write to file
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(log_entry + "\n")
-            
-        # Write to console (fancy)
-        console.print(f"[{style}]{message}[/{style}]")
+        """Log to file and console (queued, written by the background log thread)."""
+        if self.label:
+            message = f"[{self.label}] {message}"
+        self.logger.info(message, extra={"style": style})
 
+    @traced("user_prompt")
     def get_user_confirmation(self, question):
+        # Make sure everything logged so far is on screen before the prompt
+        flush_logging()
+        from rich.prompt import Confirm
         return Confirm.ask(question)
 
     # --- Scanning Logic ---
 
+    @traced("scan_processes")
     def scan_processes(self):
         """Check if Antigravity is running."""
         self.log("Scanning for running processes...", style="cyan")
-        running = []
-        for proc in psutil.process_iter(['pid', 'name']):
-            try:
-                if APP_NAME.lower() in proc.info['name'].lower():
-                    running.append(proc)
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-        return running
+        from process_table import PROCESS_TABLE
+        from keywords import get_matcher
+        return PROCESS_TABLE.to_processes(PROCESS_TABLE.find(get_matcher([APP_NAME]).search_lowered))
 
+    @traced("kill_processes")
     def kill_processes(self, processes):
         if not processes:
             return
@@ -94,16 +992,27 @@ class Cleaner:
             self.log("[Dry Run] Would terminate processes.", style="yellow")
             return
 
-        for proc in processes:
-            try:
-                proc.kill()
+        # Whole trees (renderers, language servers...) get SIGTERM together, SIGKILL if they linger
+        from process_table import PROCESS_TABLE
+        start = time.monotonic()
+        gone, alive = PROCESS_TABLE.terminate(processes)
+        roots = {proc.pid for proc in processes}
+        for proc in gone:
+            if proc.pid in roots:
                 self.log(f"Killed process {proc.info['name']} (PID: {proc.info['pid']})", style="green")
-            except Exception as e:
-                self.log(f"Failed to kill {proc.info['name']}: {e}", style="red")
+        children = len([proc for proc in gone if proc.pid not in roots])
+        if children:
+            self.log(f"Stopped {children} child processes.", style="green")
+        for proc in alive:
+            self.log(f"Failed to kill {proc.info['name']} (PID: {proc.info['pid']})", style="red")
+        self.log(f"Termination finished in {time.monotonic() - start:.2f}s", style="dim")
 
+    @traced("find_uninstallers")
     def find_uninstallers_windows(self):
         """Find uninstall strings in Windows Registry."""
         self.log("Scanning Windows Registry for uninstallers...", style="cyan")
+        from keywords import get_matcher
+        app_matcher = get_matcher([APP_NAME])
         uninstallers = []
         roots = [
             (winreg.HKEY_CURRENT_USER, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
@@ -120,7 +1029,7 @@ class Cleaner:
                             with winreg.OpenKey(key, subkey_name) as subkey:
                                 try:
                                     display_name = winreg.QueryValueEx(subkey, "DisplayName")[0]
-                                    if APP_NAME.lower() in display_name.lower():
+                                    if app_matcher(display_name):
                                         uninstall_string = winreg.QueryValueEx(subkey, "UninstallString")[0]
                                         uninstallers.append({
                                             "name": display_name,
@@ -138,12 +1047,14 @@ class Cleaner:
     def get_cleanup_paths(self, deep=False):
         """Return list of paths to check based on OS."""
         paths = []
-        home = os.path.expanduser("~")
+        home = self.home
+        # The environment only describes the user running the tool
+        env = os.environ if self.is_current_user else {}
 
         if IS_WINDOWS:
-            local_appdata = os.environ.get("LOCALAPPDATA", os.path.join(home, "AppData", "Local"))
-            appdata = os.environ.get("APPDATA", os.path.join(home, "AppData", "Roaming"))
-            temp = os.environ.get("TEMP", os.path.join(local_appdata, "Temp"))
+            local_appdata = env.get("LOCALAPPDATA", os.path.join(home, "AppData", "Local"))
+            appdata = env.get("APPDATA", os.path.join(home, "AppData", "Roaming"))
+            temp = env.get("TEMP", os.path.join(local_appdata, "Temp"))
             
             paths.extend([
                 os.path.join(local_appdata, "Programs", "Antigravity"),
@@ -157,7 +1068,7 @@ class Cleaner:
                 paths.extend([
                     os.path.join(temp, "antigravity-stable-user-x64"),
                     os.path.join(temp, "is-*.tmp"), # Inno Setup temp files
-                    # Chrome Extension Trace (Wildcard structure handled by expand_globs)
+                    # Chrome Extension Trace (Wildcard structure handled by LeftoverScanner)
                     os.path.join(local_appdata, "Google", "Chrome", "User Data", "*", "Extensions", "*", "*", "*antigravity*"),
                     # Python Lib Trace
                     os.path.join(local_appdata, "Python", "pythoncore-*", "Lib", "antigravity.py")
@@ -179,41 +1090,212 @@ class Cleaner:
                 os.path.join(home, ".cache", "Antigravity"),
             ])
 
+        if not self.is_current_user:
+            # System-wide paths (e.g. /Applications) are handled by the invoking user's run
+            paths = [p for p in paths if p.startswith(home + os.sep)]
         return paths
 
-    def expand_globs(self, paths):
-        """Expand wildcard paths."""
-        expanded = []
-        for p in paths:
-            # Simple check if it's a glob pattern or exact path
-            if "*" in p:
-                expanded.extend(glob.glob(p))
-            else:
-                expanded.append(p)
-        return list(set(expanded)) # Unique
-
-    def clean_paths(self, paths):
-        found_any = False
-        for p in paths:
-            if os.path.exists(p):
-                found_any = True
-                if self.dry_run:
-                    self.log(f"[Dry Run] Would remove: {p}", style="yellow")
-                else:
-                    try:
-                        if os.path.isdir(p):
-                            shutil.rmtree(p)
-                        else:
-                            os.remove(p)
-                        self.log(f"Removed: {p}", style="green")
-                    except Exception as e:
-                        self.log(f"Error removing {p}: {e}", style="red")
-        
-        if not found_any:
+    @traced("scan_leftovers")
+    def scan_leftovers(self, deep=False):
+        """Return ScanHits for all cleanup paths that exist on this machine."""
+        index_file = SCAN_INDEX_FILE
+        if not self.is_current_user:
+            # One index per user, kept in the invoking user's directory (never written into other homes)
+            index_file = SCAN_INDEX_FILE.replace(".json", f"-{os.path.basename(self.home)}.json")
+        index = ScanIndex(index_file)
+        start = time.perf_counter()
+        hits = list(LeftoverScanner(index=index, stat_cache=self.stat_cache).scan(self.get_cleanup_paths(deep=deep)))
+        elapsed = time.perf_counter() - start
+
+        if index.warm:
+            cold = f", cold scan took {index.cold_seconds:.3f}s" if index.cold_seconds else ""
+            self.log(
+                f"Leftover scan: {elapsed:.3f}s warm ({index.reused} directories unchanged, {index.listed} listed{cold})",
+                style="dim",
+            )
+        else:
+            self.log(f"Leftover scan: {elapsed:.3f}s cold ({index.listed} directories listed)", style="dim")
+        return self._confine(hits)
+
+    def _confine(self, hits):
+        """Drop hits of another user's home whose parent directories resolve outside that home.
+
+        The scanner follows the literal directories above a target, so a user could
+        point ~/.cache at a directory of someone else's and have root clean it.
+        The target itself is never followed (a symlink target is removed as a link).
+        """
+        if self.is_current_user:
+            return hits
+        home = os.path.realpath(self.home)
+        confined = []
+        for hit in hits:
+            parent = os.path.realpath(os.path.dirname(hit.path))
+            if parent != home and not parent.startswith(home + os.sep):
+                self.log(f"Skipping {hit.path}: resolves to {parent}, outside {self.home}", style="red")
+                continue
+            confined.append(hit)
+        return confined
+
+    @traced("clean_paths")
+    def clean_paths(self, hits):
+        """Remove scanned hits. The scanner already checked existence and type.
+
+        In quarantine mode the hits are renamed into a quarantine batch and purged
+        by a background process (or kept for rollback with keep_quarantine); hits
+        that cannot be renamed are deleted in place.
+
+        Returns a summary dict: locations, files, bytes (reclaimed, or reclaimable
+        in dry-run and quarantine mode), errors and quarantined.
+        """
+        # Checked again right before acting: the home's owner may have swapped a directory since the scan
+        hits = self._confine(hits)
+        summary = {"locations": len(hits), "files": 0, "bytes": 0, "errors": 0, "quarantined": 0}
+        stale = self._stale_batches()
+        if not hits:
             self.log("No leftover files found in standard paths.", style="dim")
+            self._purge_quarantine(stale)
+            return summary
+
+        if self.dry_run:
+            verb = "move to quarantine" if self.use_quarantine else "remove"
+            for hit in hits:
+                self.log(f"[Dry Run] Would {verb}: {hit.path} ({hit.files} files, {format_size(hit.usage)})", style="yellow")
+            summary["files"] = sum(h.files for h in hits)
+            summary["bytes"] = sum(h.usage for h in hits)
+            self.log(
+                f"[Dry Run] Would reclaim {format_size(summary['bytes'])} from {summary['files']} files.",
+                style="bold yellow",
+            )
+            return summary
+
+        to_delete = hits
+        if self.use_quarantine:
+            to_delete = []
+            self.quarantine.new_batch()
+            start = time.perf_counter()
+            for hit in hits:
+                try:
+                    self.quarantine.move(hit)
+                except OSError as e:
+                    self.log(f"Cannot quarantine {hit.path} ({e}), deleting in place", style="dim")
+                    to_delete.append(hit)
+                    continue
+                self.stat_cache.invalidate(hit.path)
+                summary["quarantined"] += 1
+                summary["files"] += hit.files
+                summary["bytes"] += hit.usage
+                PATHS_REMOVED.inc(mode="quarantine")
+                BYTES_RECLAIMED.inc(hit.usage, mode="quarantine")
+                self.log(f"Quarantined: {hit.path} ({hit.files} files, {format_size(hit.usage)})", style="green")
+            if summary["quarantined"]:
+                self.log(
+                    f"Moved {summary['quarantined']} targets ({format_size(summary['bytes'])}) to quarantine "
+                    f"in {time.perf_counter() - start:.3f}s.",
+                    style="bold green",
+                )
+
+        reclaimed = 0
+        removed_files = 0
+        if to_delete:
+            with TreeDeleter() as deleter:
+                for hit in to_delete:
+                    stats = deleter.delete(hit)
+                    self.stat_cache.invalidate(hit.path)
+                    removed_files += stats.files
+                    reclaimed += stats.bytes
+                    summary["errors"] += len(stats.errors)
+                    BYTES_RECLAIMED.inc(stats.bytes, mode="delete")
+                    for path, e in stats.errors:
+                        self.log(f"Error removing {path}: {e}", style="red")
+                    if not stats.errors:
+                        PATHS_REMOVED.inc(mode="delete")
+                        self.log(
+                            f"Removed: {hit.path} ({stats.files} files, {format_size(stats.bytes)}, {stats.seconds:.2f}s)",
+                            style="green",
+                        )
+                    else:
+                        self.log(f"Partially removed: {hit.path} ({stats.files} files)", style="yellow")
+            self.log(f"Reclaimed {format_size(reclaimed)} from {removed_files} files.", style="bold green")
+        summary["files"] += removed_files
+        summary["bytes"] += reclaimed
+
+        batch = self.quarantine.batch if self.use_quarantine else None
+        if batch and self.keep_quarantine:
+            self.log(f"Kept in quarantine batch {batch}. Undo with: main.py quarantine restore {batch}", style="cyan")
+            self._purge_quarantine(stale)
+        elif batch:
+            self._purge_quarantine(stale + [batch])
+        else:
+            self._purge_quarantine(stale)
+        return summary
+
+    def _stale_batches(self):
+        # Batches left by earlier runs (kept, or interrupted) are purged on this run
+        return self.quarantine.batches() if self.is_current_user and not self.dry_run else []
+
+    def _purge_quarantine(self, batches):
+        if not batches:
+            return
+        try:
+            pid = self.quarantine.purge_in_background(batches)
+        except OSError as e:
+            self.log(f"Could not start the quarantine purge: {e}", style="red")
+            return
+        self.log(f"Purging {len(batches)} quarantine batches in the background (PID {pid}).", style="dim")
+
+    def purge_quarantine(self, batches=None, low_priority=False):
+        """Delete quarantine batches now (the background purge process runs this)."""
+        if low_priority:
+            _lower_priority()
+        results = self.quarantine.purge(batches, max_workers=2 if low_priority else None)
+        for batch, stats in results:
+            for path, e in stats.errors:
+                self.log(f"Error removing {path}: {e}", style="red")
+            self.log(
+                f"Purged quarantine batch {batch}: {stats.files} files, {format_size(stats.bytes)} in {stats.seconds:.2f}s",
+                style="green" if not stats.errors else "yellow",
+            )
+        return results
+
+    def restore_quarantine(self, batch=None):
+        """Undo a quarantine batch (default: the most recent one). Returns True if everything was restored."""
+        batches = self.quarantine.batches()
+        if batch is None:
+            if not batches:
+                self.log("Nothing in quarantine to restore.", style="yellow")
+                return False
+            batch = batches[-1]
+        restored, skipped = self.quarantine.restore(batch)
+        for path in restored:
+            self.stat_cache.invalidate(path)
+            self.log(f"Restored: {path}", style="green")
+        for path, reason in skipped:
+            self.log(f"Not restored: {path} ({reason})", style="yellow")
+        return not skipped
 
 
+    def _log_command_results(self, results, success_message=None):
+        """Log what each CommandRunner result did; returns True if every command succeeded."""
+        from command_runner import format_command
+
+        ok = True
+        for result in results:
+            cmd = format_command(result.command)
+            output = (result.stderr.strip() or result.stdout.strip()).splitlines()
+            detail = f": {output[-1]}" if output else ""
+            if result.error:
+                ok = False
+                self.log(f"{cmd}: {result.error}{detail}", style="red")
+            elif result.returncode != 0:
+                ok = False
+                self.log(f"{cmd}: exit code {result.returncode} ({result.seconds:.2f}s){detail}", style="red")
+            else:
+                self.log(success_message or f"{cmd}: ok ({result.seconds:.2f}s)", style="green")
+        return ok
+
+    @traced("run_uninstallers")
     def run_windows_uninstallers(self, uninstallers):
+        commands = []
         for item in uninstallers:
             cmd = item['cmd']
             self.log(f"Running uninstaller for: {item['name']}", style="bold white")
@@ -223,41 +1305,30 @@ class Cleaner:
 
             # Attempt to parse quiet flags
             # This is heuristic based on the legacy script
-            final_cmd = cmd
-            args = []
-            
             if "msiexec" in cmd.lower():
-                args = ["/qn", "/norestart"]
-                # We need to restructure for subprocess
                 # cmd usually: msiexec /x {GUID}
                 parts = cmd.split()
-                exe = parts[0]
-                arguments = parts[1:] + args
-                try:
-                    subprocess.run([exe] + arguments, check=True)
-                    self.log("MSI Uninstall complete.", style="green")
-                except subprocess.CalledProcessError as e:
-                    self.log(f"Uninstall failed: {e}", style="red")
-            
+                commands.append(parts + ["/qn", "/norestart"])
             elif "unins" in cmd.lower() and ".exe" in cmd.lower():
                  # Ex: "C:\path\unins000.exe"
-                 # We simply run it with silent flags
                  # Need to extract the exe path carefully if quoted
                  import shlex
-                 parts = shlex.split(cmd)
-                 exe = parts[0]
+                 exe = shlex.split(cmd)[0]
                  # Common InnoSetup/NSIS silent flags
-                 silent_args = ["/VERYSILENT", "/SUPPRESSMSGBOXES", "/NORESTART"]
-                 try:
-                    subprocess.run([exe] + silent_args, check=True)
-                    self.log("Uninstaller executed successfully.", style="green")
-                 except subprocess.CalledProcessError as e:
-                    self.log(f"Uninstaller failed: {e}", style="red")
+                 commands.append([exe, "/VERYSILENT", "/SUPPRESSMSGBOXES", "/NORESTART"])
             else:
                 self.log(f"Unknown uninstaller type. Running manually: {cmd}", style="yellow")
-                subprocess.run(cmd, shell=True)
+                commands.append(cmd)
+
+        if commands:
+            from command_runner import CommandRunner
+
+            # Windows Installer runs one transaction at a time: uninstall strictly in order
+            runner = CommandRunner(timeout=UNINSTALL_TIMEOUT, max_concurrency=1)
+            self._log_command_results(runner.run(commands))
 
 
+    @traced("network_reset")
     def network_reset(self):
         self.log("Resetting Network Settings...", style="bold magenta")
         
@@ -283,85 +1354,337 @@ class Cleaner:
             for cmd in commands:
                 self.log(f"[Dry Run] Would run: {cmd}", style="yellow")
         else:
+            from command_runner import CommandRunner
+
             for cmd in commands:
                 self.log(f"Executing: {cmd}", style="cyan")
-                try:
-                    subprocess.run(cmd, shell=True, check=False) # Check false to ignore errors on missing cmds
-                except Exception as e:
-                    self.log(f"Error running {cmd}: {e}", style="red")
-            self.log("Network reset complete. Restart recommended.", style="green")
+            # Independent resets run concurrently; a hung command can no longer block --auto
+            runner = CommandRunner(timeout=NETWORK_COMMAND_TIMEOUT, overall_timeout=NETWORK_RESET_DEADLINE)
+            start = time.perf_counter()
+            self._log_command_results(runner.run(commands))  # Failures (e.g. missing commands) are logged, not fatal
+            self.log(f"Network reset complete in {time.perf_counter() - start:.2f}s. Restart recommended.", style="green")
 
 
-    # --- Main Actions ---
+    # --- Cleanup Plans ---
 
-    def run_clean(self, deep=False):
-        # 1. Check processes
+    @traced("build_plan")
+    def build_plan(self, deep=False):
+        """Scan once and describe everything a clean would touch.
+
+        The plan is plain JSON-serializable data: processes (with create time),
+        registry uninstallers and leftover paths with kind, size, inode and mtime.
+        """
+        import psutil
         procs = self.scan_processes()
+        uninstallers = self.find_uninstallers_windows() if IS_WINDOWS else []
+
+        self.log("Scanning for leftovers...", style="bold white")
+        hits = self.scan_leftovers(deep=deep)
+
+        processes = []
+        for proc in procs:
+            try:
+                processes.append({"pid": proc.pid, "name": proc.info["name"], "create_time": proc.create_time()})
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+        return {
+            "version": PLAN_VERSION,
+            "created": datetime.now().isoformat(),
+            "host": platform.node(),
+            "os": CURRENT_OS,
+            "deep": deep,
+            "processes": processes,
+            "uninstallers": uninstallers,
+            "paths": [hit._asdict() for hit in hits],
+        }
+
+    def save_plan(self, plan, plan_file):
+        with open(plan_file, "w", encoding="utf-8") as f:
+            json.dump(plan, f, indent=2)
+        self.log(f"Cleanup plan written to {plan_file} ({len(plan['paths'])} paths)", style="green")
+
+    @staticmethod
+    def load_plan(plan_file):
+        with open(plan_file, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+        if plan.get("version") != PLAN_VERSION:
+            raise ValueError(f"Unsupported plan version: {plan.get('version')}")
+        return plan
+
+    @traced("validate_processes")
+    def _validate_plan_processes(self, entries):
+        """Return processes from the plan that are still the same running process."""
+        import psutil
+        procs = []
+        for entry in entries:
+            try:
+                proc = psutil.Process(entry["pid"])
+                # A recycled PID has a different create time
+                if proc.create_time() != entry["create_time"]:
+                    continue
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            proc.info = {"pid": entry["pid"], "name": entry["name"]}
+            procs.append(proc)
+        return procs
+
+    @traced("validate_paths")
+    def _validate_plan_paths(self, entries, directory_mtime=True):
+        """Cheap re-validation of planned paths: one lstat each, same type, inode and mtime.
+
+        The lstat bypasses the stat cache: validation exists to notice changes made
+        since the scan, which a cached result would hide.
+
+        directory_mtime=False compares directories by type and inode only: a
+        directory's mtime changes with every direct child, e.g. when the planned
+        processes are stopped and the app writes its user data on exit.
+        """
+        hits = []
+        for entry in entries:
+            hit = ScanHit(**entry)
+            try:
+                st = os.lstat(hit.path)
+            except FileNotFoundError:
+                self.log(f"Skipping {hit.path}: no longer exists", style="dim")
+                continue
+            except OSError as e:
+                self.log(f"Skipping {hit.path}: {e}", style="red")
+                continue
+            kind = "dir" if stat.S_ISDIR(st.st_mode) else "file"
+            mtime_changed = st.st_mtime_ns != hit.mtime and (directory_mtime or kind != "dir")
+            if kind != hit.kind or (hit.inode and st.st_ino != hit.inode) or mtime_changed:
+                self.log(f"Skipping {hit.path}: changed since the plan was made", style="yellow")
+                continue
+            hits.append(hit)
+        return hits
+
+    def _stop_and_uninstall(self, procs, uninstallers, interactive=True):
+        """Kill running instances and run the registry uninstallers (steps 1 and 2 of a clean)."""
+        # 1. Check processes
         if procs:
-            if self.dry_run or self.get_user_confirmation(f"Found {len(procs)} running instances. Kill them?"):
+            if self.dry_run or not interactive or self.get_user_confirmation(f"Found {len(procs)} running instances. Kill them?"):
                 self.kill_processes(procs)
 
         # 2. Uninstall (Windows only usually has registry uninstallers)
         if IS_WINDOWS:
-            uninstallers = self.find_uninstallers_windows()
             if uninstallers:
                 self.log(f"Found {len(uninstallers)} matching uninstallers.", style="bold white")
                 if self.dry_run:
                     for u in uninstallers: self.log(f" - {u['name']}", style="dim")
                 else:
-                    if self.get_user_confirmation("Run uninstallers first?"):
+                    if not interactive or self.get_user_confirmation("Run uninstallers first?"):
                         self.run_windows_uninstallers(uninstallers)
             else:
                 self.log("No uninstallers found in registry.", style="dim")
 
-        # 3. Clean files
-        self.log("Scanning for leftovers...", style="bold white")
-        target_paths = self.get_cleanup_paths(deep=deep)
-        target_paths = self.expand_globs(target_paths)
-        
-        # Filter existing
-        existing = [p for p in target_paths if os.path.exists(p) or glob.glob(p)]
-        
+    def _clean_hits(self, existing, deep=False):
+        """Step 3 of a clean: remove the leftovers found by a scan or a validated plan."""
         if existing:
-            self.log(f"Found {len(existing)} locations to clean.", style="yellow")
+            self.log(
+                f"Found {len(existing)} locations to clean "
+                f"({sum(h.files for h in existing)} files, {format_size(sum(h.usage for h in existing))}).",
+                style="yellow",
+            )
             self.clean_paths(existing)
         else:
             self.log("No leftovers found.", style="green")
+            self._purge_quarantine(self._stale_batches())
 
         if deep:
              self.log("Deep scan complete.", style="bold green")
 
+    @traced("execute_plan")
+    def execute_plan(self, plan, interactive=True):
+        """Apply a plan from build_plan/load_plan without walking the filesystem again."""
+        self._stop_and_uninstall(
+            self._validate_plan_processes(plan["processes"]), plan["uninstallers"], interactive=interactive,
+        )
+        # Stopped processes and uninstallers change the directories they leave behind
+        expected_changes = bool(plan["processes"] or plan["uninstallers"])
+        existing = self._validate_plan_paths(plan["paths"], directory_mtime=not expected_changes)
+        self._clean_hits(existing, deep=plan["deep"])
+
+    # --- Main Actions ---
+
+    @traced("run_clean")
+    def run_clean(self, deep=False, interactive=True):
+        """Stop Antigravity and run its uninstallers, then scan for and remove what is left."""
+        procs = self.scan_processes()
+        uninstallers = self.find_uninstallers_windows() if IS_WINDOWS else []
+        self._stop_and_uninstall(procs, uninstallers, interactive=interactive)
+
+        self.log("Scanning for leftovers...", style="bold white")
+        self._clean_hits(self.scan_leftovers(deep=deep), deep=deep)
+
     def run_network_reset(self):
         self.network_reset()
 
 
+# --- Fleet Mode ---
+
+def discover_homes(homes_root="/home", passwd_file=None, users=None, min_uid=1000):
+    """Return [(user, home)] for every home directory to clean.
+
+    With passwd_file, entries are read from a passwd-style file (name:x:uid:gid:gecos:home:shell)
+    and system accounts below min_uid are skipped; otherwise every directory under homes_root
+    counts as a home named after the user. users optionally restricts the result.
+    """
+    homes = []
+    if passwd_file:
+        with open(passwd_file, "r", encoding="utf-8") as f:
+            for line in f:
+                fields = line.strip().split(":")
+                if len(fields) < 7 or line.startswith("#"):
+                    continue
+                try:
+                    uid = int(fields[2])
+                except ValueError:
+                    continue
+                if uid >= min_uid and os.path.isdir(fields[5]):
+                    homes.append((fields[0], fields[5]))
+    else:
+        try:
+            with os.scandir(homes_root) as it:
+                homes = [(e.name, e.path) for e in it if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            pass
+
+    if users:
+        homes = [(user, home) for user, home in homes if user in users]
+    return sorted(homes)
+
+
+@contextmanager
+def _run_as_owner(path):
+    """Run the block with the effective uid/gid of path's owner (when running as root on POSIX)."""
+    if not hasattr(os, "seteuid") or os.geteuid() != 0:
+        yield
+        return
+    st = os.stat(path)
+    if st.st_uid == 0:
+        yield
+        return
+    groups = os.getgroups()
+    os.setgroups([st.st_gid])
+    os.setegid(st.st_gid)
+    os.seteuid(st.st_uid)
+    try:
+        yield
+    finally:
+        os.seteuid(0)
+        os.setegid(0)
+        os.setgroups(groups)
+
+
+def _fleet_worker(user, home, deep, dry_run, browsers):
+    """Process-pool worker: scan and clean one home directory, return its summary."""
+    start = time.perf_counter()
+    cleaner = Cleaner(home=home, label=user)
+    cleaner.dry_run = dry_run
+    summary = cleaner.clean_paths(cleaner.scan_leftovers(deep=deep))
+    summary.update(user=user, home=home, cookies=0, browsers_skipped=[])
+
+    if browsers:
+        from browser_helper import BrowserHelper
+        logger = setup_agent_logging()
+        # Profiles get new files (LevelDB logs, LOCK, SQLite journals, backups): create them as their owner
+        with _run_as_owner(home):
+            backup_dir = os.path.join(home, ".antigravity-cleaner", "backups")
+            helper = BrowserHelper(logger, dry_run=dry_run, home=home, backup_dir=backup_dir)
+            idle = []
+            for browser in helper.detect_installed_browsers():
+                # Browser processes are matched by name for the whole machine; never stop
+                # another user's browser, just leave that profile for the next run.
+                if helper.is_browser_running(browser):
+                    cleaner.log(f"{browser} is running, skipping its profiles", style="yellow")
+                    summary["browsers_skipped"].append(browser)
+                    continue
+                idle.append(browser)
+            for stats in helper.clean_browsers(idle).values():
+                summary["cookies"] += stats["cookies"]
+
+    summary["seconds"] = time.perf_counter() - start
+    summary["metrics"] = METRICS.snapshot()
+    stop_logging()
+    return summary
+
+
+def run_fleet(homes, deep=False, dry_run=False, jobs=None, browsers=False):
+    """Clean many home directories on a bounded process pool and merge the results."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    # Processes are machine-wide: handle them once here, not once per user
+    cleaner = Cleaner()
+    cleaner.dry_run = dry_run
+    procs = cleaner.scan_processes()
+    if procs:
+        cleaner.kill_processes(procs)
+
+    jobs = jobs or min(4, os.cpu_count() or 1)
+    cleaner.log(f"Fleet mode: {len(homes)} homes, {jobs} workers", style="bold white")
+    start = time.perf_counter()
+    results = []
+    # spawn: workers must not inherit the parent's logging thread and queue locks
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {
+            pool.submit(_fleet_worker, user, home, deep, dry_run, browsers): (user, home)
+            for user, home in homes
+        }
+        for future in as_completed(futures):
+            user, home = futures[future]
+            try:
+                result = future.result()
+                METRICS.merge(result.pop("metrics"))
+                results.append(result)
+            except Exception as e:
+                cleaner.log(f"[{user}] Fleet worker failed: {e}", style="red")
+                results.append({"user": user, "home": home, "locations": 0, "files": 0, "bytes": 0,
+                                "errors": 1, "cookies": 0, "browsers_skipped": [], "seconds": 0.0,
+                                "failure": str(e)})
+
+    results.sort(key=lambda r: r["user"])
+    totals = {key: sum(r[key] for r in results) for key in ("locations", "files", "bytes", "errors", "cookies")}
+    totals["users"] = len(results)
+    totals["seconds"] = time.perf_counter() - start
+    return {"dry_run": dry_run, "deep": deep, "users": results, "totals": totals}
+
+
+def print_fleet_report(report):
+    from rich.table import Table
+
+    flush_logging()
+    verb = "Reclaimable" if report["dry_run"] else "Reclaimed"
+    table = Table(title="Fleet Report")
+    table.add_column("User", style="cyan")
+    table.add_column("Locations", justify="right")
+    table.add_column("Files", justify="right")
+    table.add_column(verb, justify="right", style="green")
+    table.add_column("Errors", justify="right", style="red")
+    table.add_column("Time", justify="right", style="dim")
+    for r in report["users"]:
+        table.add_row(r["user"], str(r["locations"]), str(r["files"]), format_size(r["bytes"]),
+                      str(r["errors"]), f"{r['seconds']:.2f}s")
+    t = report["totals"]
+    table.add_row(f"[bold]{t['users']} users[/bold]", str(t["locations"]), str(t["files"]),
+                  format_size(t["bytes"]), str(t["errors"]), f"{t['seconds']:.2f}s")
+    console.print(table)
+
+
 # --- Agent Logging Setup ---
 
 def setup_agent_logging():
-    """Setup detailed logging for agent operations"""
-    log_dir = os.path.join(os.path.dirname(__file__), '..', '.agent', 'logs')
-    os.makedirs(log_dir, exist_ok=True)
-    
-    log_file = os.path.join(log_dir, 'browser-helper-operations.log')
-    
-    logger = logging.getLogger('antigravity_agent')
-    logger.setLevel(logging.DEBUG)
-    
-    # Rotating file handler (10MB max, keep 3 backups)
-    handler = RotatingFileHandler(log_file, maxBytes=10*1024*1024, backupCount=3)
-    handler.setFormatter(logging.Formatter(
-        '[%(asctime)s] [%(levelname)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    ))
-    
-    logger.addHandler(handler)
-    return logger
+    """Setup detailed logging for agent operations (safe to call repeatedly)"""
+    start_logging()
+    return _attach_queue(logging.getLogger('antigravity_agent'), logging.DEBUG)
 
 
 # --- Browser Login Helper Submenu ---
 
 def browser_login_helper_menu(browser_helper, network_optimizer, logger):
     """Browser Login Helper submenu"""
+    from rich.prompt import Prompt, Confirm
     while True:
         console.print("\n" + "="*70)
         console.print("[bold cyan]BROWSER LOGIN HELPER | کمک‌کننده ورود[/bold cyan]")
@@ -391,8 +1714,7 @@ def browser_login_helper_menu(browser_helper, network_optimizer, logger):
             browser = Prompt.ask("Select browser to clean", choices=browsers + ["all"], default="all")
             
             if browser == "all":
-                for b in browsers:
-                    stats = browser_helper.clean_browser_completely(b)
+                for b, stats in browser_helper.clean_browsers(browsers).items():
                     console.print(f"\n[green]✓ {b}: {stats['cookies']} cookies, {stats['cache']} cache items cleaned[/green]")
             else:
                 stats = browser_helper.clean_browser_completely(browser)
@@ -414,7 +1736,7 @@ def browser_login_helper_menu(browser_helper, network_optimizer, logger):
             console.print("\n" + report)
             
             # Save to file
-            report_file = os.path.join(os.path.expanduser("~"), "Desktop", "Antigravity-Network-Diagnostic.txt")
+            report_file = DIAGNOSTIC_REPORT_FILE
             with open(report_file, 'w', encoding='utf-8') as f:
                 f.write(report)
             console.print(f"\n[green]✓ Report saved to: {report_file}[/green]")
@@ -425,8 +1747,7 @@ def browser_login_helper_menu(browser_helper, network_optimizer, logger):
             
             # Clean browsers
             browsers = browser_helper.detect_installed_browsers()
-            for b in browsers:
-                stats = browser_helper.clean_browser_completely(b)
+            for b, stats in browser_helper.clean_browsers(browsers).items():
                 console.print(f"[green]✓ {b}: {stats['cookies']} cookies cleaned[/green]")
             
             # Optimize network
@@ -447,8 +1768,24 @@ def browser_login_helper_menu(browser_helper, network_optimizer, logger):
 
 # --- Session Manager Submenu ---
 
+def _prompt_profile(browser_helper, browser):
+    """Ask for one of the browser's profiles (listed with their display names); returns its path."""
+    from rich.prompt import Prompt
+    profiles = browser_helper.get_profile_info(browser)
+    if not profiles:
+        return None
+    for profile in profiles:
+        marker = " [dim](default)[/dim]" if profile.default else ""
+        console.print(f"  {profile.name}: [cyan]{profile.display_name}[/cyan]{marker}")
+    default = next((p.name for p in profiles if p.default), profiles[0].name)
+    profile_name = Prompt.ask("Select profile", choices=[p.name for p in profiles], default=default)
+    return next(p.path for p in profiles if p.name == profile_name)
+
+
 def session_manager_menu(session_manager, browser_helper, logger):
     """Session Manager submenu"""
+    from rich.prompt import Prompt, Confirm
+    from rich.table import Table
     while True:
         console.print("\n" + "="*70)
         console.print("[bold green]SESSION MANAGER | مدیریت نشست‌ها[/bold green]")
@@ -477,15 +1814,11 @@ def session_manager_menu(session_manager, browser_helper, logger):
             console.print(f"\n[cyan]Found browsers: {', '.join(browsers)}[/cyan]")
             browser = Prompt.ask("Select browser", choices=browsers)
             
-            profiles = browser_helper.get_browser_profiles(browser)
-            if not profiles:
+            profile_path = _prompt_profile(browser_helper, browser)
+            if not profile_path:
                 console.print("[red]No profiles found.[/red]")
                 continue
             
-            profile_names = [p[0] for p in profiles]
-            profile_name = Prompt.ask("Select profile", choices=profile_names, default=profile_names[0])
-            profile_path = next(p[1] for p in profiles if p[0] == profile_name)
-            
             session_name = Prompt.ask("Session name (optional)", default="")
             if not session_name:
                 session_name = None
@@ -514,10 +1847,10 @@ def session_manager_menu(session_manager, browser_helper, logger):
             browsers = browser_helper.detect_installed_browsers()
             browser = Prompt.ask("Select browser", choices=browsers, default=selected_session['browser'])
             
-            profiles = browser_helper.get_browser_profiles(browser)
-            profile_names = [p[0] for p in profiles]
-            profile_name = Prompt.ask("Select profile", choices=profile_names, default=profile_names[0])
-            profile_path = next(p[1] for p in profiles if p[0] == profile_name)
+            profile_path = _prompt_profile(browser_helper, browser)
+            if not profile_path:
+                console.print("[red]No profiles found.[/red]")
+                continue
             
             if session_manager.restore_session(selected_session['name'], browser, profile_path):
                 console.print("[green]✓ Session restored successfully![/green]")
@@ -563,46 +1896,251 @@ def session_manager_menu(session_manager, browser_helper, logger):
 
 # --- CLI Menu ---
 
-def main():
-    # Setup logging
-    agent_logger = setup_agent_logging()
-    agent_logger.info("=== Antigravity Cleaner Started ===")
-    
+def init_helpers(logger, dry_run=False, browser=False, network=False, session=False):
+    """Import and construct only the helper modules a command needs.
+
+    Returns (browser_helper, network_optimizer, session_manager); helpers that
+    were not requested, or whose dependencies are missing, are None.
+    """
+    browser_helper = network_optimizer = session_manager = None
+    try:
+        if browser:
+            from browser_helper import BrowserHelper
+            browser_helper = BrowserHelper(logger, dry_run=dry_run)
+        if network:
+            from network_optimizer import NetworkOptimizer
+            network_optimizer = NetworkOptimizer(logger, dry_run=dry_run)
+        if session:
+            from session_manager import SessionManager
+            session_manager = SessionManager(SESSION_DIR, logger, dry_run=dry_run)
+        logger.info("Browser helper modules initialized successfully")
+    except Exception as e:
+        logger.error(f"Failed to initialize browser helper modules: {e}")
+        console.print(f"[yellow]Warning: Browser helper features unavailable: {e}[/yellow]")
+    return browser_helper, network_optimizer, session_manager
+
+
+# --- Command Line ---
+
+def add_quarantine_arguments(parser):
+    parser.add_argument("--quarantine", action="store_true",
+                        help="Move leftovers into a quarantine directory and delete them in the background")
+    parser.add_argument("--keep", action="store_true",
+                        help="With --quarantine: keep the batch for rollback until the next run purges it")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Antigravity Cleaner. Run without a command for the interactive menu.",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only show what would be done")
+    parser.add_argument("--auto", action="store_true", help="Deep clean + network reset without prompts")
+    parser.add_argument("--timings", action="store_true", help="Print how long each phase took")
+    # dest differs from `session --profile` (a browser profile), which would otherwise overwrite it
+    parser.add_argument("--profile", nargs="?", const=PROFILE_DIR, metavar="DIR", dest="profile_dir",
+                        help="Profile every phase (cProfile + tracemalloc) and write flame-graph data to DIR (default: %(const)s)")
+    parser.add_argument("--metrics", metavar="FILE", default=os.environ.get("ANTIGRAVITY_CLEANER_METRICS"),
+                        help="Write Prometheus textfile metrics to FILE, e.g. "
+                             "/var/lib/node_exporter/textfile_collector/antigravity_cleaner.prom "
+                             "(default: $ANTIGRAVITY_CLEANER_METRICS)")
+
+    # --dry-run is accepted after the command too; SUPPRESS keeps the global value otherwise
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--dry-run", action="store_true", default=argparse.SUPPRESS, help="Only show what would be done")
+
+    sub = parser.add_subparsers(dest="command", metavar="command")
+
+    for name, help_text in (("clean", "Remove leftovers from standard paths"),
+                            ("deep-clean", "Aggressive scan including Temp and browser extension traces")):
+        p = sub.add_parser(name, parents=[common], help=help_text)
+        p.add_argument("-y", "--yes", action="store_true", help="Do not ask before killing processes or running uninstallers")
+        p.add_argument("--save-plan", metavar="FILE", help="Scan only and write the cleanup plan to FILE")
+        p.add_argument("--network-reset", action="store_true", help="Also reset network settings afterwards")
+        add_quarantine_arguments(p)
+
+    p = sub.add_parser("fleet", parents=[common], help="Clean every user's home directory (run as root)")
+    p.add_argument("--deep", action="store_true", help="Deep scan each home")
+    p.add_argument("-j", "--jobs", type=int, help="Homes cleaned in parallel (default: min(4, CPUs))")
+    p.add_argument("--homes-root", default="/home", help="Directory whose subdirectories are homes (default: %(default)s)")
+    p.add_argument("--passwd", nargs="?", const="/etc/passwd", metavar="FILE",
+                   help="Read homes from a passwd-style file instead (default file: %(const)s)")
+    p.add_argument("--users", help="Comma-separated user names to include")
+    p.add_argument("--browsers", action="store_true", help="Also clean browser traces of browsers that are not running")
+    p.add_argument("--report", metavar="FILE", help="Write the merged report as JSON")
+
+    p = sub.add_parser("apply", parents=[common], help="Execute a cleanup plan written by --save-plan")
+    p.add_argument("plan", help="Plan JSON file")
+    add_quarantine_arguments(p)
+
+    p = sub.add_parser("quarantine", parents=[common], help="List, restore or purge quarantined leftovers")
+    quarantine_sub = p.add_subparsers(dest="quarantine_command", metavar="action", required=True)
+    quarantine_sub.add_parser("list", help="List quarantine batches")
+    qp = quarantine_sub.add_parser("restore", help="Move a batch back to its original paths")
+    qp.add_argument("batch", nargs="?", help="Batch name (default: the most recent)")
+    qp = quarantine_sub.add_parser("purge", help="Delete quarantined batches now")
+    qp.add_argument("batches", nargs="*", metavar="batch", help="Batch names (default: all)")
+    qp.add_argument("--low-priority", action="store_true", help="Run at idle CPU and I/O priority")
+
+    sub.add_parser("net-reset", parents=[common], help="Flush DNS and reset network settings")
+
+    p = sub.add_parser("net-diag", parents=[common], help="Generate the network diagnostic report")
+    p.add_argument("-o", "--output", default=DIAGNOSTIC_REPORT_FILE, help="Report file (default: %(default)s)")
+
+    p = sub.add_parser("session", parents=[common], help="Back up and restore browser sessions")
+    session_sub = p.add_subparsers(dest="session_command", metavar="action", required=True)
+    session_sub.add_parser("list", help="List saved sessions")
+    sp = session_sub.add_parser("backup", help="Back up the cookies of a browser profile")
+    sp.add_argument("browser")
+    sp.add_argument("--profile", default="Default", help="Profile directory or display name (default: %(default)s)")
+    sp.add_argument("--name", help="Session name (default: browser + timestamp)")
+    sp = session_sub.add_parser("restore", help="Restore a saved session into a browser profile")
+    sp.add_argument("name")
+    sp.add_argument("browser")
+    sp.add_argument("--profile", default="Default", help="Profile directory or display name (default: %(default)s)")
+    session_sub.add_parser("prune", help="Delete expired sessions")
+
+    return parser
+
+
+def _resolve_profile(browser_helper, browser, profile_name):
+    profiles = browser_helper.get_profile_info(browser)
+    # Directory name ("Profile 2") or the name shown by the browser ("Work")
+    for profile in profiles:
+        if profile.name == profile_name:
+            return profile.path
+    for profile in profiles:
+        if profile.display_name == profile_name:
+            return profile.path
+    console.print(f"[red]Profile '{profile_name}' not found for {browser}.[/red]")
+    return None
+
+
+def run_session_command(args, agent_logger):
+    browser_helper, _, session_manager = init_helpers(
+        agent_logger, dry_run=args.dry_run,
+        browser=args.session_command in ("backup", "restore"), session=True,
+    )
+    if session_manager is None:
+        return 1
+
+    if args.session_command == "list":
+        sessions = session_manager.list_saved_sessions()
+        if not sessions:
+            console.print("[yellow]No saved sessions found.[/yellow]")
+        for s in sessions:
+            status = "expired" if s.get('expired') else "valid"
+            console.print(f"{s['name']}\t{s['browser']}\t{s['backup_time']}\t{s['cookie_count']} cookies\t{status}")
+        return 0
+
+    if args.session_command == "prune":
+        count = session_manager.delete_expired_sessions()
+        console.print(f"[green]✓ Deleted {count} expired sessions[/green]")
+        return 0
+
+    if browser_helper is None:
+        return 1
+    profile_path = _resolve_profile(browser_helper, args.browser, args.profile)
+    if profile_path is None:
+        return 1
+
+    if args.session_command == "backup":
+        ok = session_manager.backup_session(args.browser, profile_path, args.name)
+    else:
+        ok = session_manager.restore_session(args.name, args.browser, profile_path)
+    console.print("[green]✓ Done[/green]" if ok else "[red]✗ Failed[/red]")
+    return 0 if ok else 1
+
+
+def run_quarantine_command(args):
     cleaner = Cleaner()
-    
-    # Initialize new helpers (if modules available)
-    browser_helper = None
-    network_optimizer = None
-    session_manager = None
-    
-    if BrowserHelper and NetworkOptimizer and SessionManager:
-        try:
-            browser_helper = BrowserHelper(agent_logger, dry_run=cleaner.dry_run)
-            network_optimizer = NetworkOptimizer(agent_logger, dry_run=cleaner.dry_run)
-            session_storage = os.path.join(os.path.expanduser('~'), '.antigravity-cleaner', 'sessions')
-            session_manager = SessionManager(session_storage, agent_logger, dry_run=cleaner.dry_run)
-            agent_logger.info("Browser helper modules initialized successfully")
-        except Exception as e:
-            agent_logger.error(f"Failed to initialize browser helper modules: {e}")
-            console.print(f"[yellow]Warning: Browser helper features unavailable: {e}[/yellow]")
-    
-    # Check args
-    if len(sys.argv) > 1:
-        arg = sys.argv[1].lower()
-        if arg == "--dry-run":
-            cleaner.dry_run = True
-            console.print(Panel.fit("DRY RUN MODE ENABLED", style="bold yellow"))
-            # Update helpers dry_run mode
-            if browser_helper:
-                browser_helper.dry_run = True
-            if network_optimizer:
-                network_optimizer.dry_run = True
-            if session_manager:
-                session_manager.dry_run = True
-        elif arg == "--auto":
-            cleaner.run_clean(deep=True)
+    if args.quarantine_command == "list":
+        batches = cleaner.quarantine.batches()
+        if not batches:
+            console.print("[yellow]Quarantine is empty.[/yellow]")
+        for batch in batches:
+            entries = cleaner.quarantine.manifest(batch)
+            usage = sum(e["hit"]["usage"] for e in entries)
+            console.print(f"{batch}\t{len(entries)} targets\t{format_size(usage)}")
+            for e in entries:
+                console.print(f"  {e['hit']['path']}", style="dim", markup=False)
+        return 0
+    if args.quarantine_command == "restore":
+        return 0 if cleaner.restore_quarantine(args.batch) else 1
+    if args.dry_run:
+        cleaner.log("[Dry Run] Would purge the quarantine.", style="yellow")
+        return 0
+    results = cleaner.purge_quarantine(args.batches or None, low_priority=args.low_priority)
+    return 1 if any(stats.errors for _, stats in results) else 0
+
+
+def run_command(args, agent_logger):
+    """Run one non-interactive command and return the exit code."""
+    if args.command == "session":
+        return run_session_command(args, agent_logger)
+    if args.command == "quarantine":
+        return run_quarantine_command(args)
+
+    if args.command == "fleet":
+        users = set(args.users.split(",")) if args.users else None
+        homes = discover_homes(args.homes_root, args.passwd, users)
+        if not homes:
+            console.print("[red]No home directories found.[/red]")
+            return 1
+        report = run_fleet(homes, deep=args.deep, dry_run=args.dry_run, jobs=args.jobs, browsers=args.browsers)
+        print_fleet_report(report)
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+        return 1 if report["totals"]["errors"] else 0
+
+    if args.command == "net-diag":
+        _, network_optimizer, _ = init_helpers(agent_logger, dry_run=args.dry_run, network=True)
+        if network_optimizer is None:
+            return 1
+        report = network_optimizer.generate_diagnostic_report()
+        console.print(report)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report)
+        console.print(f"\n[green]✓ Report saved to: {args.output}[/green]")
+        return 0
+
+    cleaner = Cleaner()
+    cleaner.dry_run = args.dry_run
+
+    if args.command == "net-reset":
+        cleaner.run_network_reset()
+    elif args.command == "apply":
+        cleaner.use_quarantine = args.quarantine
+        cleaner.keep_quarantine = args.keep
+        cleaner.execute_plan(Cleaner.load_plan(args.plan), interactive=False)
+    elif args.command in ("clean", "deep-clean"):
+        deep = args.command == "deep-clean"
+        cleaner.use_quarantine = args.quarantine
+        cleaner.keep_quarantine = args.keep
+        if args.save_plan:
+            cleaner.save_plan(cleaner.build_plan(deep=deep), args.save_plan)
+            return 0
+        cleaner.run_clean(deep=deep, interactive=not args.yes)
+        if args.network_reset:
             cleaner.run_network_reset()
-            sys.exit(0)
+    return 0
+
+
+def interactive_menu(dry_run, agent_logger):
+    from rich.panel import Panel
+    from rich.prompt import Prompt, Confirm
+    from rich.table import Table
+
+    cleaner = Cleaner()
+    cleaner.dry_run = dry_run
+    if dry_run:
+        console.print(Panel.fit("DRY RUN MODE ENABLED", style="bold yellow"))
+
+    # Initialize new helpers (if modules available)
+    browser_helper, network_optimizer, session_manager = init_helpers(
+        agent_logger, dry_run=dry_run, browser=True, network=True, session=True,
+    )
 
     # Header
     grid = Table.grid(expand=True)
@@ -613,6 +2151,7 @@ def main():
     console.print(Panel(grid, style="blue", border_style="blue"))
 
     while True:
+        flush_logging()
         console.print("\n[bold white]Select an Option:[/bold white]")
         console.print("1. [green]Quick Clean[/green] (Standard paths)")
         console.print("2. [yellow]Deep Clean[/yellow] (Aggressive scan + Temp)")
@@ -638,7 +2177,7 @@ def main():
 
         if choice == "0":
             agent_logger.info("=== Antigravity Cleaner Exited ===")
-            sys.exit(0)
+            return
         elif choice == "1":
             cleaner.run_clean(deep=False)
         elif choice == "2":
@@ -668,9 +2207,80 @@ def main():
             if not Confirm.ask("Run another task?"):
                 break
 
+
+def report_spans(profile_dir=None):
+    """Print the phase timings and, when profiling, write them out."""
+    lines = TRACER.summary_lines()
+    if not lines:
+        return
+    flush_logging()
+    console.print("\n[bold]Phase timings[/bold]")
+    for line in lines:
+        console.print(line, markup=False, highlight=False)
+    if profile_dir:
+        written = TRACER.write(profile_dir)
+        console.print(f"[dim]Profile written to {profile_dir} ({len(written)} files). "
+                      f"Flame graph: flamegraph.pl {os.path.join(profile_dir, 'spans.folded')} > spans.svg[/dim]")
+
+
+def write_metrics(path, command, code, seconds):
+    """Write the run's Prometheus textfile; a failure is logged, never fatal."""
+    from metrics import LAST_RUN_TIMESTAMP, LAST_RUN_SUCCESS, LAST_RUN_DURATION
+
+    LAST_RUN_TIMESTAMP.set(time.time(), command=command)
+    LAST_RUN_SUCCESS.set(1 if code == 0 else 0, command=command)
+    LAST_RUN_DURATION.set(seconds, command=command)
+    try:
+        METRICS.write_textfile(path)
+    except OSError as e:
+        console.print(f"[red]Could not write metrics to {path}: {e}[/red]")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    command = args.command or ("auto" if args.auto else "menu")
+
+    if args.profile_dir:
+        TRACER.enable(profile=True, memory=True)
+    elif args.timings or args.metrics:
+        TRACER.enable()
+    if args.metrics:
+        from metrics import observe_span
+        TRACER.listeners.append(observe_span)
+
+    # Setup logging
+    agent_logger = setup_agent_logging()
+    agent_logger.info("=== Antigravity Cleaner Started ===")
+
+    start = time.perf_counter()
+    code = 1
+    try:
+        with TRACER.span(command):
+            if args.auto:
+                # Unattended (cron): deep clean without prompts, then network reset
+                cleaner = Cleaner()
+                cleaner.dry_run = args.dry_run
+                cleaner.run_clean(deep=True, interactive=False)
+                cleaner.run_network_reset()
+                code = 0
+            elif args.command:
+                code = run_command(args, agent_logger)
+            else:
+                interactive_menu(args.dry_run, agent_logger)
+                code = 0
+        return code
+    finally:
+        if args.metrics:
+            write_metrics(args.metrics, command, code, time.perf_counter() - start)
+        if TRACER.enabled:
+            if args.profile_dir or args.timings:
+                report_spans(args.profile_dir)
+            TRACER.disable()
+
 if __name__ == "__main__":
     try:
-        main()
+        sys.exit(main())
     except KeyboardInterrupt:
+        stop_logging()
         console.print("\n[red]Cancelled by user.[/red]")
         sys.exit(0)
@@ -0,0 +1,305 @@
+"""
+Metrics Module
+==============
+
+Run metrics in the Prometheus text format, for node_exporter's textfile
+collector. Components count what they did through the shared counters below;
+main.py writes the file at the end of a run.
+
+Counters and histograms are cumulative across runs: the previous file is read
+back and added to this run's values, so rate() and increase() work on a cron
+job. The file is written to a temporary name in the same directory and renamed
+over the old one, so node_exporter never sees a partial file.
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import re
+import math
+import tempfile
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PREFIX = 'antigravity_cleaner_'
+
+# Seconds
+PHASE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+PROBE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})?\s+(\S+)')
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    TYPE = ''
+    CUMULATIVE = True
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, float]]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    TYPE = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[Tuple[str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        if not items and not self.labelnames:
+            # Exported as 0 from the first run on, so alerts see the series
+            items = [((), 0)]
+        return [(self.name + _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Gauge(_Metric):
+    TYPE = 'gauge'
+    CUMULATIVE = False
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> List[Tuple[str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name + _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = PHASE_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> List[Tuple[str, float]]:
+        with self._lock:
+            items = sorted((key, ([*state[0]], state[1], state[2])) for key, state in self._values.items())
+        names = self.labelnames + ('le',)
+        out = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                out.append((f"{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))}", cumulative))
+            labels = _format_labels(self.labelnames, key)
+            out.append((f"{self.name}_sum{labels}", total))
+            out.append((f"{self.name}_count{labels}", count))
+        return out
+
+
+class MetricsRegistry:
+    """
+    The metrics of one process.
+
+    Features:
+    - Counters, gauges and histograms with labels, safe to update from threads
+    - Snapshot/merge, so process-pool workers can report back to the parent
+    - Prometheus text exposition, cumulative with the previous file
+    - Atomic textfile writes (temporary file + rename)
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(PREFIX + name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(PREFIX + name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = PHASE_BUCKETS) -> Histogram:
+        return self._add(Histogram(PREFIX + name, documentation, labelnames, buckets))
+
+    # ==================== Process Pools ====================
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Picklable copy of the counter and histogram values."""
+        snap = {}
+        for name, metric in self._metrics.items():
+            if metric.CUMULATIVE:
+                with metric._lock:
+                    snap[name] = {
+                        key: ([*value[0]], value[1], value[2]) if isinstance(metric, Histogram) else value
+                        for key, value in metric._values.items()
+                    }
+        return snap
+
+    def merge(self, snap: Dict[str, Dict]):
+        """Add a snapshot taken in another process."""
+        for name, values in snap.items():
+            metric = self._metrics.get(name)
+            if metric is None:
+                continue
+            with metric._lock:
+                for key, value in values.items():
+                    if isinstance(metric, Histogram):
+                        state = metric._values.setdefault(key, [[0] * len(metric.buckets), 0.0, 0])
+                        state[0] = [a + b for a, b in zip(state[0], value[0])]
+                        state[1] += value[1]
+                        state[2] += value[2]
+                    else:
+                        metric._values[key] = metric._values.get(key, 0) + value
+
+    # ==================== Exposition ====================
+
+    @staticmethod
+    def read_samples(path: str) -> Dict[str, float]:
+        """Samples of an existing textfile, keyed by `name{labels}`."""
+        samples = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    match = _SAMPLE_RE.match(line)
+                    if match and not line.startswith('#'):
+                        try:
+                            samples[match.group(1) + (match.group(2) or '')] = float(match.group(3))
+                        except ValueError:
+                            pass
+        except OSError:
+            pass
+        return samples
+
+    def render(self, previous: Optional[Dict[str, float]] = None) -> str:
+        """
+        Prometheus text format.
+
+        Args:
+            previous: Samples of the last file; counters and histograms continue from them,
+                label sets missing from this run are kept
+        """
+        previous = dict(previous or {})
+        lines = []
+        for metric in self._metrics.values():
+            samples = metric.samples()
+            if previous:
+                current = {key for key, _ in samples}
+                if metric.CUMULATIVE:
+                    samples = [(key, value + previous.get(key, 0)) for key, value in samples]
+                # Label sets of earlier runs only (another command, a browser removed since)
+                names = [metric.name + s for s in (('_bucket', '_sum', '_count') if isinstance(metric, Histogram) else ('',))]
+                samples += [(key, value) for key, value in previous.items()
+                            if key not in current and key.partition('{')[0] in names]
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            lines.extend(f"{key} {_format_value(value)}" for key, value in samples)
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path: str, cumulative: bool = True):
+        """
+        Atomically replace `path` with the current metrics.
+
+        Args:
+            path: Target .prom file (the directory node_exporter collects from)
+            cumulative: Continue the counters of the existing file
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        text = self.render(self.read_samples(path) if cumulative else None)
+        # node_exporter only reads *.prom, so the temporary file is never collected
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+
+# Registry shared by every component in this process
+METRICS = MetricsRegistry()
+
+PROCESSES_KILLED = METRICS.counter('processes_killed_total', 'Processes stopped, children included')
+PATHS_REMOVED = METRICS.counter('paths_removed_total', 'Leftover paths removed', ['mode'])
+BYTES_RECLAIMED = METRICS.counter('bytes_reclaimed_total', 'Bytes of leftovers removed or quarantined', ['mode'])
+COOKIES_DELETED = METRICS.counter('cookies_deleted_total', 'Antigravity cookies deleted', ['browser'])
+SESSIONS_BACKED_UP = METRICS.counter('sessions_backed_up_total', 'Sessions backed up', ['browser'])
+SESSIONS_RESTORED = METRICS.counter('sessions_restored_total', 'Sessions restored', ['browser'])
+PROBES = METRICS.counter('probes_total', 'Network probes run', ['probe', 'target'])
+PROBE_SUCCESSES = METRICS.counter('probe_successes_total', 'Network probes that succeeded', ['probe', 'target'])
+PROBE_LATENCY = METRICS.histogram('probe_latency_seconds', 'Latency of successful network probes',
+                                  ['probe', 'target'], PROBE_BUCKETS)
+PHASE_DURATION = METRICS.histogram('phase_duration_seconds', 'Duration of each phase of a run', ['phase'])
+LAST_RUN_TIMESTAMP = METRICS.gauge('last_run_timestamp_seconds', 'Unix time the last run finished', ['command'])
+LAST_RUN_SUCCESS = METRICS.gauge('last_run_success', '1 if the last run exited with status 0', ['command'])
+LAST_RUN_DURATION = METRICS.gauge('last_run_duration_seconds', 'Wall time of the last run', ['command'])
+
+
+def observe_span(path: str, seconds: float):
+    """Tracer listener: one phase_duration observation per finished span."""
+    PHASE_DURATION.observe(seconds, phase=path.rpartition(';')[2])
+
+
+def observe_probe(probe: str, target: str, ok: bool, latency_ms: Optional[float]):
+    """Count one network probe (NetworkOptimizer) and its latency."""
+    PROBES.inc(probe=probe, target=target)
+    if ok:
+        PROBE_SUCCESSES.inc(probe=probe, target=target)
+        if latency_ms is not None:
+            PROBE_LATENCY.observe(latency_ms / 1000.0, probe=probe, target=target)
@@ -25,6 +25,9 @@ except ImportError:
     print("Missing requests. Install: pip install requests")
     sys.exit(1)
 
+from spans import traced
+from metrics import observe_probe
+
 
 class NetworkOptimizer:
     """
@@ -70,6 +73,7 @@ class NetworkOptimizer:
     
     # ==================== Connectivity Testing ====================
     
+    @traced("connectivity")
     def test_google_connectivity(self) -> Dict[str, any]:
         """
         Test connectivity to Google services.
@@ -132,6 +136,9 @@ class NetworkOptimizer:
                     'error': str(e)[:100]
                 }
         
+        for endpoint, status in results['endpoints'].items():
+            observe_probe('http', endpoint, status['accessible'], status['response_time_ms'])
+        
         # Determine overall status
         if results['accessible_count'] == results['total_count']:
             results['overall_status'] = 'excellent'
@@ -146,6 +153,7 @@ class NetworkOptimizer:
         
         return results
     
+    @traced("dns")
     def check_dns_resolution(self, domains: Optional[List[str]] = None) -> Dict[str, any]:
         """
         Check DNS resolution for critical domains.
@@ -203,6 +211,9 @@ class NetworkOptimizer:
                     'error': str(e)
                 }
         
+        for domain, status in results['domains'].items():
+            observe_probe('dns', domain, status['resolved'], status['resolution_time_ms'])
+        
         # Determine overall status
         if results['resolved_count'] == results['total_count']:
             results['overall_status'] = 'excellent'
@@ -215,6 +226,7 @@ class NetworkOptimizer:
         
         return results
     
+    @traced("proxy")
     def detect_proxy_settings(self) -> Dict[str, any]:
         """
         Detect system and environment proxy settings.
@@ -277,6 +289,7 @@ class NetworkOptimizer:
         
         return proxy_info
     
+    @traced("ssl")
     def verify_ssl_certificates(self) -> Dict[str, any]:
         """
         Verify SSL certificate store integrity.
@@ -338,6 +351,9 @@ class NetworkOptimizer:
                     'error': str(e)
                 }
         
+        for endpoint, status in results['endpoints'].items():
+            observe_probe('tls', endpoint, status['valid'], None)
+        
         # Determine overall status
         if results['valid_count'] == results['total_count']:
             results['overall_status'] = 'excellent'
@@ -352,6 +368,7 @@ class NetworkOptimizer:
     
     # ==================== Network Optimization ====================
     
+    @traced("dns_flush")
     def clear_dns_cache(self) -> bool:
         """
         Clear system DNS cache.
@@ -388,6 +405,7 @@ class NetworkOptimizer:
             self.logger.error(f"Error clearing DNS cache: {e}")
             return False
     
+    @traced("network_stack_reset")
     def reset_network_stack(self) -> bool:
         """
         Reset network stack (Windows only).
@@ -431,6 +449,7 @@ class NetworkOptimizer:
     
     # ==================== Diagnostic Reporting ====================
     
+    @traced("diagnostic_report")
     def generate_diagnostic_report(self) -> str:
         """
         Generate comprehensive network diagnostic report.
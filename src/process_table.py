@@ -0,0 +1,350 @@
+"""
+Process Table Module
+====================
+
+Shared, short-lived snapshot of the running processes.
+Cleaner and BrowserHelper query the same snapshot instead of each walking
+psutil.process_iter(), so a full repair reads the process table once.
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import psutil
+except ImportError:
+    print("Missing psutil. Install: pip install psutil")
+    sys.exit(1)
+
+from metrics import PROCESSES_KILLED
+
+
+# One row of the process table; name_lower is computed once per snapshot.
+# create_time (seconds since the epoch, as psutil reports it) tells a reused PID apart.
+ProcessInfo = namedtuple('ProcessInfo', ['pid', 'ppid', 'name', 'name_lower', 'create_time'])
+
+
+class ProcessTable:
+    """
+    Cached view of the process table.
+
+    Features:
+    - Reads /proc directly on Linux, psutil elsewhere
+    - Snapshot reused for `ttl` seconds, or for a whole `hold()` block
+    - Name-index lookups grouped once per snapshot
+    - Explicit invalidation after processes are terminated
+    - Process-tree termination with a shared deadline and SIGKILL escalation
+    """
+
+    DEFAULT_TTL = 2.0
+
+    # Default seconds to wait after SIGTERM, and after SIGKILL
+    TERM_TIMEOUT = 5.0
+    KILL_TIMEOUT = 3.0
+
+    # Linux truncates /proc/<pid>/stat comm to 15 characters
+    COMM_LEN = 15
+
+    # Start times from /proc (clock ticks) and from psutil may differ by rounding
+    CREATE_TIME_SLACK = 0.1
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        """
+        Initialize ProcessTable.
+
+        Args:
+            ttl: Seconds a snapshot stays valid outside of hold()
+        """
+        self.ttl = ttl
+        self.walks = 0
+        self._lock = threading.RLock()
+        self._entries: Optional[List[ProcessInfo]] = None
+        self._taken_at = 0.0
+        self._held = 0
+        self._groups = {}
+
+    # ==================== Snapshot ====================
+
+    def snapshot(self) -> List[ProcessInfo]:
+        """
+        Return the current snapshot, reading the process table if it is stale.
+
+        Returns:
+            List of ProcessInfo rows
+        """
+        with self._lock:
+            stale = self._entries is None or (
+                not self._held and time.monotonic() - self._taken_at > self.ttl
+            )
+            if stale:
+                if sys.platform.startswith('linux') and os.path.isdir('/proc'):
+                    self._entries = self._read_proc()
+                else:
+                    self._entries = self._read_psutil()
+                self._taken_at = time.monotonic()
+                self._groups = {}
+                self.walks += 1
+            return self._entries
+
+    def invalidate(self):
+        """Drop the snapshot so the next query re-reads the process table."""
+        with self._lock:
+            self._entries = None
+            self._groups = {}
+
+    def forget(self, pids: Iterable[int]):
+        """
+        Remove processes we know have exited from the snapshot.
+
+        Args:
+            pids: PIDs that are gone
+        """
+        pids = set(pids)
+        if not pids:
+            return
+        with self._lock:
+            if self._entries is not None:
+                self._entries = [p for p in self._entries if p.pid not in pids]
+                self._groups = {}
+
+    @contextmanager
+    def hold(self):
+        """Keep the current snapshot for the whole block, regardless of ttl."""
+        with self._lock:
+            self._held += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._held -= 1
+
+    def _read_proc(self) -> List[ProcessInfo]:
+        """Read pid, ppid, name and start time straight from /proc/<pid>/stat."""
+        entries = []
+        boot_time = psutil.boot_time()
+        clock_ticks = os.sysconf('SC_CLK_TCK')
+        for pid_dir in os.listdir('/proc'):
+            if not pid_dir.isdigit():
+                continue
+            try:
+                with open(f'/proc/{pid_dir}/stat', 'rb') as f:
+                    data = f.read()
+            except OSError:
+                continue
+
+            # comm may contain spaces and parentheses, so split on the last ')'
+            lpar = data.find(b'(')
+            rpar = data.rfind(b')')
+            if lpar < 0 or rpar < 0:
+                continue
+            name = data[lpar + 1:rpar].decode('utf-8', 'replace')
+            fields = data[rpar + 2:].split()
+            try:
+                ppid = int(fields[1])
+            except (IndexError, ValueError):
+                ppid = 0
+            try:
+                # Field 22: start time in clock ticks after boot
+                create_time = boot_time + int(fields[19]) / clock_ticks
+            except (IndexError, ValueError):
+                create_time = 0.0
+
+            if len(name) >= self.COMM_LEN:
+                name = self._full_name(pid_dir, name)
+
+            entries.append(ProcessInfo(int(pid_dir), ppid, name, name.lower(), create_time))
+        return entries
+
+    @staticmethod
+    def _full_name(pid_dir: str, comm: str) -> str:
+        """Recover a truncated comm from argv[0], the way psutil does."""
+        try:
+            with open(f'/proc/{pid_dir}/cmdline', 'rb') as f:
+                argv0 = f.read().split(b'\0', 1)[0].decode('utf-8', 'replace')
+        except OSError:
+            return comm
+        exe = os.path.basename(argv0)
+        return exe if exe.startswith(comm) else comm
+
+    @staticmethod
+    def _read_psutil() -> List[ProcessInfo]:
+        entries = []
+        for proc in psutil.process_iter(['pid', 'ppid', 'name', 'create_time']):
+            name = proc.info['name'] or ''
+            entries.append(ProcessInfo(proc.info['pid'], proc.info['ppid'] or 0, name, name.lower(),
+                                       proc.info['create_time'] or 0.0))
+        return entries
+
+    # ==================== Queries ====================
+
+    def match(self, index: Dict[str, str]) -> Dict[str, List[ProcessInfo]]:
+        """
+        Group processes by an exact-name index.
+
+        Args:
+            index: Lowercased process name -> group key (e.g. 'chrome.exe' -> 'chrome')
+
+        Returns:
+            Dictionary of group key -> matching processes (computed once per snapshot)
+        """
+        with self._lock:
+            entries = self.snapshot()
+            cached = self._groups.get(id(index))
+            if cached is not None and cached[0] is index:
+                return cached[1]
+
+            groups: Dict[str, List[ProcessInfo]] = {}
+            for entry in entries:
+                key = index.get(entry.name_lower)
+                if key is not None:
+                    groups.setdefault(key, []).append(entry)
+            self._groups[id(index)] = (index, groups)
+            return groups
+
+    def find(self, needle: Union[str, Callable[[str], bool]]) -> List[ProcessInfo]:
+        """
+        Find processes whose name contains a substring (case-insensitive).
+
+        Args:
+            needle: Lowercased substring, or a predicate called with the lowercased name
+                (e.g. KeywordMatcher.search_lowered)
+
+        Returns:
+            Matching processes
+        """
+        if callable(needle):
+            return [entry for entry in self.snapshot() if needle(entry.name_lower)]
+        return [entry for entry in self.snapshot() if needle in entry.name_lower]
+
+    @classmethod
+    def to_processes(cls, entries: Iterable[ProcessInfo]) -> List[psutil.Process]:
+        """
+        Turn snapshot rows into psutil.Process handles (skipping ones that already exited).
+
+        A snapshot can be held for a whole repair, so a PID may belong to a new
+        process by now: rows whose start time no longer matches are skipped too.
+        The handles carry an `info` dict like the ones from psutil.process_iter().
+        """
+        processes = []
+        for entry in entries:
+            try:
+                proc = psutil.Process(entry.pid)
+                if entry.create_time and abs(proc.create_time() - entry.create_time) > cls.CREATE_TIME_SLACK:
+                    continue
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            proc.info = {'pid': entry.pid, 'name': entry.name}
+            processes.append(proc)
+        return processes
+
+    def descendants(self, pids: Iterable[int], exclude: Iterable[int] = ()) -> List[ProcessInfo]:
+        """
+        Resolve the full process trees below the given PIDs from the snapshot's ppid links.
+
+        Args:
+            pids: Root PIDs
+            exclude: PIDs to leave out, together with the trees below them
+
+        Returns:
+            Descendant processes (roots not included)
+        """
+        children: Dict[int, List[ProcessInfo]] = {}
+        for entry in self.snapshot():
+            children.setdefault(entry.ppid, []).append(entry)
+
+        found = []
+        excluded = set(exclude)
+        seen = set(pids) | excluded
+        stack = [pid for pid in seen if pid not in excluded]
+        while stack:
+            for child in children.get(stack.pop(), ()):
+                if child.pid not in seen:
+                    seen.add(child.pid)
+                    found.append(child)
+                    stack.append(child.pid)
+        return found
+
+    @staticmethod
+    def lineage(pid: Optional[int] = None) -> List[int]:
+        """
+        A process and its chain of parents, read live rather than from the snapshot
+        (a held snapshot may list PIDs that were reused since, or miss re-parenting).
+
+        Args:
+            pid: Process to start from (default: this process)
+
+        Returns:
+            PIDs from pid up to the root of its tree
+        """
+        if pid is None:
+            pid = os.getpid()
+        try:
+            proc = psutil.Process(pid)
+            return [pid] + [parent.pid for parent in proc.parents()]
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return [pid]
+
+    # ==================== Termination ====================
+
+    def terminate(self, processes: List[psutil.Process], timeout: float = TERM_TIMEOUT,
+                  kill_timeout: float = KILL_TIMEOUT, escalate: bool = True,
+                  force: bool = False) -> Tuple[List[psutil.Process], List[psutil.Process]]:
+        """
+        Stop processes together with all of their children.
+
+        Every process in the trees is signalled at once, then a single
+        psutil.wait_procs deadline is shared by all of them, so the call returns
+        as soon as the slowest process has actually exited. Survivors get SIGKILL.
+        This process and its parents are never signalled, so a cleaner started
+        from a terminal inside the matched application keeps running.
+
+        Args:
+            processes: Root processes to stop
+            timeout: Seconds to wait after SIGTERM
+            kill_timeout: Seconds to wait after SIGKILL
+            escalate: If False, survivors of SIGTERM are left running
+            force: Skip SIGTERM and send SIGKILL straight away
+
+        Returns:
+            Tuple of (gone, alive) process lists, children included
+        """
+        own = set(self.lineage())
+        roots = {proc.pid: proc for proc in processes if proc.pid not in own}
+        targets = list(roots.values()) + self.to_processes(
+            entry for entry in self.descendants(roots, exclude=own) if entry.pid not in roots
+        )
+
+        def send(procs, kill):
+            for proc in procs:
+                try:
+                    proc.kill() if kill else proc.terminate()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+
+        if force:
+            alive = targets
+            gone = []
+        else:
+            send(targets, kill=False)
+            gone, alive = psutil.wait_procs(targets, timeout=timeout)
+
+        if alive and (escalate or force):
+            send(alive, kill=True)
+            killed, alive = psutil.wait_procs(alive, timeout=kill_timeout)
+            gone = list(gone) + list(killed)
+
+        self.forget(proc.pid for proc in gone)
+        PROCESSES_KILLED.inc(len(gone))
+        return list(gone), list(alive)
+
+
+# Snapshot shared by every component in this process
+PROCESS_TABLE = ProcessTable()
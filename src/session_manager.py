@@ -13,7 +13,6 @@ import os
 import sys
 import json
 import sqlite3
-import shutil
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
@@ -26,6 +25,11 @@ except ImportError:
     print("Missing pycryptodome. Install: pip install pycryptodome")
     sys.exit(1)
 
+import sqlite_backup
+from stat_cache import STAT_CACHE, StatCache
+from spans import traced
+from metrics import SESSIONS_BACKED_UP, SESSIONS_RESTORED
+
 
 class SessionManager:
     """
@@ -47,7 +51,8 @@ class SessionManager:
     SALT_SIZE = 32
     NONCE_SIZE = 16
     
-    def __init__(self, storage_dir: str, logger: logging.Logger, dry_run: bool = False):
+    def __init__(self, storage_dir: str, logger: logging.Logger, dry_run: bool = False,
+                 stat_cache: Optional[StatCache] = None):
         """
         Initialize SessionManager.
         
@@ -55,14 +60,17 @@ class SessionManager:
             storage_dir: Directory to store encrypted sessions
             logger: Logger instance for detailed logging
             dry_run: If True, only simulate operations
+            stat_cache: Filesystem metadata cache to query (defaults to the shared one)
         """
         self.logger = logger
         self.dry_run = dry_run
         self.storage_dir = storage_dir
+        self.stat_cache = stat_cache or STAT_CACHE
         
         # Create storage directory
         if not dry_run:
             os.makedirs(storage_dir, exist_ok=True)
+            self.stat_cache.invalidate(storage_dir)
         
         # Generate or load encryption key
         self.key_file = os.path.join(storage_dir, '.key')
@@ -79,7 +87,7 @@ class SessionManager:
         Returns:
             32-byte master key
         """
-        if os.path.exists(self.key_file) and not self.dry_run:
+        if not self.dry_run and self.stat_cache.exists(self.key_file):
             try:
                 with open(self.key_file, 'rb') as f:
                     key = f.read()
@@ -102,9 +110,12 @@ class SessionManager:
                 self.logger.debug("Created new master key")
             except Exception as e:
                 self.logger.error(f"Could not save master key: {e}")
+            finally:
+                self.stat_cache.invalidate(self.key_file)
         
         return key
     
+    @traced("encrypt")
     def encrypt_session(self, data: Dict) -> bytes:
         """
         Encrypt session data using AES-256-GCM.
@@ -142,6 +153,7 @@ class SessionManager:
             self.logger.error(f"Encryption failed: {e}")
             raise
     
+    @traced("decrypt")
     def decrypt_session(self, encrypted: bytes) -> Dict:
         """
         Decrypt session data.
@@ -180,6 +192,7 @@ class SessionManager:
     
     # ==================== Session Operations ====================
     
+    @traced("session_backup")
     def backup_session(self, browser: str, profile_path: str, session_name: Optional[str] = None) -> bool:
         """
         Backup browser session cookies.
@@ -199,10 +212,10 @@ class SessionManager:
             cookie_db = os.path.join(profile_path, 'cookies.sqlite')
         else:
             cookie_db = os.path.join(profile_path, 'Network', 'Cookies')
-            if not os.path.exists(cookie_db):
+            if not self.stat_cache.exists(cookie_db):
                 cookie_db = os.path.join(profile_path, 'Cookies')
         
-        if not os.path.exists(cookie_db):
+        if not self.stat_cache.exists(cookie_db):
             self.logger.error(f"Cookie database not found: {cookie_db}")
             return False
         
@@ -254,11 +267,13 @@ class SessionManager:
             
             with open(session_file, 'wb') as f:
                 f.write(encrypted)
+            self.stat_cache.invalidate(session_file)
             
             # Set restrictive permissions
             if os.name != 'nt':
                 os.chmod(session_file, 0o600)
             
+            SESSIONS_BACKED_UP.inc(browser=browser)
             self.logger.info(f"✓ Backed up {len(cookies)} cookies to '{session_name}'")
             return True
             
@@ -266,6 +281,7 @@ class SessionManager:
             self.logger.error(f"Session backup failed: {e}")
             return False
     
+    @traced("session_restore")
     def restore_session(self, session_name: str, browser: str, profile_path: str) -> bool:
         """
         Restore session cookies to browser.
@@ -282,7 +298,7 @@ class SessionManager:
         
         session_file = os.path.join(self.storage_dir, f"{session_name}.session")
         
-        if not os.path.exists(session_file):
+        if not self.stat_cache.exists(session_file):
             self.logger.error(f"Session file not found: {session_file}")
             return False
         
@@ -303,10 +319,10 @@ class SessionManager:
                 cookie_db = os.path.join(profile_path, 'cookies.sqlite')
             else:
                 cookie_db = os.path.join(profile_path, 'Network', 'Cookies')
-                if not os.path.exists(cookie_db):
+                if not self.stat_cache.exists(cookie_db):
                     cookie_db = os.path.join(profile_path, 'Cookies')
             
-            if not os.path.exists(cookie_db):
+            if not self.stat_cache.exists(cookie_db):
                 self.logger.error(f"Cookie database not found: {cookie_db}")
                 return False
             
@@ -316,8 +332,11 @@ class SessionManager:
             
             # Create backup of current cookies
             backup_path = f"{cookie_db}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            shutil.copy2(cookie_db, backup_path)
-            self.logger.debug(f"Created backup: {backup_path}")
+            if self.stat_cache.exists(backup_path):
+                os.remove(backup_path)
+            method = sqlite_backup.backup_database(cookie_db, backup_path)
+            self.stat_cache.invalidate(backup_path)
+            self.logger.debug(f"Created backup: {backup_path} ({method})")
             
             # Insert cookies into database
             conn = sqlite3.connect(cookie_db)
@@ -353,7 +372,9 @@ class SessionManager:
             
             conn.commit()
             conn.close()
+            self.stat_cache.invalidate(cookie_db)
             
+            SESSIONS_RESTORED.inc(browser=browser)
             self.logger.info(f"✓ Restored {restored_count}/{session_data['cookie_count']} cookies")
             return True
             
@@ -408,7 +429,7 @@ class SessionManager:
         """
         session_file = os.path.join(self.storage_dir, f"{session_name}.session")
         
-        if not os.path.exists(session_file):
+        if not self.stat_cache.exists(session_file):
             return True
         
         try:
@@ -424,6 +445,7 @@ class SessionManager:
     
     # ==================== Session Management ====================
     
+    @traced("session_list")
     def list_saved_sessions(self) -> List[Dict]:
         """
         List all saved sessions.
@@ -433,7 +455,7 @@ class SessionManager:
         """
         self.logger.debug("Listing saved sessions...")
         
-        if not os.path.exists(self.storage_dir):
+        if not self.stat_cache.isdir(self.storage_dir):
             return []
         
         sessions = []
@@ -446,9 +468,12 @@ class SessionManager:
             session_file = os.path.join(self.storage_dir, filename)
             
             try:
-                # Get file info
-                stat = os.stat(session_file)
-                
+                stat = self.stat_cache.stat(session_file)
+            except OSError:
+                # Removed since the listing
+                continue
+            
+            try:
                 # Try to load session data
                 with open(session_file, 'rb') as f:
                     encrypted = f.read()
@@ -493,7 +518,7 @@ class SessionManager:
         
         session_file = os.path.join(self.storage_dir, f"{session_name}.session")
         
-        if not os.path.exists(session_file):
+        if not self.stat_cache.exists(session_file):
             self.logger.warning(f"Session not found: {session_name}")
             return False
         
@@ -503,6 +528,7 @@ class SessionManager:
         
         try:
             os.remove(session_file)
+            self.stat_cache.invalidate(session_file)
             self.logger.info(f"✓ Deleted session '{session_name}'")
             return True
         except Exception as e:
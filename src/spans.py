@@ -0,0 +1,298 @@
+"""
+Span Timing Module
+==================
+
+Lightweight per-phase instrumentation. Code marks its phases with
+
+    with span("scan_leftovers"):
+        ...
+
+Spans nest per thread and are recorded by the shared TRACER; work handed to a
+thread pool through bind_span() nests under the span that submitted it. While tracing is
+disabled (the default) span() returns a shared no-op object, so instrumented
+code pays one attribute check per phase. With profiling enabled every
+top-level phase also gets its own cProfile profiler, and tracemalloc records
+the net allocation and peak memory of every span.
+
+Output (Tracer.write):
+- spans.folded: collapsed stacks ("run;clean;scan 1234", self time in µs) for
+  flamegraph.pl, speedscope or inferno
+- spans.json: per-span calls, total/self seconds and memory
+- <phase>.prof: cProfile stats per top-level phase (pstats, snakeviz, flameprof)
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import re
+import json
+import time
+import functools
+import threading
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+
+class _NullSpan:
+    """Span used while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'path', 'start', 'profiler', 'mem_start', 'seen_peak')
+
+    def __init__(self, tracer: 'Tracer', name: str):
+        self.tracer = tracer
+        self.name = name.replace(';', ',')
+        self.profiler = None
+        self.seen_peak = 0
+
+    def __enter__(self):
+        tracer = self.tracer
+        stack = tracer._stack()
+        if tracer.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # Resetting the peak below would lose what the parent has seen so far
+                stack[-1].seen_peak = max(stack[-1].seen_peak, peak)
+            tracemalloc.reset_peak()
+            self.mem_start = current
+        stack.append(self)
+        self.path = ';'.join(tracer._local.prefix + tuple(s.name for s in stack))
+        if self.path not in tracer._stats:
+            tracer._register(self.path)
+        if tracer.profile and tracer._local.profiler is None and threading.current_thread() is threading.main_thread():
+            # cProfile cannot nest (and only one profiler may run per process):
+            # the outermost span of the main thread owns it
+            self.profiler = tracer._profilers.get(self.path)
+            if self.profiler is None:
+                import cProfile
+                self.profiler = tracer._profilers[self.path] = cProfile.Profile()
+            tracer._local.profiler = self.profiler
+            self.profiler.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        tracer = self.tracer
+        if self.profiler is not None:
+            self.profiler.disable()
+            tracer._local.profiler = None
+        memory_delta = memory_peak = None
+        if tracer.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            memory_delta = current - self.mem_start
+            memory_peak = max(self.seen_peak, peak) - self.mem_start
+        stack = tracer._stack()
+        stack.pop()
+        if stack and memory_peak is not None:
+            stack[-1].seen_peak = max(stack[-1].seen_peak, memory_peak + self.mem_start)
+        tracer._record(self.path, seconds, memory_delta, memory_peak)
+        return False
+
+
+class Tracer:
+    """
+    Collects span timings (and optionally cProfile/tracemalloc data).
+
+    Features:
+    - Disabled by default; span() is then a no-op
+    - Nested spans per thread, aggregated by their full path
+    - Optional cProfile per top-level phase and tracemalloc per span
+    - Collapsed-stack output for flame graphs
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.profile = False
+        self.memory = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict] = {}
+        self._order: List[str] = []
+        self._profilers: Dict[str, 'cProfile.Profile'] = {}
+        # Called with (path, seconds) for every finished span, e.g. metrics.observe_span
+        self.listeners: List[Callable[[str, float], None]] = []
+
+    def enable(self, profile: bool = False, memory: bool = False):
+        """
+        Start recording spans.
+
+        Args:
+            profile: Run cProfile for every top-level span
+            memory: Track allocations with tracemalloc (slows Python code down noticeably)
+        """
+        self.enabled = True
+        self.profile = profile
+        self.memory = memory and hasattr(tracemalloc, 'reset_peak')
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.memory = False
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def _stack(self) -> List[_Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+            self._local.profiler = None
+            self._local.prefix = ()
+        return stack
+
+    def current(self) -> tuple:
+        """Names of the spans open on this thread, outermost first."""
+        return self._local.prefix + tuple(s.name for s in self._stack())
+
+    def _register(self, path: str):
+        # Registered on entry, so parents are listed before their children
+        with self._lock:
+            if path not in self._stats:
+                self._stats[path] = {'calls': 0, 'seconds': 0.0, 'memory_delta': 0, 'memory_peak': 0}
+                self._order.append(path)
+
+    def _record(self, path: str, seconds: float, memory_delta: Optional[int], memory_peak: Optional[int]):
+        with self._lock:
+            stats = self._stats[path]
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+            if memory_delta is not None:
+                stats['memory_delta'] += memory_delta
+                stats['memory_peak'] = max(stats['memory_peak'], memory_peak)
+        for listener in self.listeners:
+            listener(path, seconds)
+
+    # ==================== Reporting ====================
+
+    def results(self) -> List[Dict]:
+        """
+        Aggregated spans in first-entered order (spans still open report calls=0).
+
+        Returns:
+            List of dicts: path, calls, seconds (total), self_seconds, memory_delta, memory_peak
+        """
+        with self._lock:
+            stats = {path: dict(s) for path, s in self._stats.items()}
+            order = list(self._order)
+        children: Dict[str, float] = {}
+        for path, s in stats.items():
+            parent = path.rpartition(';')[0]
+            if parent in stats:
+                children[parent] = children.get(parent, 0.0) + s['seconds']
+        return [
+            dict(stats[path], path=path, self_seconds=max(0.0, stats[path]['seconds'] - children.get(path, 0.0)))
+            for path in order
+        ]
+
+    def folded(self) -> str:
+        """Collapsed stacks, one line per span path, weighted by self time in microseconds."""
+        lines = []
+        for r in self.results():
+            micros = int(r['self_seconds'] * 1e6)
+            if micros > 0:
+                lines.append(f"{r['path']} {micros}")
+        return '\n'.join(lines) + '\n'
+
+    def summary_lines(self) -> List[str]:
+        """Human-readable table of the recorded spans (indented by depth)."""
+        lines = []
+        for r in self.results():
+            depth = r['path'].count(';')
+            name = '  ' * depth + r['path'].rpartition(';')[2]
+            line = f"{name:<40} {r['seconds']:>9.3f}s  x{r['calls']}"
+            if self.memory:
+                line += f"  peak {r['memory_peak'] / 1024 / 1024:.1f} MB"
+            lines.append(line)
+        return lines
+
+    def write(self, directory: str) -> List[str]:
+        """
+        Write spans.folded, spans.json and one .prof file per profiled phase.
+
+        Returns:
+            Paths of the files written
+        """
+        os.makedirs(directory, exist_ok=True)
+        written = []
+
+        path = os.path.join(directory, 'spans.folded')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.folded())
+        written.append(path)
+
+        path = os.path.join(directory, 'spans.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'spans': self.results(), 'memory': self.memory}, f, indent=2)
+        written.append(path)
+
+        for phase, profiler in self._profilers.items():
+            path = os.path.join(directory, re.sub(r'[^\w.-]+', '_', phase) + '.prof')
+            profiler.dump_stats(path)
+            written.append(path)
+        return written
+
+
+# Tracer shared by every component in this process
+TRACER = Tracer()
+
+
+def span(name: str):
+    """Time a phase: `with span("name"): ...` (no-op unless TRACER is enabled)."""
+    if not TRACER.enabled:
+        return _NULL_SPAN
+    return _Span(TRACER, name)
+
+
+def traced(name: str):
+    """Decorator form of span(): time every call of the function as `name`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return fn(*args, **kwargs)
+            with _Span(TRACER, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind_span(fn: Callable) -> Callable:
+    """
+    Bind fn to the caller's open spans, for running it on another thread.
+
+    Spans opened by fn on a pool thread then nest under the span that submitted
+    it ("clean_browser;cookies") instead of starting a new top-level path.
+    """
+    if not TRACER.enabled:
+        return fn
+    prefix = TRACER.current()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        TRACER._stack()
+        saved = TRACER._local.prefix
+        TRACER._local.prefix = prefix
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            TRACER._local.prefix = saved
+    return wrapper
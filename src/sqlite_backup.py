@@ -0,0 +1,153 @@
+"""
+SQLite Backup Module
+====================
+
+Consistent, cheap copies of browser SQLite databases (cookies). A plain file
+copy misses whatever still sits in the -wal file, can capture a half-written
+transaction next to a hot -journal, and copies free pages too. This module
+picks the cheapest method that still yields a consistent copy:
+
+- reflink: FICLONE on Linux (Btrfs, XFS, bcachefs...) when no -wal or -journal
+  holds pending changes; a copy-on-write clone costs no data I/O
+- vacuum: VACUUM INTO, a compacted copy without free pages (on request)
+- backup: sqlite3's online backup API, copying pages in steps
+
+Restores go through the backup API into the live database, so its -wal and
+-journal stay consistent with the restored pages.
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import sys
+import errno
+import sqlite3
+from typing import Callable, Optional
+
+# <linux/fs.h>: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+# Pages copied per backup step; a 4KB-page database is copied in 4MB steps
+BACKUP_STEP_PAGES = 1024
+
+# progress(copied_pages, total_pages)
+Progress = Callable[[int, int], None]
+
+
+def is_database(path: str) -> bool:
+    """True if path starts with the SQLite 3 file header."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(16) == b'SQLite format 3\x00'
+    except OSError:
+        return False
+
+
+def has_pending_changes(path: str) -> bool:
+    """True if a -wal or -journal next to the database may hold changes the file lacks."""
+    for suffix in ('-wal', '-journal'):
+        try:
+            if os.path.getsize(path + suffix) > 0:
+                return True
+        except OSError:
+            pass
+    return False
+
+
+def reflink(source: str, dest: str) -> bool:
+    """
+    Clone source to dest with FICLONE.
+
+    Returns:
+        True if cloned; False if the platform or filesystem cannot (dest is then removed)
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+    import fcntl
+
+    try:
+        with open(source, 'rb') as src, open(dest, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError as e:
+        try:
+            os.unlink(dest)
+        except OSError:
+            pass
+        if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS):
+            return False
+        raise
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    # Opened read-write, so a hot journal left by a crashed browser is rolled back first
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout = 5000")
+    return conn
+
+
+def online_backup(source: str, dest: str, progress: Optional[Progress] = None,
+                  pages: int = BACKUP_STEP_PAGES):
+    """
+    Copy source into dest (new or existing database) with the online backup API.
+
+    Args:
+        source: Database to read
+        dest: Database to overwrite
+        progress: Called after every step with (copied_pages, total_pages)
+        pages: Pages per step
+    """
+    def step(status, remaining, total):
+        if progress:
+            progress(total - remaining, total)
+
+    src = _connect(source)
+    try:
+        dst = sqlite3.connect(dest, isolation_level=None)
+        try:
+            src.backup(dst, pages=pages, progress=step)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+
+
+def vacuum_into(source: str, dest: str):
+    """Write a compacted copy of source to dest (must not exist yet)."""
+    conn = _connect(source)
+    try:
+        conn.execute("VACUUM INTO ?", (dest,))
+    finally:
+        conn.close()
+
+
+def backup_database(source: str, dest: str, compact: bool = False, allow_reflink: bool = True,
+                    progress: Optional[Progress] = None) -> str:
+    """
+    Create a consistent copy of a SQLite database at a new path.
+
+    Args:
+        source: Database to copy
+        dest: New file (must not exist)
+        compact: VACUUM INTO instead of a page copy (smaller, but reads and writes everything)
+        allow_reflink: Try a copy-on-write clone first
+        progress: Called with (copied_pages, total_pages) by the backup API
+
+    Returns:
+        Method used: 'reflink', 'vacuum' or 'backup'
+    """
+    if os.path.exists(dest):
+        raise FileExistsError(errno.EEXIST, "Backup target exists", dest)
+    if compact and sqlite3.sqlite_version_info >= (3, 27, 0):
+        vacuum_into(source, dest)
+        return 'vacuum'
+    if allow_reflink and not has_pending_changes(source) and reflink(source, dest):
+        return 'reflink'
+    online_backup(source, dest, progress)
+    return 'backup'
+
+
+def restore_database(backup: str, dest: str, progress: Optional[Progress] = None):
+    """Overwrite the live database dest with the contents of backup."""
+    online_backup(backup, dest, progress)
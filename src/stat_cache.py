@@ -0,0 +1,173 @@
+"""
+Stat Cache Module
+=================
+
+Shared, short-lived cache of filesystem metadata (stat/lstat results).
+Browser detection, profile discovery, session storage and the leftover scan
+ask the same cache, so a path is stat'ed once per `ttl` instead of on every
+menu loop, and a full repair stats each path once. Missing paths are cached
+too; whoever creates, changes or removes a path invalidates it.
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import stat
+import time
+import errno
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+# A missing path (or a missing directory on the way) is an answer worth caching
+NEGATIVE_ERRNOS = (errno.ENOENT, errno.ENOTDIR)
+
+
+class StatCache:
+    """
+    Cached view of filesystem metadata.
+
+    Features:
+    - stat() and lstat() results reused for `ttl` seconds, or for a whole `hold()` block
+    - Negative results (missing paths) cached like positive ones
+    - exists / isdir / isfile helpers answering from the same entry
+    - Results already at hand (DirEntry.stat) can be stored without a syscall
+    - Explicit invalidation of a path, its subtree and its parent after a mutation
+    """
+
+    DEFAULT_TTL = 30.0
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        """
+        Initialize StatCache.
+
+        Args:
+            ttl: Seconds an entry stays valid outside of hold()
+        """
+        self.ttl = ttl
+        self.syscalls = 0
+        self.hits = 0
+        self._lock = threading.RLock()
+        # (path, follow_symlinks) -> (taken_at, stat_result or errno of a missing path)
+        self._entries: Dict[Tuple[str, bool], Tuple[float, object]] = {}
+        self._held = 0
+        self._held_since = 0.0
+
+    # ==================== Lookups ====================
+
+    def stat(self, path: str, follow_symlinks: bool = True) -> os.stat_result:
+        """
+        os.stat(path) (os.lstat with follow_symlinks=False), from the cache if fresh.
+
+        Raises:
+            OSError: As os.stat would; missing paths are served from the cache too
+        """
+        key = (path, follow_symlinks)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and self._fresh(cached[0]):
+                self.hits += 1
+                result = cached[1]
+                if isinstance(result, int):
+                    # A fresh exception per raise (OSError picks FileNotFoundError etc. from errno)
+                    raise OSError(result, os.strerror(result), path)
+                return result
+            self.syscalls += 1
+
+        # The syscall runs outside the lock; concurrent misses on one path just stat twice
+        try:
+            result = os.stat(path, follow_symlinks=follow_symlinks)
+        except OSError as e:
+            if e.errno in NEGATIVE_ERRNOS:
+                with self._lock:
+                    self._entries[key] = (time.monotonic(), e.errno)
+            raise
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+        return result
+
+    def _fresh(self, taken_at: float) -> bool:
+        return time.monotonic() - taken_at <= self.ttl or (self._held > 0 and taken_at >= self._held_since)
+
+    def lstat(self, path: str) -> os.stat_result:
+        """os.lstat(path), from the cache if fresh."""
+        return self.stat(path, follow_symlinks=False)
+
+    def _mode(self, path: str, follow_symlinks: bool = True) -> Optional[int]:
+        try:
+            return self.stat(path, follow_symlinks).st_mode
+        except (OSError, ValueError):
+            return None
+
+    def exists(self, path: str) -> bool:
+        """os.path.exists from the cache."""
+        return self._mode(path) is not None
+
+    def lexists(self, path: str) -> bool:
+        """os.path.lexists from the cache."""
+        return self._mode(path, follow_symlinks=False) is not None
+
+    def isdir(self, path: str) -> bool:
+        """os.path.isdir from the cache."""
+        mode = self._mode(path)
+        return mode is not None and stat.S_ISDIR(mode)
+
+    def isfile(self, path: str) -> bool:
+        """os.path.isfile from the cache."""
+        mode = self._mode(path)
+        return mode is not None and stat.S_ISREG(mode)
+
+    def remember(self, path: str, result: os.stat_result, follow_symlinks: bool = True):
+        """
+        Store a stat result obtained elsewhere (e.g. DirEntry.stat during a listing).
+
+        Args:
+            path: Path the result belongs to
+            result: The stat result
+            follow_symlinks: Whether result is a stat (True) or an lstat (False)
+        """
+        with self._lock:
+            self._entries[(path, follow_symlinks)] = (time.monotonic(), result)
+
+    # ==================== Invalidation ====================
+
+    def invalidate(self, path: Optional[str] = None):
+        """
+        Drop cached entries after a mutation.
+
+        Args:
+            path: Created, changed or removed path; its subtree and its parent
+                  directory (whose mtime changed) are dropped too. None drops everything.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            path = os.path.normpath(path)
+            parent = os.path.dirname(path)
+            subtree = path.rstrip(os.sep) + os.sep
+            for key in [k for k in self._entries if self._affected(k[0], path, parent, subtree)]:
+                del self._entries[key]
+
+    @staticmethod
+    def _affected(cached: str, path: str, parent: str, subtree: str) -> bool:
+        cached = os.path.normpath(cached)
+        return cached == path or cached == parent or cached.startswith(subtree)
+
+    @contextmanager
+    def hold(self):
+        """Keep the entries taken during the block (and fresh ones) until it ends, regardless of ttl."""
+        with self._lock:
+            if not self._held:
+                self._held_since = time.monotonic() - self.ttl
+            self._held += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._held -= 1
+
+
+# Shared cache used by Cleaner, BrowserHelper and SessionManager
+STAT_CACHE = StatCache()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The modules under src/ import each other by name, as when running src/main.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+# benchmarks/fixtures.py writes the same formats; its encoders are tested too
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
@@ -0,0 +1,68 @@
+"""
+LevelDB Sample Generator
+========================
+
+Writes tests/data/leveldb_sample with real LevelDB (through plyvel), shaped
+like Chromium's `Local Storage/leveldb`:
+
+- 000005.ldb: a compacted table of Snappy-compressed 4KB blocks (repetitive
+  values, so the blocks are full of Snappy copy tags)
+- 000004.log: later writes and deletions, not yet compacted
+
+The checked-in sample was produced with plyvel 1.5.1 (LevelDB 1.22, Snappy
+1.1.9). Re-run only to change the sample; the tests describe its contents.
+
+Usage:
+    python tests/data/make_leveldb_sample.py
+
+Author: TawanaNetworkLtc
+License: MIT
+"""
+
+import os
+import glob
+import shutil
+
+import plyvel
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'leveldb_sample')
+
+ORIGINS = (b'https://antigravity.google', b'https://example.com')
+TABLE_ITEMS = 600
+LOG_ITEMS = 20
+
+
+def item_key(origin: bytes, index: int) -> bytes:
+    return b'_' + origin + b'\x00\x01item%04d' % index
+
+
+def item_value(origin: bytes, index: int) -> bytes:
+    return b'\x01' + b'{"origin":"%s","index":%d,"payload":"%s"}' % (origin, index, b'abcdefgh' * 24)
+
+
+def main():
+    shutil.rmtree(SAMPLE_DIR, ignore_errors=True)
+    db = plyvel.DB(SAMPLE_DIR, create_if_missing=True, compression='snappy', block_size=4096)
+    with db.write_batch() as batch:
+        for origin in ORIGINS:
+            batch.put(b'META:' + origin, b'\x08\x01')
+            for i in range(TABLE_ITEMS):
+                batch.put(item_key(origin, i), item_value(origin, i))
+    db.compact_range()
+
+    # Left in the log: new items, and deletions of items that are in the table
+    with db.write_batch() as batch:
+        for origin in ORIGINS:
+            for i in range(TABLE_ITEMS, TABLE_ITEMS + LOG_ITEMS):
+                batch.put(item_key(origin, i), item_value(origin, i))
+            for i in range(LOG_ITEMS):
+                batch.delete(item_key(origin, i))
+    db.close()
+
+    # Info logs are not part of the database
+    for path in glob.glob(os.path.join(SAMPLE_DIR, 'LOG*')):
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
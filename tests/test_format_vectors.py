@@ -0,0 +1,316 @@
+"""
+Known-good vectors for the on-disk formats.
+
+benchmarks/fixtures.py writes these formats with its own encoders, so a bug
+mirrored between a fixture and a reader would go unnoticed in the benchmarks.
+Here both sides are checked against bytes that do not come from this repo:
+
+- CRC32C: RFC 3720 (B.4) and LevelDB's crc32c_test.cc check values
+- Snappy: streams produced by the reference C++ library (libsnappy 1.1.9)
+- SuperFastHash: Paul Hsieh's reference C implementation
+- Simple Cache, blockfile and cache2 entries: hand-written from Chromium's
+  simple_entry_format.h / disk_format.h and Firefox's CacheFileMetadata.h
+"""
+
+import os
+import struct
+
+import pytest
+
+import fixtures
+from conftest import DATA_DIR
+from cache_entries import CacheScanner, read_cache2_key, read_simple_key, super_fast_hash
+from leveldb_reader import (
+    LOG_HEADER_SIZE, TABLE_FOOTER_SIZE, _block_handle, _mapped, _read_block, iter_block,
+    masked_crc32c, snappy_decompress,
+)
+
+
+# ==================== CRC32C ====================
+
+CRC32C_VECTORS = [
+    (b'123456789', 0xE3069283),
+    (b'\x00' * 32, 0x8A9136AA),
+    (b'\xff' * 32, 0x62A8AB43),
+    (bytes(range(32)), 0x46DD794E),
+    (bytes(range(31, -1, -1)), 0x113FDB5C),
+    # iSCSI SCSI Read (10) command PDU
+    (bytes.fromhex('01c00000000000000000000000000000'
+                   '14000000000004000000001400000018'
+                   '28000000000000000200000000000000'), 0xD9963A56),
+]
+
+
+def unmask(masked: int) -> int:
+    """Inverse of LevelDB's crc32c::Mask (util/crc32c.h)."""
+    rot = (masked - 0xA282EAD8) & 0xFFFFFFFF
+    return ((rot >> 17) | (rot << 15)) & 0xFFFFFFFF
+
+
+@pytest.mark.parametrize('data, crc', CRC32C_VECTORS)
+def test_masked_crc32c_vectors(data, crc):
+    assert unmask(masked_crc32c(data)) == crc
+
+
+@pytest.mark.parametrize('data, crc', CRC32C_VECTORS)
+def test_fixture_crc32c_vectors(data, crc):
+    assert fixtures.crc32c(data) == crc
+    assert fixtures._masked_crc(data) == masked_crc32c(data)
+
+
+def test_masked_crc32c_matches_leveldb_log():
+    with open(os.path.join(DATA_DIR, 'leveldb_sample', '000004.log'), 'rb') as f:
+        log = f.read()
+    crc, length, kind = struct.unpack_from('<IHB', log, 0)
+    assert masked_crc32c(bytes([kind]) + log[LOG_HEADER_SIZE:LOG_HEADER_SIZE + length]) == crc
+
+
+def test_masked_crc32c_matches_leveldb_table_blocks():
+    with _mapped(os.path.join(DATA_DIR, 'leveldb_sample', '000005.ldb')) as buf:
+        footer = buf[len(buf) - TABLE_FOOTER_SIZE:]
+        _metaindex, pos = _block_handle(footer)
+        index_handle, _ = _block_handle(footer, pos)
+        handles = [index_handle] + [_block_handle(h)[0] for _k, h in iter_block(_read_block(buf, index_handle))]
+        for offset, size in handles:
+            # Block, compression type, masked CRC of both
+            crc = struct.unpack_from('<I', buf, offset + size + 1)[0]
+            assert masked_crc32c(bytes(buf[offset:offset + size + 1])) == crc
+
+
+# ==================== Snappy ====================
+
+# (uncompressed, stream from libsnappy's snappy::Compress)
+SNAPPY_STREAMS = [
+    # One literal with a 1-byte length (tag 60)
+    (b'Wikipedia is a free, web-based, collaborative, multilingual encyclopedia project.',
+     '51f05057696b697065646961206973206120667265652c207765622d62617365642c20636f6c6c61626f7261746976652c20'
+     '6d756c74696c696e6775616c20656e6379636c6f70656469612070726f6a6563742e'),
+    # Copies with a 1-byte offset
+    (b'abcdefgh-abcdefgh+abcdefgh=abcdefgh',
+     '232061626364656667682d1109002b1109203d6162636465666768'),
+    # Copies with a 2-byte offset
+    (b'the quick brown fox, the quick brown dog, the quick brown cat',
+     '3d5074686520717569636b2062726f776e20666f782c203e150008646f6746150008636174'),
+    # Overlapping copies (offset 1) of a run
+    (b'a' * 100, '640061fe01008a0100'),
+    # A LocalStorage key repeated
+    (b'_https://antigravity.google\x00\x01item0001_https://antigravity.google\x00\x01item0002',
+     '4a905f68747470733a2f2f616e7469677261766974792e676f6f676c6500016974656d303030318e25000032'),
+    # Literal of 254 bytes, then a 46-byte copy
+    (bytes((i * 7 + 3) % 251 for i in range(300)),
+     'ac02f0fd030a11181f262d343b424950575e656c737a81888f969da4abb2b9c0c7ced5dce3eaf1f8040b121920272e353c434a'
+     '51585f666d747b828990979ea5acb3bac1c8cfd6dde4ebf2f9050c131a21282f363d444b525960676e757c838a91989fa6adb4'
+     'bbc2c9d0d7dee5ecf3fa060d141b222930373e454c535a61686f767d848b9299a0a7aeb5bcc3cad1d8dfe6edf400070e151c23'
+     '2a31383f464d545b626970777e858c939aa1a8afb6bdc4cbd2d9e0e7eef501080f161d242b323940474e555c636a71787f868d'
+     '949ba2a9b0b7bec5ccd3dae1e8eff6020910171e252c333a41484f565d646b727980878e959ca3aab1b8bfc6cdd4dbe2e9f0f7'
+     '030a11b6fb00'),
+]
+
+
+@pytest.mark.parametrize('data, stream', SNAPPY_STREAMS)
+def test_snappy_reference_streams(data, stream):
+    assert snappy_decompress(bytes.fromhex(stream)) == data
+
+
+def test_snappy_copy_with_4_byte_offset():
+    # libsnappy never emits these (its blocks are 64KB), but the format allows them
+    stream = b'\x08' + b'\x0cabcd' + b'\x0f' + struct.pack('<I', 4)
+    assert snappy_decompress(stream) == b'abcdabcd'
+
+
+def test_snappy_literal_with_2_byte_length():
+    data = bytes(range(256)) + bytes(range(44))
+    stream = b'\xac\x02' + bytes([61 << 2]) + struct.pack('<H', len(data) - 1) + data
+    assert snappy_decompress(stream) == data
+
+
+@pytest.mark.parametrize('stream', [
+    '0a0861626364',     # length 10, but only 4 bytes of output
+    '08046162010a',     # copy offset 10 before 2 bytes of output
+    '080c616263640100', # copy offset 0
+])
+def test_snappy_rejects_corrupt_streams(stream):
+    with pytest.raises(ValueError):
+        snappy_decompress(bytes.fromhex(stream))
+
+
+def test_fixture_snappy_literal_matches_reference():
+    # libsnappy stores incompressible input as one literal, exactly as the fixture does
+    data, stream = SNAPPY_STREAMS[0]
+    assert fixtures._snappy_literal(data) == bytes.fromhex(stream)
+
+
+# ==================== SuperFastHash ====================
+
+SUPER_FAST_HASH_VECTORS = [
+    (b'', 0),
+    (b'a', 0x115EA782),
+    (b'ab', 0x516B8B44),
+    (b'abc', 0xD2BE198A),
+    (b'abcd', 0xDAD8B8DB),
+    (b'https://antigravity.google/', 0x7CDD49E4),
+    # Trailing bytes are read as signed char
+    (b'\xff', 0),
+    (b'\xfe\xff', 0xF4A3B769),
+    (b'\x80\x81\x82', 0x134071ED),
+    (b'hello world\xe9', 0x27D863D1),
+]
+
+
+@pytest.mark.parametrize('data, value', SUPER_FAST_HASH_VECTORS)
+def test_super_fast_hash_vectors(data, value):
+    assert super_fast_hash(data) == value
+    assert fixtures._super_fast_hash(data) == value
+
+
+# ==================== Simple Cache ====================
+
+SIMPLE_KEY = b'1/0/https://antigravity.google/app.js'
+
+# <hash>_0 of a Simple Cache entry: SimpleFileHeader, key, stream 1, SimpleFileEOF
+SIMPLE_ENTRY = (
+    bytes.fromhex('305c72a71b6dfbfc')   # kSimpleInitialMagicNumber
+    + bytes.fromhex('05000000')         # kSimpleEntryVersionOnDisk
+    + bytes.fromhex('25000000')         # key_length
+    + bytes.fromhex('f22a6250')         # key_hash
+    + bytes.fromhex('00000000')         # padding to 8 bytes
+    + SIMPLE_KEY
+    + b'hello'
+    + bytes.fromhex('d8410d97456ffaf4')  # kSimpleFinalMagicNumber
+    + bytes.fromhex('01000000')         # FLAG_HAS_CRC32
+    + bytes.fromhex('86a61036')         # crc32 of the stream
+    + bytes.fromhex('05000000')         # stream_size
+    + bytes.fromhex('00000000')
+)
+
+
+def test_read_simple_key(tmp_path):
+    path = tmp_path / '0123456789abcdef_0'
+    path.write_bytes(SIMPLE_ENTRY)
+    assert read_simple_key(str(path)) == SIMPLE_KEY
+
+
+def test_read_simple_key_rejects_other_files(tmp_path):
+    path = tmp_path / '0123456789abcdef_0'
+    path.write_bytes(b'\0' * 8 + SIMPLE_ENTRY[8:])
+    assert read_simple_key(str(path)) is None
+
+
+def test_fixture_simple_cache_header(tmp_path):
+    fixtures.write_simple_cache(str(tmp_path), 1)
+    name = next(n for n in os.listdir(str(tmp_path)) if n.endswith('_0'))
+    data = (tmp_path / name).read_bytes()
+    key = read_simple_key(str(tmp_path / name))
+    assert data[:12] == bytes.fromhex('305c72a71b6dfbfc' '05000000')
+    assert data[12:16] == struct.pack('<I', len(key))
+    assert data[24:24 + len(key)] == key
+    # End of stream 0 (the last record): kSimpleFinalMagicNumber
+    assert data[-24:-16] == bytes.fromhex('d8410d97456ffaf4')
+
+
+# ==================== Blockfile Cache ====================
+
+def entry_store(key: bytes, hash_value: int) -> bytes:
+    """A 256-byte EntryStore (disk_format.h) holding a short key."""
+    store = struct.pack(
+        '<IIIiiiQiI4i4II4i',
+        hash_value,
+        0,            # next
+        0x90000001,   # rankings_node: initialized, block file type 1 (RANKINGS)
+        0, 0,         # reuse_count, refetch_count
+        0,            # state: ENTRY_NORMAL
+        13340000000000000,
+        len(key),
+        0,            # long_key
+        0, 0, 0, 0,   # data_size[4]
+        0, 0, 0, 0,   # data_addr[4]
+        0,            # flags
+        0, 0, 0, 0,   # pad[4]
+    )
+    assert len(store) == 92
+    store += struct.pack('<I', super_fast_hash(store))
+    return (store + key).ljust(256, b'\0')
+
+
+def test_scan_blockfile(tmp_path):
+    key = b'https://antigravity.google/app.js'
+    # BlockFileHeader: kBlockMagic, kBlockVersion2, this_file 1, next_file 0, entry_size 256, ...
+    header = struct.pack('<IIhhiii', 0xC104CAC3, 0x20000, 1, 0, 256, 2, 1024).ljust(8192, b'\0')
+    data = header + entry_store(key, super_fast_hash(key)) + entry_store(b'https://example.com/', 0)
+    (tmp_path / 'index').write_bytes(struct.pack('<II', 0xC103CAC3, 0x20000).ljust(368, b'\0'))
+    (tmp_path / 'data_1').write_bytes(data)
+
+    fmt, read, matches = CacheScanner(lambda k: b'antigravity' in k).scan(str(tmp_path))
+    assert (fmt, read) == ('blockfile', 2)
+    assert [entry.key for entry in matches] == [key]
+
+
+def test_scan_blockfile_skips_bad_self_hash(tmp_path):
+    store = bytearray(entry_store(b'https://antigravity.google/', 0))
+    store[92] ^= 0xFF
+    header = struct.pack('<IIhhiii', 0xC104CAC3, 0x20000, 1, 0, 256, 1, 1024).ljust(8192, b'\0')
+    (tmp_path / 'index').write_bytes(struct.pack('<II', 0xC103CAC3, 0x20000).ljust(368, b'\0'))
+    (tmp_path / 'data_1').write_bytes(header + bytes(store))
+    assert CacheScanner(lambda k: True).scan(str(tmp_path))[1:] == (0, [])
+
+
+# ==================== Firefox cache2 ====================
+
+CACHE2_KEY = b'a,:https://antigravity.google/app.js'
+
+# cache2/entries/<SHA1>: data, metadata (CacheFileMetadata::WriteMetadata), metadata offset
+CACHE2_ENTRY = (
+    b'hello'
+    + bytes.fromhex('8c3d51a0')         # hash of the metadata
+    + bytes.fromhex('1b2c')             # hash of the one data chunk
+    + bytes.fromhex('00000003')         # mVersion (kCacheEntryVersion)
+    + bytes.fromhex('00000001')         # mFetchCount
+    + bytes.fromhex('68e8f880')         # mLastFetched
+    + bytes.fromhex('68e8f880')         # mLastModified
+    + bytes.fromhex('00000000')         # mFrecency
+    + bytes.fromhex('68ea4a00')         # mExpirationTime
+    + bytes.fromhex('00000024')         # mKeySize
+    + bytes.fromhex('00000000')         # mFlags
+    + CACHE2_KEY + b'\0'
+    + b'request-method\0GET\0response-head\0HTTP/1.1 200 OK\r\n\0'
+    + bytes.fromhex('00000005')         # offset of the metadata
+)
+
+# Version 1 has no mFlags
+CACHE2_ENTRY_V1 = (
+    b'hello'
+    + bytes.fromhex('8c3d51a0' '1b2c')
+    + bytes.fromhex('00000001' '00000001' '68e8f880' '68e8f880' '00000000' '68ea4a00' '00000024')
+    + CACHE2_KEY + b'\0'
+    + bytes.fromhex('00000005')
+)
+
+
+@pytest.mark.parametrize('entry', [CACHE2_ENTRY, CACHE2_ENTRY_V1])
+def test_read_cache2_key(tmp_path, entry):
+    path = tmp_path / ('0' * 40)
+    path.write_bytes(entry)
+    assert read_cache2_key(str(path)) == CACHE2_KEY
+
+
+def test_read_cache2_key_with_metadata_beyond_tail_read(tmp_path):
+    body = b'x' * 300000
+    # Two data chunks: two chunk hashes
+    entry = (body + bytes.fromhex('8c3d51a0' '1b2c' '3d4e')
+             + CACHE2_ENTRY[11:-4].ljust(5000, b'\0') + struct.pack('>I', len(body)))
+    path = tmp_path / ('0' * 40)
+    path.write_bytes(entry)
+    assert read_cache2_key(str(path)) == CACHE2_KEY
+
+
+def test_fixture_cache2_layout(tmp_path):
+    fixtures.write_firefox_cache2(str(tmp_path), 1)
+    name = os.listdir(str(tmp_path))[0]
+    data = (tmp_path / name).read_bytes()
+    offset = struct.unpack('>I', data[-4:])[0]
+    # One data chunk: 4-byte hash, 2-byte chunk hash, then the header
+    header = struct.unpack_from('>8I', data, offset + 6)
+    key = data[offset + 6 + 32:offset + 6 + 32 + header[6]]
+    assert header[0] == 3
+    assert read_cache2_key(str(tmp_path / name)) == key
+    assert data[offset + 6 + 32 + header[6]] == 0